@@ -0,0 +1,57 @@
+"""
+Time how long `reai-nft` takes to start for several commands, each run
+in a fresh interpreter. Commands that talk to the node or the wallet are
+timed up to the point where they would connect (importing what they need).
+
+    python benchmarks/bench_cli_startup.py --runs 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = {
+    "reai-nft --help": ["-m", "reai_nft.cmd", "--help"],
+    "reai-nft get-data --help": ["-m", "reai_nft.cmd", "get-data", "--help"],
+    "reai-nft mk --help": ["-m", "reai_nft.cmd", "mk", "--help"],
+    "reai-nft mint-in-batch-no-stop --help": [
+        "-m",
+        "reai_nft.cmd",
+        "mint-in-batch-no-stop",
+        "--help",
+    ],
+    # what get-data and the other read-only commands load before connecting
+    "cli + node client imports": ["-c", "import reai_nft.cmd, reai_nft.node_client"],
+    # what every wallet command loads before connecting
+    "cli + wallet imports": ["-c", "import reai_nft.cmd, reai_nft.wallet"],
+    # what commands forwarded with --daemon load
+    "cli + daemon client imports": ["-c", "import reai_nft.cmd, reai_nft.daemon_client"],
+    "cli + wallet + puzzles": [
+        "-c",
+        "import reai_nft.cmd, reai_nft.wallet, reai_nft.driver; reai_nft.driver.REAI_MOD",
+    ],
+}
+
+
+def time_command(args, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'command':<40} {'median':>8} {'min':>8}")
+    for name, command in COMMANDS.items():
+        median, best = time_command(command, args.runs)
+        print(f"{name:<40} {median:>7.3f}s {best:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Time decoding the data of a reai nft from its last spend with the byte
+level decoder against uncurrying and `as_python` on the whole tree, for
+growing numbers of pairs. Runs offline, no node needed.
+
+    python benchmarks/bench_get_data.py -n 10 -n 1000 -n 10000
+"""
+import argparse
+import os
+import time
+
+from blspy import AugSchemeMPL
+from chia.types.blockchain_format.program import Program
+from chia.wallet.lineage_proof import LineageProof
+from chia.wallet.puzzles import singleton_top_layer
+from clvm.casts import int_from_bytes
+
+from reai_nft import driver
+
+
+def make_spend(n: int):
+    pk = AugSchemeMPL.key_gen(os.urandom(32)).get_g1()
+    data = [(f"key{i}".encode(), os.urandom(32)) for i in range(n)]
+    puzzle = singleton_top_layer.puzzle_for_singleton(
+        os.urandom(32), driver.create_reai_puzzle(data, pk, version=3)
+    )
+    solution = singleton_top_layer.solution_for_singleton(
+        LineageProof(os.urandom(32), os.urandom(32), 1),
+        1,
+        driver.solution_for_reai(4, [16, (b"new", b"pair")]),
+    )
+    return bytes(puzzle), bytes(solution), data
+
+
+def decode_as_python(puzzle_bytes: bytes, solution_bytes: bytes) -> list:
+    # what get_data did before the byte level decoder
+    solution_args = Program.from_bytes(solution_bytes).rest().rest().first()
+    commit = solution_args.rest().first().as_python()
+    _, args = Program.from_bytes(puzzle_bytes).uncurry()
+    data = (
+        args.rest().first().rest().rest().first().rest().rest().first().rest().first()
+    ).as_python()[1:]
+    if int_from_bytes(commit[0]) == 16:
+        data.insert(0, commit[1])
+    return data
+
+
+def decode_bytes(puzzle_bytes: bytes, solution_bytes: bytes) -> list:
+    spend = driver.decode_reai_spend(puzzle_bytes, solution_bytes)
+    data = spend.data
+    for op, value in spend.operations:
+        if op == driver.ADD:
+            data.insert(0, value)
+    return data
+
+
+def timed(f, runs, *args):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = f(*args)
+    return (time.perf_counter() - start) / runs, result
+
+
+def main(sizes, runs):
+    print(f"{'pairs':>7} {'as_python':>12} {'decoder':>12} {'speedup':>8}")
+    for n in sizes:
+        puzzle_bytes, solution_bytes, data = make_spend(n)
+        old_time, old = timed(decode_as_python, runs, puzzle_bytes, solution_bytes)
+        new_time, new = timed(decode_bytes, runs, puzzle_bytes, solution_bytes)
+        assert new == old == [(b"new", b"pair")] + data
+        print(
+            f"{n:>7} {old_time * 1000:>10.2f}ms {new_time * 1000:>10.2f}ms "
+            f"{old_time / new_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, action="append", help="numbers of pairs to time")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    main(args.n or [10, 100, 1000, 10000], max(args.runs, 1))
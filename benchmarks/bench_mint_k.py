@@ -0,0 +1,72 @@
+"""
+Time building and signing mint_k launch spends in-process against the
+process pool builder, for growing batch sizes. Runs offline, no node needed.
+
+    python benchmarks/bench_mint_k.py --workers 4 -k 50 -k 200 -k 1000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from blspy import AugSchemeMPL
+from chia.types.blockchain_format.coin import Coin
+from chia.types.spend_bundle import SpendBundle
+from chia.util.ints import uint64
+
+from reai_nft.signing import ParallelSpendBuilder, SigningContext
+
+COIN_AMOUNT = 1
+
+
+def make_coins(signing: SigningContext, k: int):
+    return [
+        Coin(os.urandom(32), signing.standard_puzzle_hash, uint64(1000))
+        for _ in range(k)
+    ]
+
+
+async def main(ks, workers):
+    sk = AugSchemeMPL.key_gen(os.urandom(32))
+    signing = SigningContext(sk)
+    builder = ParallelSpendBuilder(sk, workers)
+    # start the worker processes before timing anything
+    await builder.build_launch_spends(
+        make_coins(signing, workers), [0] * workers, signing.reai_puzzle, COIN_AMOUNT
+    )
+    print(f"{'k':>6} {'in-process':>12} {f'{workers} workers':>12} {'speedup':>8}")
+    try:
+        for k in ks:
+            coins = make_coins(signing, k)
+            start = time.perf_counter()
+            serial = [
+                signing.build_launch_spend(coin, signing.reai_puzzle, COIN_AMOUNT)
+                for coin in coins
+            ]
+            SpendBundle.aggregate([spend_bundle for spend_bundle, _ in serial])
+            serial_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parallel = await builder.build_launch_spends(
+                coins, [0] * k, signing.reai_puzzle, COIN_AMOUNT
+            )
+            SpendBundle.aggregate([spend_bundle for spend_bundle, _ in parallel])
+            parallel_time = time.perf_counter() - start
+
+            assert [launcher_id for _, launcher_id in serial] == [
+                launcher_id for _, launcher_id in parallel
+            ]
+            print(
+                f"{k:>6} {serial_time:>11.3f}s {parallel_time:>11.3f}s "
+                f"{serial_time / parallel_time:>7.2f}x"
+            )
+    finally:
+        builder.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-k", type=int, action="append", help="batch sizes to time")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    asyncio.run(main(args.k or [10, 50, 200, 500], max(args.workers, 1)))
@@ -0,0 +1,62 @@
+"""
+Time computing the singleton puzzle hash of a reai nft by building the
+curried programs and hashing them against the pure hash path, for growing
+numbers of pairs. Runs offline, no node needed.
+
+    python benchmarks/bench_puzzle_hash.py -n 0 -n 100 -n 1000
+"""
+import argparse
+import os
+import time
+
+from blspy import AugSchemeMPL
+from chia.wallet.puzzles import singleton_top_layer
+
+from reai_nft import driver
+
+
+def hash_programs(launcher_id, data, pk, multi_op, hashed_data):
+    # what the wallet did before the pure hash path
+    inner_puzzle = driver.create_reai_puzzle(
+        data, pk, multi_op=multi_op, hashed_data=hashed_data
+    )
+    return singleton_top_layer.puzzle_for_singleton(launcher_id, inner_puzzle).get_tree_hash()
+
+
+def hash_pure(launcher_id, data, pk, multi_op, hashed_data):
+    return driver.singleton_puzzle_hash(
+        launcher_id,
+        driver.reai_puzzle_hash(data, pk, multi_op=multi_op, hashed_data=hashed_data),
+    )
+
+
+def timed(f, runs, *args):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = f(*args)
+    return (time.perf_counter() - start) / runs, result
+
+
+def main(sizes, runs):
+    pk = AugSchemeMPL.key_gen(os.urandom(32)).get_g1()
+    launcher_id = os.urandom(32)
+    print(f"{'pairs':>7} {'puzzle':>6} {'programs':>12} {'pure':>12} {'speedup':>8}")
+    for n in sizes:
+        data = [(f"key{i}".encode(), os.urandom(32)) for i in range(n)]
+        for name, multi_op, hashed_data in (("v1", False, False), ("v3", False, True)):
+            args = (launcher_id, data, pk, multi_op, hashed_data)
+            old_time, old = timed(hash_programs, runs, *args)
+            new_time, new = timed(hash_pure, runs, *args)
+            assert new == old
+            print(
+                f"{n:>7} {name:>6} {old_time * 1e6:>10.1f}us {new_time * 1e6:>10.1f}us "
+                f"{old_time / new_time:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, action="append", help="numbers of pairs to time")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    main(args.n or [0, 10, 100, 1000], max(args.runs, 1))
@@ -0,0 +1,119 @@
+from typing import Callable, Optional
+
+# chia blocks with transactions come about every 52 seconds, a batch waiting
+# for more than three of them is competing for full blocks
+DEFAULT_TARGET_INCLUSION = 180
+
+
+class BatchController:
+    """
+    Picks the size of the next mint-in-batch-no-stop batch and of the next
+    coin split from how the previous batches did, aiming at the most tokens
+    confirmed per minute:
+
+    - a batch the mempool rejected, in part or in whole, halves k
+    - a batch included later than `target_inclusion` seconds means blocks
+      are full, k shrinks by a quarter
+    - otherwise k takes a step in the direction that last raised the
+      confirmed rate, and turns back once the rate drops
+    - k never asks for more than `max_batch_cost` once the cost of a
+      launch is known
+
+    The split size follows k so one split covers `split_ahead` batches.
+    """
+
+    def __init__(
+            self,
+            k: int,
+            min_k: int,
+            max_k: int,
+            min_split: int,
+            max_split: int,
+            target_inclusion: float = DEFAULT_TARGET_INCLUSION,
+            max_batch_cost: Optional[int] = None,
+            split_ahead: int = 2,
+            log: Callable[[str], None] = print,
+    ):
+        if not 1 <= min_k <= max_k:
+            raise ValueError(f"Bad batch size bounds: {min_k}..{max_k}")
+        if not 1 <= min_split <= max_split:
+            raise ValueError(f"Bad split size bounds: {min_split}..{max_split}")
+        self.min_k = min_k
+        self.max_k = max_k
+        self.min_split = min_split
+        self.max_split = max_split
+        self.target_inclusion = target_inclusion
+        self.max_batch_cost = max_batch_cost
+        self.split_ahead = split_ahead
+        self.log = log
+        self.launch_cost: Optional[int] = None
+        self.k = self._bounded(k)
+        # +1 while growing k raised the rate, -1 after it lowered it
+        self.direction = 1
+        # tokens confirmed per minute by the last included batch
+        self.last_rate: Optional[float] = None
+
+    def _cost_cap(self) -> int:
+        if self.max_batch_cost is None or not self.launch_cost:
+            return self.max_k
+        return max(self.min_k, self.max_batch_cost // self.launch_cost)
+
+    def _bounded(self, k: int) -> int:
+        return max(self.min_k, min(k, self.max_k, self._cost_cap()))
+
+    def _set_k(self, k: int, reason: str):
+        k = self._bounded(k)
+        if k != self.k:
+            self.log(f"batch size {self.k} -> {k}, split size {self.split_size} -> "
+                     f"{self._split_size(k)}: {reason}")
+        else:
+            self.log(f"batch size stays {k}: {reason}")
+        self.k = k
+
+    def _split_size(self, k: int) -> int:
+        return max(self.min_split, min(k * self.split_ahead, self.max_split))
+
+    @property
+    def split_size(self) -> int:
+        """Number of coins the next split should create."""
+        return self._split_size(self.k)
+
+    def record_cost(self, launch_cost: Optional[int]):
+        """Cost of one launch in the last batch, caps k to max_batch_cost."""
+        if not launch_cost or launch_cost == self.launch_cost:
+            return
+        self.launch_cost = launch_cost
+        if self.k > self._cost_cap():
+            self._set_k(
+                self.k, f"a batch costs {self.k * launch_cost}, above {self.max_batch_cost}"
+            )
+
+    def record_rejection(self, k: int, rejected: int):
+        """`rejected` launches of a batch of k never made it to the mempool."""
+        if rejected <= 0:
+            return
+        self.direction = -1
+        self._set_k(min(self.k, k) // 2, f"{rejected} of {k} launches rejected by the mempool")
+
+    def record_inclusion(self, k: int, confirmed: int, elapsed: float):
+        """`confirmed` of k launches were included `elapsed` seconds after the push."""
+        if confirmed < k:
+            # dropped from the mempool or still waiting at the timeout
+            self.record_rejection(k, k - confirmed)
+            return
+        rate = confirmed * 60 / max(elapsed, 1)
+        if elapsed > self.target_inclusion:
+            self.direction = -1
+            self._set_k(
+                self.k - max(1, self.k // 4),
+                f"included after {elapsed:.0f}s, over the {self.target_inclusion:.0f}s target",
+            )
+        else:
+            if self.last_rate is not None and rate < self.last_rate:
+                self.direction = -self.direction
+            trend = "" if self.last_rate is None else f" (was {self.last_rate:.1f})"
+            self._set_k(
+                self.k + self.direction * max(1, self.k // 8),
+                f"{rate:.1f} tokens confirmed per minute{trend}",
+            )
+        self.last_rate = rate
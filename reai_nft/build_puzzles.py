@@ -0,0 +1,96 @@
+"""
+Compiles the puzzles in reai_nft/clsp to `<name>.hex` and records the
+source hash and the puzzle tree hash next to it in `<name>.hash`, so
+importing the driver only has to read the hex. The sources are only
+checked here, run it (or `make puzzles`) after editing a puzzle and commit
+the outputs.
+
+    python -m reai_nft.build_puzzles
+"""
+import hashlib
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+CLSP_PATH: Path = Path(__file__).parent / "clsp"
+INCLUDE_PATH: Path = Path(__file__).parent.parent / "include"
+PUZZLES = ["reai_puzzle.clsp", "reai_puzzle_v2.clsp", "reai_puzzle_v3.clsp"]
+
+
+def _search_paths() -> List[Path]:
+    paths = [CLSP_PATH, INCLUDE_PATH]
+    try:
+        import cdv.clibs as std_lib
+
+        paths.append(Path(std_lib.__file__).parent)
+    except ImportError:
+        pass
+    return paths
+
+
+def source_hash(source: Path) -> str:
+    """sha256 of the source and every file it includes."""
+    text = source.read_bytes()
+    h = hashlib.sha256(text)
+    for name in re.findall(rb'\(include\s+"?([^")\s]+)"?\s*\)', text):
+        for path in _search_paths():
+            include = path / name.decode()
+            if include.exists():
+                h.update(include.read_bytes())
+                break
+    return h.hexdigest()
+
+
+def _read_hash_file(hash_file: Path) -> Tuple[Optional[str], Optional[bytes32]]:
+    if not hash_file.exists():
+        return None, None
+    values = dict(line.split() for line in hash_file.read_text().splitlines() if line)
+    return values.get("source_sha256"), bytes32.fromhex(values["mod_hash"])
+
+
+def build_puzzle(name: str, force: bool = False) -> bool:
+    """Compiles `name` if its source changed since the last build, returns True if it did."""
+    source = CLSP_PATH / name
+    hex_file = CLSP_PATH / f"{name}.hex"
+    hash_file = CLSP_PATH / f"{name}.hash"
+    current = source_hash(source)
+    built, _ = _read_hash_file(hash_file)
+    if not force and built == current and hex_file.exists():
+        return False
+
+    from clvm_tools.clvmc import compile_clvm_text
+
+    compiled = compile_clvm_text(source.read_text(), search_paths=[str(p) for p in _search_paths()])
+    puzzle = Program.to(compiled)
+    hex_file.write_text(bytes(puzzle).hex())
+    hash_file.write_text(f"source_sha256 {current}\nmod_hash {puzzle.get_tree_hash()}\n")
+    return True
+
+
+def load_puzzle(name: str) -> Tuple[Program, bytes32]:
+    """
+    Loads the committed puzzle and its tree hash. Never compiles, the
+    includes the source hash covers aren't shipped with the package.
+    """
+    puzzle = Program.fromhex((CLSP_PATH / f"{name}.hex").read_text().strip())
+    _, mod_hash = _read_hash_file(CLSP_PATH / f"{name}.hash")
+    if mod_hash is None:
+        mod_hash = puzzle.get_tree_hash()
+    return puzzle, mod_hash
+
+
+def main():
+    force = "--force" in sys.argv[1:]
+    for name in PUZZLES:
+        if build_puzzle(name, force=force):
+            print(f"Compiled {name}")
+        else:
+            print(f"{name} is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,18 @@
 #!/usr/bin/env python3
 import asyncio
 from functools import wraps
-from chia.util.byte_types import hexstr_to_bytes
 import json
 import click
 from pathlib import Path
 import time
-from reai_nft.wallet import ReaiWallet
-import requests
+from typing import TYPE_CHECKING
+from reai_nft.batch_control import DEFAULT_TARGET_INCLUSION
+from reai_nft.cost import DEFAULT_MAX_COST_FRACTION
 from datetime import datetime
-import urllib3
-import json
+
+if TYPE_CHECKING:
+    from reai_nft.node_client import ReaiNodeClient
+    from reai_nft.wallet import ReaiWallet
 
 VERBOSE = False
 
@@ -29,6 +31,164 @@ def debug(msg):
         click.echo(msg)
 
 
+def multi_op_option(f):
+    return click.option(
+        "--multi-op",
+        is_flag=True,
+        help="Mint with the puzzle that accepts several edits per spend, see apply-edits.",
+    )(f)
+
+
+def check_pairs(pairs, where):
+    if not isinstance(pairs, list) or any(
+        not isinstance(pair, list) or len(pair) != 2 for pair in pairs
+    ):
+        raise click.BadParameter(f"{where} is not a list of [key, value] pairs")
+    return pairs
+
+
+def read_token_data(lines):
+    """
+    Parses the initial data of one token per line, a JSON list of
+    [key, value] pairs, blank lines are skipped.
+    """
+    return [
+        check_pairs(json.loads(line), f"line {number}")
+        for number, line in enumerate(lines, 1)
+        if line.strip()
+    ]
+
+
+def report_failed_chunks(chunks):
+    for chunk in chunks:
+        click.echo(f"{len(chunk.items)} launches failed: {chunk.error}", err=True)
+
+
+def hashed_data_option(f):
+    return click.option(
+        "--hashed-data",
+        is_flag=True,
+        help="Mint with the puzzle that curries only a hash of the data, spends cost "
+             "the same however much data the nft holds but reads replay its history. "
+             "Accepts several edits per spend too.",
+    )(f)
+
+
+def dry_run_option(f):
+    return click.option(
+        "--dry-run",
+        is_flag=True,
+        help="Validate the spend bundle locally without pushing it to the mempool.",
+    )(f)
+
+
+def max_cost_fraction_option(f):
+    return click.option(
+        "--max-cost-fraction",
+        type=float,
+        default=DEFAULT_MAX_COST_FRACTION,
+        help="Split the batch into spend bundles below this fraction of the max block cost, "
+             f"defaults to {DEFAULT_MAX_COST_FRACTION}",
+    )(f)
+
+
+def default_concurrency() -> int:
+    # node_client loads chia, only import it once a command runs
+    from reai_nft.node_client import DEFAULT_CONCURRENCY
+
+    return DEFAULT_CONCURRENCY
+
+
+def concurrency_option(f):
+    return click.option(
+        "--concurrency",
+        type=int,
+        default=default_concurrency,
+        help="number of launcher ids or spends fetched from the node at the same time, "
+             "defaults to the node client's DEFAULT_CONCURRENCY",
+    )(f)
+
+
+class WalletContext:
+    """
+    Connects to the node and logs in to the wallet only once a command
+    enters it, the chia stack is imported at that point too.
+    """
+
+    def __init__(self, fingerprint, config_path, verbose, daemon=None, min_fee=0):
+        self.fingerprint = fingerprint
+        self.config_path = config_path
+        self.verbose = verbose
+        self.daemon = daemon
+        self.min_fee = min_fee
+        self._context = None
+
+    def node_only(self) -> "NodeContext":
+        """Context for read-only commands, connects to the full node only."""
+        return NodeContext(self.config_path, self.verbose)
+
+    def forwarded(self, node_only=False):
+        """
+        Context for commands the daemon can run, a client of the daemon when
+        --daemon is set and a local wallet (or node client) otherwise.
+        """
+        if self.daemon:
+            from reai_nft.daemon_client import DaemonClient, default_token_path, read_token
+
+            if self.min_fee:
+                raise click.BadParameter(
+                    "is not supported when forwarding to the daemon, start `serve` with it",
+                    param_hint="--min-fee",
+                )
+
+            debug(f"Forwarding to daemon at {self.daemon}")
+            token_path = default_token_path(self.config_path)
+            try:
+                token = read_token(token_path)
+            except OSError as e:
+                raise click.BadParameter(
+                    f"can't read the daemon token from {token_path}: {e}", param_hint="--daemon"
+                )
+            return DaemonClient(self.daemon, token, verbose=self.verbose)
+        return self.node_only() if node_only else self
+
+    async def __aenter__(self):
+        from reai_nft.wallet import ReaiWallet
+
+        debug("Connecting to wallet...")
+        self._context = ReaiWallet.create(self.fingerprint, self.config_path, verbose=self.verbose)
+        wallet = await self._context.__aenter__()
+        wallet.min_fee = self.min_fee
+        return wallet
+
+    async def __aexit__(self, *exc_info):
+        return await self._context.__aexit__(*exc_info)
+
+
+class NodeContext:
+    def __init__(self, config_path, verbose):
+        self.config_path = config_path
+        self.verbose = verbose
+        self._context = None
+
+    async def __aenter__(self):
+        from reai_nft.node_client import ReaiNodeClient
+
+        debug("Connecting to full node...")
+        self._context = ReaiNodeClient.create(self.config_path, verbose=self.verbose)
+        return await self._context.__aenter__()
+
+    async def __aexit__(self, *exc_info):
+        return await self._context.__aexit__(*exc_info)
+
+
+class BytesDump(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, bytes):
+            return obj.decode()
+        return json.JSONEncoder.default(self, obj)
+
+
 def parse_launcher(ctx, param, value):
     try:
         if not value:
@@ -41,7 +201,7 @@ def parse_launcher(ctx, param, value):
             )
         if value[:2] != "0x":
             raise click.BadArgumentUsage("Launcher ID must start with 0x")
-        return hexstr_to_bytes(value)
+        return bytes.fromhex(value[2:])
     except click.BadArgumentUsage:
         raise
     except Exception as e:
@@ -60,15 +220,27 @@ def parse_launcher(ctx, param, value):
     default=None,
 )
 @click.option("-v", "--verbose", help="Show more debugging info.", is_flag=True)
+@click.option(
+    "--daemon",
+    envvar="REAI_NFT_DAEMON",
+    default=None,
+    help="Forward mint, mk, add-pair and get-data to a running `reai-nft serve`, "
+         "http://host:port or unix:/path/to/socket. Defaults to the REAI_NFT_DAEMON env var.",
+)
+@click.option(
+    "--min-fee",
+    type=int,
+    default=0,
+    help="Refuse to push spend bundles paying less than this many mojos in fees, "
+         "checked locally before pushing. Defaults to 0.",
+)
 @click.pass_context
-def cli(ctx, config_path, fingerprint, verbose):
+def cli(ctx, config_path, fingerprint, verbose, daemon, min_fee):
     """Manage reai nft on Chia network."""
     if verbose:
         global VERBOSE
         VERBOSE = True
-    debug(f"Connecting to wallet...")
-    wallet = ReaiWallet.create(fingerprint, config_path, verbose=verbose)
-    ctx.obj = wallet
+    ctx.obj = WalletContext(fingerprint, config_path, verbose, daemon, min_fee)
 
 
 @click.command(
@@ -83,17 +255,46 @@ def cli(ctx, config_path, fingerprint, verbose):
 )
 @click.option(
     "-k",
-    type=int,
+    type=click.IntRange(min=1),
     default=50,
     help="number of tokens to mint",
 )
+@max_cost_fraction_option
+@click.option(
+    "--workers",
+    type=int,
+    default=0,
+    help="number of processes signing the batch, defaults to 0 (sign in-process)",
+)
+@click.option(
+    "--data-file",
+    type=click.File("r"),
+    default=None,
+    help="JSON lines, mint one token per line, each a JSON list of [key, value] pairs of "
+         "initial data like mint --data-file takes (overrides -k)",
+)
+@multi_op_option
+@hashed_data_option
+@dry_run_option
 @coro
 @click.pass_context
-async def mint_k(ctx, fee, k):
+async def mint_k(ctx, fee, k, max_cost_fraction, workers, data_file, multi_op, hashed_data, dry_run):
+    data = read_token_data(data_file) if data_file else None
+    if data == []:
+        raise click.BadParameter("holds no tokens", param_hint="--data-file")
     wallet: ReaiWallet
-    async with ctx.obj as wallet:
+    async with ctx.obj.forwarded() as wallet:
+        wallet.dry_run = dry_run
+        wallet.set_signing_workers(workers)
         debug("Minting a new coin for wallet: %s" % wallet.wallet_address)
-        res = await wallet.mint_k(fee=fee, k=k)
+        res = await wallet.mint_k(
+            fee=fee,
+            k=k,
+            max_cost_fraction=max_cost_fraction,
+            multi_op=multi_op,
+            data=data,
+            hashed_data=hashed_data,
+        )
         if res[0]:
             if res[1] is not None and len(res[1]) > 0:
                 for _, item in enumerate(res[1]):
@@ -106,6 +307,7 @@ async def mint_k(ctx, fee, k):
                 click.echo(
                     f"Fee: {fee} mojos"
                 )
+            report_failed_chunks(res[2])
         else:
             click.echo("Number of coins < k")
 
@@ -141,11 +343,13 @@ async def get_number_of_available_coins(ctx):
     default=0,
     help="Transaction fee, defaults to 0",
 )
+@dry_run_option
 @coro
 @click.pass_context
-async def split_largest_coin_into_k(ctx, k, fee):
+async def split_largest_coin_into_k(ctx, k, fee, dry_run):
     wallet: ReaiWallet
     async with ctx.obj as wallet:
+        wallet.dry_run = dry_run
         res = await wallet.split_largest_coin_into_k(k=k, fee=fee)
         if res:
             click.echo("success. submitted into mempool")
@@ -160,13 +364,26 @@ async def split_largest_coin_into_k(ctx, k, fee):
     default=0,
     help="Transaction fee, defaults to 0",
 )
+@click.option(
+    "--data-file",
+    type=click.File("r"),
+    default=None,
+    help="JSON list of [key, value] pairs the nft starts with, one line of mk --data-file",
+)
+@multi_op_option
+@hashed_data_option
+@dry_run_option
 @coro
 @click.pass_context
-async def mint(ctx, fee):
+async def mint(ctx, fee, data_file, multi_op, hashed_data, dry_run):
+    data = check_pairs(json.load(data_file), data_file.name) if data_file else None
     wallet: ReaiWallet
-    async with ctx.obj as wallet:
+    async with ctx.obj.forwarded() as wallet:
+        wallet.dry_run = dry_run
         debug("Minting a new coin for wallet: %s" % wallet.wallet_address)
-        tx_id, launcher_id = await wallet.mint(fee=fee)
+        tx_id, launcher_id = await wallet.mint(
+            fee=fee, multi_op=multi_op, data=data, hashed_data=hashed_data
+        )
         debug("Got back tx_id: %s, launcher_id: %s" % (tx_id, launcher_id))
         if tx_id and launcher_id:
             pretty_data = {
@@ -175,12 +392,6 @@ async def mint(ctx, fee):
                 "fee_in_mojos": f"{fee}",
             }
 
-            class BytesDump(json.JSONEncoder):
-                def default(self, obj):
-                    if isinstance(obj, bytes):
-                        return obj.decode()
-                    return json.JSONEncoder.default(self, obj)
-
             click.echo(json.dumps(pretty_data, cls=BytesDump))
 
         else:
@@ -206,118 +417,201 @@ async def mint(ctx, fee):
     default="./",
     help="file path for launcher id and transaction id to be stored",
 )
+@click.option(
+    "--pipeline-depth",
+    type=int,
+    default=1,
+    help="number of unconfirmed batches allowed in flight, defaults to 1 (serial)",
+)
+@max_cost_fraction_option
+@click.option(
+    "--workers",
+    type=int,
+    default=0,
+    help="number of processes signing the batch, defaults to 0 (sign in-process)",
+)
+@click.option(
+    "--adaptive",
+    is_flag=True,
+    help="Adjust the batch size and the split size to the time to inclusion, rejections "
+         "and cost of previous batches, starting from --batchsize.",
+)
+@click.option("--min-batchsize", type=int, default=1, help="lowest adaptive batch size, defaults to 1")
+@click.option("--max-batchsize", type=int, default=200, help="highest adaptive batch size, defaults to 200")
+@click.option("--min-split", type=int, default=10, help="lowest adaptive split size, defaults to 10")
+@click.option("--max-split", type=int, default=400, help="highest adaptive split size, defaults to 400")
+@click.option(
+    "--target-inclusion",
+    type=float,
+    default=DEFAULT_TARGET_INCLUSION,
+    help=f"seconds a batch may wait for inclusion before the adaptive batch size "
+         f"shrinks, defaults to {DEFAULT_TARGET_INCLUSION}",
+)
+@click.option(
+    "--keep-coins",
+    type=int,
+    default=0,
+    help="Keep about this many coins ready by splitting in the background, batches then "
+         "mint with the coins at hand instead of waiting for a split. Defaults to 0 (off)",
+)
+@click.option(
+    "--fee-budget",
+    type=int,
+    default=None,
+    help="mojos on top of the 1 mojo of a token in each coin kept ready, defaults to --fee",
+)
+@dry_run_option
 @coro
 @click.pass_context
-async def mint_in_batch_no_stop(ctx, fee, batchsize, filepath):
+async def mint_in_batch_no_stop(
+        ctx, fee, batchsize, filepath, pipeline_depth, max_cost_fraction, workers, adaptive,
+        min_batchsize, max_batchsize, min_split, max_split, target_inclusion, keep_coins,
+        fee_budget, dry_run,
+):
     file_name_prefix = "tokens_information."
     file_suffix = ".rtoken"
     cur_timestamp = str(int(time.time()))
     full_file_path = filepath + file_name_prefix + cur_timestamp + file_suffix
 
-    urllib3.disable_warnings()
     global submitted_split_request
     submitted_split_request = False
 
     restart_message = "restart process in 2 seconds\n"
 
-    def print_message_and_sleep(message):
+    async def print_message_and_sleep(message):
         t = datetime.now()
         t_str = t.strftime("%d-%b-%Y (%H:%M:%S.%f)")
         click.echo(message + ", " + t_str)
-        time.sleep(2)
-
-    def print_restart_message_and_sleep():
-        print_message_and_sleep(restart_message)
+        await asyncio.sleep(2)
 
-    def curl_coin_information(ids_and_txs):
-        headers = {'Content-Type': 'application/json'}
-        url = "https://localhost:8555/get_coin_record_by_name"
+    async def print_restart_message_and_sleep():
+        await print_message_and_sleep(restart_message)
 
-        global retry_count
-        retry_count = 0
+    async def record_confirmations(ids_and_txs, pushed_at):
+        from reai_nft.confirmation import ConfirmationTracker
 
-        for cur_item in ids_and_txs:
-            data_fetched = False
-            if retry_count >= 150:
-                break
+        tracker = ConfirmationTracker(wallet.node_client)
+        for launcher_id, tx_id in ids_and_txs:
+            tracker.add(launcher_id, tx_id)
+        included_at = pushed_at
+        async for confirmed in tracker.confirmations():
+            included_at = time.monotonic()
+            click.echo(f"block confirmed. working on adding detail information for {len(confirmed)} launcher ids")
+            for coin_record, tx_id in confirmed:
+                launcher_id = coin_record.coin.name()
+                height = coin_record.confirmed_block_index
+                ts = coin_record.timestamp
+                f.write(f"0x{launcher_id},0x{tx_id},{height},{ts}\n")
+                click.echo(f"write into file:0x{launcher_id},0x{tx_id},{height},{ts}\n")
+        if tracker.pending:
+            click.echo(f"{len(tracker.pending)} launcher ids were not confirmed in time", err=True)
+            for launcher_id, tx_id in tracker.pending.items():
+                click.echo(f"unconfirmed: 0x{launcher_id},0x{tx_id}", err=True)
+        if controller:
+            controller.record_inclusion(
+                len(ids_and_txs), len(ids_and_txs) - len(tracker.pending), included_at - pushed_at
+            )
 
-            while not data_fetched and retry_count < 150:
-                try:
-                    current_launcher_id = cur_item[0]
-                    current_tx_id = cur_item[1]
-                    data_to_post = '{"name":"%s"}' % current_launcher_id
-                    cert = ('./private_full_node.crt', './private_full_node.key')
-                    response = json.loads(requests.post(url, data=data_to_post, headers=headers, cert=cert, verify=False).text)
-                    try:
-                        if not response['success']:
-                            print_message_and_sleep("HappyPath: block seems not confirmed")
-                            print_restart_message_and_sleep()
-                            retry_count = retry_count + 1
-                        else:
-                            click.echo(f"block confirmed. working on adding detail information for launch_id: 0x{current_launcher_id}")
-                            try:
-                                height = response['coin_record']['confirmed_block_index']
-                                ts = response['coin_record']['timestamp']
-                                f.write(f"0x{current_launcher_id},0x{current_tx_id},{height},{ts}\n")
-                                click.echo(f"write into file:0x{current_launcher_id},0x{current_tx_id},{height},{ts}\n")
-                                data_fetched = True
-                                time.sleep(0.05)
-                            except Exception as er:
-                                click.echo("error trying to fetch coin after getting success result: ", err=True)
-                                click.echo(er)
-                                print_restart_message_and_sleep()
-                    except Exception as ee:
-                        click.echo("error trying to get 'success' field in result", err=True)
-                        click.echo(ee)
-                        print_restart_message_and_sleep()
-                except Exception as e:
-                    click.echo("error trying to fetch coin information: ", err=True)
-                    click.echo(e)
-                    print_restart_message_and_sleep()
+    def report_failures(done):
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                click.echo(f"Recording confirmations failed: {task.exception()!r}", err=True)
 
     async with ctx.obj as wallet:
+        wallet: ReaiWallet
+        wallet.dry_run = dry_run
+        wallet.set_signing_workers(workers)
+        fle = Path(full_file_path)
+        fle.touch(exist_ok=True)
+        # line buffered, confirmations are written as they arrive
+        f = open(fle, 'a', buffering=1)
+        # batches pushed to the mempool and still waiting for confirmation
+        in_flight = set()
+        controller = None
+        if adaptive:
+            from reai_nft.batch_control import BatchController
+            from reai_nft.cost import max_spend_bundle_cost
+
+            controller = BatchController(
+                batchsize,
+                min_batchsize,
+                max_batchsize,
+                min_split,
+                max_split,
+                target_inclusion,
+                # batches in flight together may land in the same block
+                max_batch_cost=max_spend_bundle_cost(1) // max(pipeline_depth, 1),
+                log=lambda message: click.echo(f"Adaptive: {message}"),
+            )
+        keeper = None
+        if keep_coins > 0 and not dry_run:
+            from reai_nft.pool_keeper import CoinPoolKeeper
+
+            keeper = CoinPoolKeeper(
+                wallet,
+                keep_coins,
+                fee_budget=fee if fee_budget is None else fee_budget,
+                fee=fee,
+                log=lambda message: click.echo(f"PoolKeeper: {message}"),
+            )
+            keeper.start()
+
         global keep_minting
         keep_minting = Path('keep_minting_flag').read_text()
-        while keep_minting.startswith("1"):
-
-            wallet: ReaiWallet
-            fle = Path(full_file_path)
-            fle.touch(exist_ok=True)
-            f = open(fle, 'a')
+        dry_run_done = False
+        while keep_minting.startswith("1") and not dry_run_done:
+            # a dry run validates a single batch
+            dry_run_done = dry_run
+            if len(in_flight) >= max(pipeline_depth, 1):
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                report_failures(done)
 
-            # fetch number of available coins
+            # fetch number of available coins, coins spent by in flight batches are excluded
             try:
-                n = await wallet.get_number_of_coins_available()
+                if keeper:
+                    # the coin the keeper splits next is left out
+                    n = await keeper.mintable_coins()
+                else:
+                    n = await wallet.get_number_of_coins_available()
             except Exception as error:
                 click.echo("error getting number of coins available: ", err=True)
                 click.echo(error)
-                print_restart_message_and_sleep()
+                await print_restart_message_and_sleep()
                 continue
 
             click.echo(f"HappyPath: There are {n} coins available now")
+            k = controller.k if controller else batchsize
 
+            if keeper:
+                # the keeper splits in the background, mint with the coins at hand
+                if n == 0:
+                    await print_message_and_sleep("HappyPath: waiting for the pool keeper's coins")
+                    keep_minting = Path('keep_minting_flag').read_text()
+                    continue
+                k = min(k, n)
             # check whether there are enough coins and split the largest one if needed
-            if n < batchsize:
+            elif n < k:
                 if submitted_split_request:
                     click.echo("HappyPath: already submitted a split request. ")
-                    print_restart_message_and_sleep()
+                    await print_restart_message_and_sleep()
                     continue
 
                 try:
-                    success = await wallet.split_largest_coin_into_k(k=20, fee=fee)
+                    split_size = controller.split_size if controller else 20
+                    success = await wallet.split_largest_coin_into_k(k=split_size, fee=fee)
                     if success:
                         submitted_split_request = True
                         click.echo("submitted split request")
-                        print_restart_message_and_sleep()
+                        await print_restart_message_and_sleep()
                     else:
                         click.echo("failed when splitting coins")
-                        print_restart_message_and_sleep()
+                        await print_restart_message_and_sleep()
                         continue
 
                 except Exception as error:
                     click.echo("error splitting the largest coin: ", err=True)
                     click.echo(error)
-                    print_restart_message_and_sleep()
+                    await print_restart_message_and_sleep()
                     continue
 
             else:
@@ -325,30 +619,52 @@ async def mint_in_batch_no_stop(ctx, fee, batchsize, filepath):
 
             # mint k coins in one spend
             try:
-                click.echo(f"HappyPath: Now try to mint {batchsize} coins in one spend")
-                res = await wallet.mint_k(fee=fee, k=batchsize)
+                click.echo(f"HappyPath: Now try to mint {k} coins in one spend")
+                pushed_at = time.monotonic()
+                res = await wallet.mint_k(
+                    fee=fee,
+                    k=k,
+                    max_cost_fraction=max_cost_fraction,
+                    # the smallest coins the keeper doesn't split
+                    choose=keeper.choose_mint_coins if keeper else None,
+                )
+                if res[0] and controller:
+                    controller.record_cost(wallet.launch_cost)
+                    controller.record_rejection(k, k - len(res[1]))
                 if res[0]:
+                    report_failed_chunks(res[2])
                     if res[1] is not None and len(res[1]) > 0:
                         ids_and_txs = []
                         for _, item in enumerate(res[1]):
                             tx_id = item[0]
                             launcher_id = item[1]
                             ids_and_txs.append([launcher_id, tx_id])
-                        curl_coin_information(ids_and_txs)
+                        if not dry_run:
+                            in_flight.add(
+                                asyncio.create_task(record_confirmations(ids_and_txs, pushed_at))
+                            )
                     else:
                         click.echo("after mint k, no coins were minted so some reason")
-                        print_restart_message_and_sleep()
+                        await print_restart_message_and_sleep()
                 else:
                     click.echo("in mint_k, get results back but failed for some reason")
-                    print_restart_message_and_sleep()
+                    await print_restart_message_and_sleep()
             except Exception as error:
                 click.echo("error doing mint_k", err=True)
                 click.echo(error)
-                print_restart_message_and_sleep()
+                if controller:
+                    controller.record_rejection(k, k)
+                await print_restart_message_and_sleep()
 
-            f.close()
             keep_minting = Path('keep_minting_flag').read_text()
 
+        if keeper:
+            await keeper.stop()
+        if in_flight:
+            click.echo(f"Waiting for {len(in_flight)} batches to be confirmed")
+            done, _ = await asyncio.wait(in_flight)
+            report_failures(done)
+        f.close()
         click.echo("Detected changes in keep_minting_flag. Gracefully quit.")
 
 
@@ -365,11 +681,13 @@ async def mint_in_batch_no_stop(ctx, fee, batchsize, filepath):
 @click.argument("launcher-id", callback=parse_launcher)
 @click.argument("key", type=str)
 @click.argument("value", type=str)
+@dry_run_option
 @coro
 @click.pass_context
-async def add_pair(ctx, launcher_id, key, value, fee):
+async def add_pair(ctx, launcher_id, key, value, fee, dry_run):
     wallet: ReaiWallet
-    async with ctx.obj as wallet:
+    async with ctx.obj.forwarded() as wallet:
+        wallet.dry_run = dry_run
         debug(
             f"Adding pair ({repr(key)}, {repr(value)}) to reai nft: {launcher_id.hex()}"
         )
@@ -389,16 +707,134 @@ async def add_pair(ctx, launcher_id, key, value, fee):
 )
 @click.argument("launcher-id", callback=parse_launcher)
 @click.argument("index", type=int)
+@dry_run_option
 @coro
 @click.pass_context
-async def remove_pair_at(ctx, launcher_id, index: int, fee: int):
+async def remove_pair_at(ctx, launcher_id, index: int, fee: int, dry_run):
     wallet: ReaiWallet
     async with ctx.obj as wallet:
+        wallet.dry_run = dry_run
         debug(f"Removing pair at index {index} from reai NFT: {launcher_id}")
         tx_id = await wallet.remove_pair_at(launcher_id, index, fee)
         click.echo(f"Removed pair at {index} using transaction: {tx_id}")
 
 
+def read_edits(edits_file):
+    """
+    Parses a JSON list of edits, ["add", key, value] or ["remove", index],
+    into (Operation, value) tuples.
+    """
+    from reai_nft.node_client import Operation
+
+    edits = []
+    for edit in json.load(edits_file):
+        if not isinstance(edit, list) or not edit:
+            raise click.BadParameter(f"Not a valid edit: {edit}")
+        if edit[0] == "add" and len(edit) == 3:
+            edits.append((Operation.ADD, (edit[1], edit[2])))
+        elif edit[0] == "remove" and len(edit) == 2 and isinstance(edit[1], int):
+            edits.append((Operation.REMOVE, edit[1]))
+        else:
+            raise click.BadParameter(f"Not a valid edit: {edit}")
+    return edits
+
+
+@click.command(name="apply-edits")
+@click.option(
+    "--fee",
+    type=int,
+    default=0,
+    help="Transaction fee, defaults to 0",
+)
+@click.argument("launcher-id", callback=parse_launcher)
+@click.argument("edits-file", type=click.File("r"), default="-")
+@dry_run_option
+@coro
+@click.pass_context
+async def apply_edits(ctx, launcher_id, edits_file, fee, dry_run):
+    """
+    Applies a JSON list of edits from EDITS_FILE (stdin by default) in one spend,
+    in order, e.g. [["add", "key", "value"], ["remove", 3]].
+
+    Only works on mutable coins minted with --multi-op or --hashed-data.
+    """
+    edits = read_edits(edits_file)
+    wallet: ReaiWallet
+    async with ctx.obj as wallet:
+        wallet.dry_run = dry_run
+        debug(f"Applying {len(edits)} edits to reai nft: {launcher_id.hex()}")
+        tx_id = await wallet.apply_edits(launcher_id, edits, fee=fee)
+        click.echo(f"Applied {len(edits)} edits using transaction: {tx_id}")
+
+
+def read_bulk_operations(lines):
+    """
+    Parses one JSON object per line, {"launcher_id": "0x..", "op": ...} with
+    op "add" and "key"/"value", "remove" and "index", "freeze", or "owner"
+    and "new_pub_key".
+    """
+    items = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            launcher_id = parse_launcher(None, None, entry["launcher_id"])
+            op = entry["op"]
+            if op == "add":
+                operation = ("add", (entry["key"], entry["value"]))
+            elif op == "remove":
+                operation = ("remove", int(entry["index"]))
+            elif op == "freeze":
+                operation = ("freeze",)
+            elif op == "owner":
+                operation = ("owner", entry["new_pub_key"])
+            else:
+                raise ValueError(f"unknown op {op}")
+        except (ValueError, KeyError, TypeError, click.BadArgumentUsage) as e:
+            raise click.BadParameter(f"line {number}: {e}")
+        items.append((launcher_id, operation))
+    return items
+
+
+@click.command(name="bulk-edit")
+@click.argument("input-file", type=click.File("r"), default="-")
+@click.option(
+    "--fee",
+    type=int,
+    default=0,
+    help="Transaction fee shared by the whole batch, defaults to 0",
+)
+@max_cost_fraction_option
+@concurrency_option
+@dry_run_option
+@coro
+@click.pass_context
+async def bulk_edit(ctx, input_file, fee, max_cost_fraction, concurrency, dry_run):
+    """
+    Applies one operation per line of INPUT_FILE (stdin by default) to many reai
+    nfts in aggregated spend bundles, e.g.
+    {"launcher_id": "0x..", "op": "add", "key": "k", "value": "v"}.
+
+    Prints one JSON line per launcher id with its transaction or error.
+    """
+    items = read_bulk_operations(input_file)
+    wallet: ReaiWallet
+    async with ctx.obj as wallet:
+        wallet.dry_run = dry_run
+        debug(f"Applying {len(items)} operations")
+        results = await wallet.mutate_many(
+            items, fee=fee, max_cost_fraction=max_cost_fraction, concurrency=concurrency
+        )
+        for result in results:
+            line = {"launcher_id": f"0x{result.launcher_id.hex()}"}
+            if result.error:
+                line["error"] = str(result.error) or repr(result.error)
+            else:
+                line["transaction_id"] = f"0x{result.transaction_id}"
+            click.echo(json.dumps(line))
+
+
 @click.command(name="freeze", help="Freezing makes the coin immutable")
 @click.option(
     "--fee",
@@ -407,11 +843,13 @@ async def remove_pair_at(ctx, launcher_id, index: int, fee: int):
     help="Transaction fee, defaults to 0",
 )
 @click.argument("launcher-id", callback=parse_launcher)
+@dry_run_option
 @coro
 @click.pass_context
-async def freeze(ctx, launcher_id, fee):
+async def freeze(ctx, launcher_id, fee, dry_run):
     wallet: ReaiWallet
     async with ctx.obj as wallet:
+        wallet.dry_run = dry_run
         debug(f"Freezing reai nft: {launcher_id}")
         tx_id = await wallet.freeze(launcher_id, fee=fee)
         click.echo(f"Reai NFT frozen using transaction: {tx_id}")
@@ -428,11 +866,13 @@ async def freeze(ctx, launcher_id, fee):
 )
 @click.argument("launcher-id", callback=parse_launcher)
 @click.argument("new-pub-key")
+@dry_run_option
 @coro
 @click.pass_context
-async def change_owner(ctx, launcher_id, new_pub_key, fee):
+async def change_owner(ctx, launcher_id, new_pub_key, fee, dry_run):
     wallet: ReaiWallet
     async with ctx.obj as wallet:
+        wallet.dry_run = dry_run
         debug(f"Changing ownership to {new_pub_key} on reai nft: {launcher_id}")
         tx_id = await wallet.set_ownership(launcher_id, new_pub_key, fee=fee)
         click.echo(f"Ownership changed to {new_pub_key} using transaction: {tx_id}")
@@ -444,35 +884,226 @@ async def change_owner(ctx, launcher_id, new_pub_key, fee):
 @click.pass_context
 async def get_data(ctx, launcher_id):
     """Returns a JSON of coin data and metadata"""
-    wallet: ReaiWallet
-    async with ctx.obj as wallet:
+    client: ReaiNodeClient
+    async with ctx.obj.forwarded(node_only=True) as client:
         debug(f"Fetching data for reai nft: {launcher_id.hex()}")
-        data = await wallet.get_data(launcher_id)
+        data = await client.get_data(launcher_id)
         debug(f"Got back data: {data}")
         pretty_data = {
             "version": data[0],
             "data": [(i, x) for i, x in enumerate(data[1])],
         }
+        click.echo(json.dumps(pretty_data, cls=BytesDump))
 
-        class BytesDump(json.JSONEncoder):
-            def default(self, obj):
-                if isinstance(obj, bytes):
-                    return obj.decode()
-                return json.JSONEncoder.default(self, obj)
 
-        click.echo(json.dumps(pretty_data, cls=BytesDump))
+def read_launcher_ids(lines):
+    """
+    Parses one launcher id per line, lines of the files written by
+    mint-in-batch-no-stop work too (the launcher id comes first).
+    """
+    for line in lines:
+        value = line.strip().split(",")[0]
+        if not value:
+            continue
+        try:
+            if len(value) != 66 or value[:2] != "0x":
+                raise ValueError
+            yield bytes.fromhex(value[2:])
+        except ValueError:
+            click.echo(json.dumps({"launcher_id": value, "error": "Not a valid launcher ID"}), err=True)
+
+
+@click.command(name="get-data-bulk")
+@click.argument("input-file", type=click.File("r"), default="-")
+@concurrency_option
+@coro
+@click.pass_context
+async def get_data_bulk(ctx, input_file, concurrency):
+    """
+    Streams one JSON line of coin data per launcher id read from INPUT_FILE
+    (stdin by default), in completion order.
+    """
+    client: ReaiNodeClient
+    async with ctx.obj.node_only() as client:
+        async for result in client.get_data_many(read_launcher_ids(input_file), concurrency):
+            if result.error:
+                line = {"launcher_id": f"0x{result.launcher_id.hex()}", "error": str(result.error)}
+            else:
+                line = {
+                    "launcher_id": f"0x{result.launcher_id.hex()}",
+                    "version": result.version,
+                    "data": [(i, x) for i, x in enumerate(result.data)],
+                }
+            click.echo(json.dumps(line, cls=BytesDump))
+
+
+@click.command(name="history")
+@click.argument("launcher-id", callback=parse_launcher)
+@concurrency_option
+@coro
+@click.pass_context
+async def history(ctx, launcher_id, concurrency):
+    """
+    Streams one JSON line per version of the coin data, oldest first, with the
+    block height it took effect at.
+    """
+    client: ReaiNodeClient
+    async with ctx.obj.node_only() as client:
+        async for entry in client.get_history(launcher_id, concurrency):
+            line = {
+                "version": entry.version,
+                "height": entry.height,
+                "data": [(i, x) for i, x in enumerate(entry.data)],
+            }
+            click.echo(json.dumps(line, cls=BytesDump))
+
+
+def parse_pub_key(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        from blspy import G1Element
+
+        return G1Element.from_bytes(bytes.fromhex(value[2:] if value[:2] == "0x" else value))
+    except Exception:
+        raise click.BadParameter("Not a valid hex encoded public key")
+
+
+@click.command(name="index")
+@click.option(
+    "--pub-key",
+    callback=parse_pub_key,
+    default=None,
+    help="Index the reai nfts launched for this public key (hex), defaults to the wallet's.",
+)
+@click.option(
+    "--start-height",
+    type=int,
+    default=0,
+    help="Height the first scan starts at, later scans resume from the last indexed block. "
+         "Defaults to 0",
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    default=32,
+    help="number of blocks fetched at the same time, defaults to 32",
+)
+@click.option("--follow", is_flag=True, help="Keep indexing new blocks until interrupted.")
+@coro
+@click.pass_context
+async def index(ctx, pub_key, start_height, batch_size, follow):
+    """
+    Scans the chain for the reai nfts launched for a public key and keeps their
+    owner, current singleton and version in a local index, see list-nfts.
+    """
+    from reai_nft.indexer import ChainIndexer, IndexStore, default_index_db_path
+
+    context = ctx.obj.node_only() if pub_key is not None else ctx.obj
+    async with context as client:
+        if pub_key is None:
+            pub_key = client.signing.pk
+        store = IndexStore(default_index_db_path(ctx.obj.config_path))
+        try:
+            indexer = ChainIndexer(
+                client.node_client, store, pub_key, batch_size, verbose=ctx.obj.verbose
+            )
+            if follow:
+                await indexer.follow(start_height)
+            else:
+                height = await indexer.scan(start_height)
+                click.echo(f"Indexed up to height {height}")
+        finally:
+            store.close()
+
+
+@click.command(name="list-nfts")
+@click.option(
+    "--owner",
+    callback=parse_pub_key,
+    default=None,
+    help="Only list the reai nfts owned by this public key (hex).",
+)
+@click.pass_context
+def list_nfts(ctx, owner):
+    """Streams one JSON line per reai nft found by index, oldest first."""
+    from reai_nft.indexer import IndexStore, default_index_db_path
+
+    store = IndexStore(default_index_db_path(ctx.obj.config_path))
+    try:
+        for nft in store.get_nfts(bytes(owner) if owner is not None else None):
+            line = {
+                "launcher_id": f"0x{nft.launcher_id.hex()}",
+                "owner": f"0x{nft.owner.hex()}",
+                "tip_id": f"0x{nft.tip_id.hex()}",
+                "version": nft.version,
+                "height": nft.height,
+            }
+            click.echo(json.dumps(line))
+    finally:
+        store.close()
+
+
+@click.command(name="serve")
+@click.option("--host", default="127.0.0.1", help="Address to listen on, defaults to 127.0.0.1")
+@click.option("--port", type=int, default=8765, help="Port to listen on, defaults to 8765")
+@click.option("--socket", "socket_path", default=None, help="Listen on this unix socket instead")
+@click.option(
+    "--workers",
+    type=int,
+    default=0,
+    help="number of processes signing mk batches, defaults to 0 (sign in-process)",
+)
+@click.option(
+    "--chain-mempool",
+    is_flag=True,
+    help="Let add-pair spend an nft whose previous edit is still in the mempool, "
+         "the edits are pushed together and replace the pending one, so they need a --fee "
+         "of at least 10000000 mojos.",
+)
+@coro
+@click.pass_context
+async def serve(ctx, host, port, socket_path, workers, chain_mempool):
+    """
+    Keeps one wallet logged in and serves mint, mint_k, add_pair and get_data
+    over a local HTTP API until interrupted. Clients authenticate with the
+    token in reai_nft/daemon_token under the Chia root.
+    """
+    from reai_nft.daemon_client import default_token_path
+    from reai_nft.server import ReaiServer, load_or_create_token
+
+    token = load_or_create_token(default_token_path(ctx.obj.config_path))
+
+    wallet: ReaiWallet
+    async with ctx.obj as wallet:
+        wallet.set_signing_workers(workers)
+        wallet.chain_mempool = chain_mempool
+        server = ReaiServer(wallet, token)
+        address = await server.start(host, port, socket_path)
+        click.echo(f"Serving reai nft wallet {wallet.wallet_address} on {address}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
 
 
 cli.add_command(mint)
 cli.add_command(mint_k)
 cli.add_command(add_pair)
 cli.add_command(remove_pair_at)
+cli.add_command(apply_edits)
+cli.add_command(bulk_edit)
 cli.add_command(change_owner)
 cli.add_command(get_data)
+cli.add_command(get_data_bulk)
+cli.add_command(history)
+cli.add_command(index)
+cli.add_command(list_nfts)
 cli.add_command(freeze)
 cli.add_command(get_number_of_available_coins)
 cli.add_command(split_largest_coin_into_k)
 cli.add_command(mint_in_batch_no_stop)
+cli.add_command(serve)
 
 if __name__ == "__main__":
     cli()
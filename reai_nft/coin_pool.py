@@ -0,0 +1,144 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from chia.rpc.full_node_rpc_client import FullNodeRpcClient
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_record import CoinRecord
+from chia.types.spend_bundle import SpendBundle
+
+
+@dataclass
+class PendingSpend:
+    removals: Set[bytes32]
+    change: List[Coin]
+    pushed_at: float
+    checked_at: float = field(default=0)
+
+
+class CoinPool:
+    """
+    Keeps track of the wallet coins used by spends this process is building
+    (reserved) or has pushed to the mempool (pending), so concurrent
+    operations never pick the same coin twice.
+
+    Pending spends are forgotten once their coins leave the unspent set
+    (confirmed, the change then shows up as regular unspent coins) or once
+    the transaction is no longer in the mempool (dropped).
+    """
+
+    def __init__(
+            self,
+            node_client: FullNodeRpcClient,
+            puzzle_hash: bytes32,
+            reservation_timeout: float = 120,
+            mempool_check_interval: float = 60,
+    ):
+        self.node_client = node_client
+        self.puzzle_hash = puzzle_hash
+        self.reservation_timeout = reservation_timeout
+        self.mempool_check_interval = mempool_check_interval
+        # coin id -> reservation time
+        self.reserved: Dict[bytes32, float] = {}
+        # tx id -> pending spend
+        self.pending: Dict[bytes32, PendingSpend] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # made on first use, so the pool can be built outside the event loop
+        # it runs in (before Python 3.10 a Lock binds to the current loop)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def locked_coin_ids(self) -> Set[bytes32]:
+        locked = set(self.reserved.keys())
+        for pending in self.pending.values():
+            locked.update(pending.removals)
+        return locked
+
+    def incoming_change(self) -> List[Coin]:
+        """Change coins created by pending spends, usable once they confirm."""
+        return [coin for pending in self.pending.values() for coin in pending.change]
+
+    async def _expire(self, unspent_ids: Set[bytes32]):
+        now = time.monotonic()
+        for coin_id, reserved_at in list(self.reserved.items()):
+            if coin_id not in unspent_ids or now - reserved_at > self.reservation_timeout:
+                del self.reserved[coin_id]
+        for tx_id, pending in list(self.pending.items()):
+            if not pending.removals & unspent_ids:
+                # confirmed
+                del self.pending[tx_id]
+            elif (
+                    now - pending.pushed_at > self.mempool_check_interval
+                    and now - pending.checked_at > self.mempool_check_interval
+            ):
+                pending.checked_at = now
+                if await self.node_client.get_mempool_item_by_tx_id(tx_id) is None:
+                    # dropped from the mempool, coins are usable again
+                    del self.pending[tx_id]
+
+    async def _usable_coins(self) -> List[Coin]:
+        unspent_coin_records: List[
+            CoinRecord
+        ] = await self.node_client.get_coin_records_by_puzzle_hash(
+            self.puzzle_hash, include_spent_coins=False
+        )
+        unspent = {
+            coin_record.coin.name(): coin_record.coin
+            for coin_record in unspent_coin_records
+            if coin_record.coin.amount > 0 and not coin_record.spent
+        }
+        await self._expire(set(unspent.keys()))
+        locked = self.locked_coin_ids()
+        return [coin for coin_id, coin in unspent.items() if coin_id not in locked]
+
+    async def available_coins(self) -> List[Coin]:
+        async with self.lock:
+            return await self._usable_coins()
+
+    async def acquire(
+            self, k: int = 1, choose: Optional[Callable[[List[Coin], int], List[Coin]]] = None
+    ) -> List[Coin]:
+        """
+        Reserves k usable coins, picked by `choose(coins, k)` (the first k by
+        default). Returns an empty list if fewer than k coins are usable.
+        """
+        async with self.lock:
+            coins = await self._usable_coins()
+            if len(coins) < k:
+                return []
+            selected = choose(coins, k) if choose else coins[:k]
+            now = time.monotonic()
+            for coin in selected:
+                self.reserved[coin.name()] = now
+            return selected
+
+    def release(self, coins: Iterable[Coin]):
+        for coin in coins:
+            self.reserved.pop(coin.name(), None)
+
+    def commit(self, spend_bundle: SpendBundle):
+        """Moves the reserved coins spent by a pushed bundle to pending."""
+        removed = {coin.name() for coin in spend_bundle.removals()}
+        removals = removed & set(self.reserved.keys())
+        # a bundle replacing pending ones in the mempool takes over their coins
+        replaced = [
+            tx_id for tx_id, pending in self.pending.items() if pending.removals <= removed
+        ]
+        if not removals and not replaced:
+            return
+        for coin_id in removals:
+            del self.reserved[coin_id]
+        for tx_id in replaced:
+            removals |= self.pending.pop(tx_id).removals
+        change = [
+            coin for coin in spend_bundle.additions() if coin.puzzle_hash == self.puzzle_hash
+        ]
+        self.pending[spend_bundle.name()] = PendingSpend(
+            removals, change, time.monotonic()
+        )
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from chia.rpc.full_node_rpc_client import FullNodeRpcClient
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_record import CoinRecord
+
+
+class ConfirmationTracker:
+    """
+    Follows the chain peak and resolves every pending coin that got confirmed
+    in the new block(s) with a single get_coin_records_by_names call.
+    """
+
+    def __init__(
+            self,
+            node_client: FullNodeRpcClient,
+            poll_interval: float = 2,
+            timeout: float = 600,
+    ):
+        self.node_client = node_client
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        # coin id -> transaction id
+        self.pending: Dict[bytes32, bytes32] = {}
+
+    def add(self, coin_id: bytes32, tx_id: bytes32):
+        self.pending[bytes32(coin_id)] = tx_id
+
+    async def _peak_height(self) -> Optional[int]:
+        state = await self.node_client.get_blockchain_state()
+        peak = state.get("peak")
+        if peak is None:
+            return None
+        return peak.height
+
+    async def confirmations(self) -> AsyncIterator[List[Tuple[CoinRecord, bytes32]]]:
+        """
+        Yields the (coin record, tx id) pairs confirmed since the last peak,
+        until nothing is pending or the timeout is reached.
+        """
+        deadline = time.monotonic() + self.timeout
+        last_height: Optional[int] = None
+        while self.pending and time.monotonic() < deadline:
+            height = await self._peak_height()
+            if height is not None and height != last_height:
+                last_height = height
+                records: List[CoinRecord] = await self.node_client.get_coin_records_by_names(
+                    list(self.pending.keys()), include_spent_coins=True
+                )
+                confirmed = [
+                    (record, self.pending.pop(record.coin.name()))
+                    for record in records
+                    if record.coin.name() in self.pending
+                ]
+                if confirmed:
+                    yield confirmed
+                    continue
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,38 @@
+from typing import TYPE_CHECKING
+
+# chia is imported inside the functions, the CLI reads the default below
+# without loading the chia stack
+if TYPE_CHECKING:
+    from chia.types.spend_bundle import SpendBundle
+
+# the mempool refuses spend bundles above half of the max block cost,
+# stay below it so chunks still fit next to other transactions
+DEFAULT_MAX_COST_FRACTION = 0.4
+
+
+def max_spend_bundle_cost(fraction: float = DEFAULT_MAX_COST_FRACTION) -> int:
+    from chia.consensus.default_constants import DEFAULT_CONSTANTS
+
+    return int(DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM * fraction)
+
+
+def spend_bundle_cost(spend_bundle: "SpendBundle") -> int:
+    """Cost of the bundle computed the same way the mempool does."""
+    from chia.consensus.cost_calculator import calculate_cost_of_program
+    from chia.consensus.default_constants import DEFAULT_CONSTANTS
+    from chia.full_node.bundle_tools import simple_solution_generator
+    from chia.full_node.mempool_check_conditions import get_name_puzzle_conditions
+
+    generator = simple_solution_generator(spend_bundle)
+    npc_result = get_name_puzzle_conditions(
+        generator,
+        DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM,
+        cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE,
+        safe_mode=True,
+        rust_checker=True,
+    )
+    if npc_result.error is not None:
+        raise ValueError(f"Can't run spend bundle {spend_bundle.name()}: error {npc_result.error}")
+    return calculate_cost_of_program(
+        generator.program, npc_result, DEFAULT_CONSTANTS.COST_PER_BYTE
+    )
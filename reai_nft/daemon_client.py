@@ -0,0 +1,124 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+import aiohttp
+
+TOKEN_FILE_NAME = "reai_nft/daemon_token"
+TOKEN_HEADER = "X-Reai-Token"
+
+
+def default_token_path(root_path=None) -> Path:
+    # the same root as chia.util.default_root.DEFAULT_ROOT_PATH, without
+    # importing chia so forwarded commands start fast
+    if not root_path:
+        root_path = Path(os.path.expanduser(os.getenv("CHIA_ROOT", "~/.chia/mainnet"))).resolve()
+    return Path(root_path) / TOKEN_FILE_NAME
+
+
+def read_token(path: Path) -> str:
+    """The daemon's secret, refusing a file other users could read."""
+    if path.stat().st_mode & 0o077:
+        raise PermissionError(f"{path} is readable by other users, chmod it to 600")
+    return path.read_text().strip()
+
+
+@dataclass
+class FailedChunk:
+    """A mint_k chunk the daemon couldn't push, like ReaiWallet's ChunkResult."""
+    items: List[Tuple[str, str]]
+    error: Exception
+
+
+def _data_from_json(value):
+    # the inverse of the daemon's _data_to_json, hex strings back to bytes and
+    # [key, value] back to a (key, value) pair
+    if isinstance(value, str):
+        return bytes.fromhex(value)
+    if isinstance(value, list):
+        items = [_data_from_json(item) for item in value]
+        if len(items) == 2 and all(isinstance(item, bytes) for item in items):
+            return tuple(items)
+        return items
+    return value
+
+
+def _mint_items(items: list) -> List[Tuple[str, str]]:
+    return [(item["transaction_id"][2:], item["launcher_id"][2:]) for item in items]
+
+
+class DaemonClient:
+    """
+    Talks to a running `reai-nft serve` daemon with the same methods the CLI
+    uses on ReaiWallet, so commands can forward to it unchanged.
+
+    `address` is http://host:port or unix:/path/to/socket, and `token` the
+    secret the daemon wrote to its token file.
+    """
+
+    def __init__(self, address: str, token: str, verbose=False):
+        self.verbose = verbose
+        self.wallet_address = f"daemon at {address}"
+        if address.startswith("unix:"):
+            self.base_url = "http://localhost"
+            connector = aiohttp.UnixConnector(path=address[len("unix:"):])
+        else:
+            self.base_url = address.rstrip("/")
+            connector = None
+        self.session = aiohttp.ClientSession(
+            connector=connector, headers={TOKEN_HEADER: token}
+        )
+        # the daemon always pushes, spend bundles can't be dry run through it
+        self.dry_run = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def set_signing_workers(self, workers: int):
+        # the daemon signs with the workers it was started with
+        pass
+
+    async def _call(self, path: str, **body) -> dict:
+        if self.dry_run:
+            raise ValueError("--dry-run is not supported when forwarding to the daemon")
+        async with self.session.post(f"{self.base_url}/{path}", json=body) as response:
+            result = await response.json()
+        if response.status != 200:
+            raise ValueError(f"Daemon error: {result.get('error')}")
+        return result
+
+    async def mint(self, fee=0, multi_op=False, data=None, hashed_data=False) -> Tuple[str, str]:
+        result = await self._call(
+            "mint", fee=fee, multi_op=multi_op, data=data, hashed_data=hashed_data
+        )
+        return result["transaction_id"][2:], result["launcher_id"][2:]
+
+    async def mint_k(
+            self, fee=0, k=50, max_cost_fraction=None, multi_op=False, data=None, hashed_data=False
+    ) -> Tuple[bool, List[Tuple[str, str]], List[FailedChunk]]:
+        body = {"fee": fee, "k": k, "multi_op": multi_op, "hashed_data": hashed_data}
+        if data is not None:
+            body["data"] = data
+        if max_cost_fraction is not None:
+            body["max_cost_fraction"] = max_cost_fraction
+        result = await self._call("mint_k", **body)
+        failures = [
+            FailedChunk(_mint_items(failure["items"]), ValueError(failure["error"]))
+            for failure in result.get("failures", [])
+        ]
+        return result["success"], _mint_items(result["items"]), failures
+
+    async def add_pair(self, coin_name: bytes, pair, fee=0) -> str:
+        key, value = pair
+        result = await self._call(
+            "add_pair", launcher_id=f"0x{coin_name.hex()}", key=key, value=value, fee=fee
+        )
+        return result["transaction_id"][2:]
+
+    async def get_data(self, coin_name: bytes) -> Tuple[int, list]:
+        result = await self._call("get_data", launcher_id=f"0x{coin_name.hex()}")
+        return result["version"], [_data_from_json(item) for item in result["data"]]
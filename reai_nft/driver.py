@@ -1,41 +1,207 @@
-from pathlib import Path
+import hashlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
-import cdv.clibs as std_lib
-from cdv.util.load_clvm import load_clvm
 from chia.types.blockchain_format.program import Program
 from chia.types.blockchain_format.sized_bytes import bytes32
 from chia.types.coin_spend import CoinSpend
-from chia.wallet.puzzles.load_clvm import load_clvm as load_chia_clvm
 from clvm.SExp import SExp
+from clvm.casts import int_from_bytes, int_to_bytes
 
-clibs_path: Path = Path(std_lib.__file__).parent
+from reai_nft.build_puzzles import load_puzzle
 
-SINGLETON_MOD = load_chia_clvm("singleton_top_layer.clvm")
-LAUNCHER_PUZZLE = load_chia_clvm("singleton_launcher.clvm")
-SINGLETON_LAUNCHER_HASH = LAUNCHER_PUZZLE.get_tree_hash()
-REAI_MOD: Program = load_clvm(
-    "reai_puzzle.clsp", "reai_nft.clsp", search_paths=[clibs_path]
-)
-
-SINGLETON_MOD_HASH = SINGLETON_MOD.get_tree_hash()
 COIN_AMOUNT = 1
 
+# (multi_op, hashed_data) of the v1, v2 and v3 puzzles
+PUZZLE_KINDS = ((False, False), (True, False), (True, True))
+
+
+@lru_cache(maxsize=None)
+def _puzzles() -> dict:
+    from chia.wallet.puzzles.load_clvm import load_clvm as load_chia_clvm
+
+    singleton_mod = load_chia_clvm("singleton_top_layer.clvm")
+    launcher_puzzle = load_chia_clvm("singleton_launcher.clvm")
+    reai_mod, reai_mod_hash = load_puzzle("reai_puzzle.clsp")
+    # same puzzle, but the commit is a list of operations applied in order
+    reai_mod_v2, reai_mod_v2_hash = load_puzzle("reai_puzzle_v2.clsp")
+    # multi-operation commits on a curried hash of the data instead of the data
+    reai_mod_v3, reai_mod_v3_hash = load_puzzle("reai_puzzle_v3.clsp")
+    return {
+        "SINGLETON_MOD": singleton_mod,
+        "SINGLETON_MOD_HASH": singleton_mod.get_tree_hash(),
+        "LAUNCHER_PUZZLE": launcher_puzzle,
+        "SINGLETON_LAUNCHER_HASH": launcher_puzzle.get_tree_hash(),
+        "REAI_MOD": reai_mod,
+        "REAI_MOD_HASH": reai_mod_hash,
+        "REAI_MOD_V2": reai_mod_v2,
+        "REAI_MOD_V2_HASH": reai_mod_v2_hash,
+        "REAI_MOD_V3": reai_mod_v3,
+        "REAI_MOD_V3_HASH": reai_mod_v3_hash,
+        # serialized mods, what decode_reai_spend compares the revealed mod with
+        "REAI_MOD_BYTES": {
+            bytes(reai_mod): (False, False),
+            bytes(reai_mod_v2): (True, False),
+            bytes(reai_mod_v3): (True, True),
+        },
+    }
+
+
+def __getattr__(name):
+    # the puzzles are only loaded once something uses them
+    puzzles = _puzzles()
+    if name in puzzles:
+        return puzzles[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def singleton_puzzle(
     launcher_id: Program, launcher_puzzle_hash: bytes32, inner_puzzle: Program
 ) -> Program:
-    return SINGLETON_MOD.curry(
-        (SINGLETON_MOD_HASH, (launcher_id, launcher_puzzle_hash)), inner_puzzle
+    puzzles = _puzzles()
+    return puzzles["SINGLETON_MOD"].curry(
+        (puzzles["SINGLETON_MOD_HASH"], (launcher_id, launcher_puzzle_hash)), inner_puzzle
     )
 
 
-def create_reai_puzzle(data, pub_key, version=1, mod=REAI_MOD) -> Program:
-    return mod.curry(mod.get_tree_hash(), data, version, pub_key)
+# Tree hashes computed straight from the hashes of the leaves, without
+# building Program trees, the same as curry_and_treehash.clib does on chain.
+
+
+def hash_atom(atom: bytes) -> bytes32:
+    return bytes32(hashlib.sha256(b"\1" + atom).digest())
+
+
+def hash_pair(first: bytes32, rest: bytes32) -> bytes32:
+    return bytes32(hashlib.sha256(b"\2" + first + rest).digest())
+
+
+NIL_HASH = hash_atom(b"")
+ONE_HASH = hash_atom(b"\1")
+# q is 1, so its hash is ONE_HASH too
+A_KW_HASH = hash_atom(b"\2")
+C_KW_HASH = hash_atom(b"\4")
+
+
+def tree_hash(value) -> bytes32:
+    """
+    Tree hash of Program.to(value), hashing bytes, strings, ints, 2-tuples
+    and lists directly and anything else through Program.
+    """
+    if isinstance(value, bytes):
+        return hash_atom(value)
+    if isinstance(value, str):
+        return hash_atom(value.encode())
+    if isinstance(value, int) and not isinstance(value, bool):
+        return hash_atom(int_to_bytes(value))
+    if isinstance(value, tuple) and len(value) == 2:
+        return hash_pair(tree_hash(value[0]), tree_hash(value[1]))
+    if isinstance(value, list):
+        result = NIL_HASH
+        for item in reversed(value):
+            result = hash_pair(tree_hash(item), result)
+        return result
+    return Program.to(value).get_tree_hash()
+
+
+def curried_puzzle_hash(mod_hash: bytes32, *arg_hashes: bytes32) -> bytes32:
+    """
+    Puzzle hash of mod curried with arguments of the given tree hashes,
+    puzzle-hash-of-curried-function from curry_and_treehash.clib.
+    """
+    # (a (q . mod) (c (q . arg) (c (q . arg) ... 1)))
+    env_hash = ONE_HASH
+    for arg_hash in reversed(arg_hashes):
+        quoted_arg = hash_pair(ONE_HASH, arg_hash)
+        env_hash = hash_pair(C_KW_HASH, hash_pair(quoted_arg, hash_pair(env_hash, NIL_HASH)))
+    quoted_mod = hash_pair(ONE_HASH, mod_hash)
+    return hash_pair(A_KW_HASH, hash_pair(quoted_mod, hash_pair(env_hash, NIL_HASH)))
+
+
+def singleton_puzzle_hash(launcher_id: bytes32, inner_puzzle_hash: bytes32) -> bytes32:
+    """Puzzle hash of singleton_top_layer.puzzle_for_singleton(launcher_id, inner puzzle)."""
+    puzzles = _puzzles()
+    singleton_struct_hash = hash_pair(
+        hash_atom(puzzles["SINGLETON_MOD_HASH"]),
+        hash_pair(hash_atom(launcher_id), hash_atom(puzzles["SINGLETON_LAUNCHER_HASH"])),
+    )
+    return curried_puzzle_hash(
+        puzzles["SINGLETON_MOD_HASH"], singleton_struct_hash, inner_puzzle_hash
+    )
+
+
+def reai_mod(multi_op=False, hashed_data=False) -> Tuple[Program, bytes32]:
+    """
+    The reai module and its hash, the v2 (multi-operation commits) one if
+    multi_op and the v3 (hashed data, multi-operation commits) one if hashed_data.
+    """
+    puzzles = _puzzles()
+    if hashed_data:
+        return puzzles["REAI_MOD_V3"], puzzles["REAI_MOD_V3_HASH"]
+    if multi_op:
+        return puzzles["REAI_MOD_V2"], puzzles["REAI_MOD_V2_HASH"]
+    return puzzles["REAI_MOD"], puzzles["REAI_MOD_HASH"]
+
+
+def data_root(data) -> bytes32:
+    """Tree hash of the data list, what the v3 puzzle curries instead of the data."""
+    return tree_hash(data)
+
+
+def _mod_hash(mod: Program) -> bytes32:
+    for known_mod, mod_hash in (reai_mod(), reai_mod(multi_op=True), reai_mod(hashed_data=True)):
+        if mod is known_mod:
+            return mod_hash
+    return mod.get_tree_hash()
+
+
+def create_reai_puzzle(
+        data, pub_key, version=1, mod=None, multi_op=False, hashed_data=False
+) -> Program:
+    if mod is None:
+        mod, mod_hash = reai_mod(multi_op, hashed_data)
+    else:
+        mod_hash = _mod_hash(mod)
+    if hashed_data:
+        data = data_root(data)
+    return mod.curry(mod_hash, data, version, pub_key)
+
+
+def reai_puzzle_hash(
+        data, pub_key, version=1, multi_op=False, hashed_data=False
+) -> bytes32:
+    """Tree hash of create_reai_puzzle with the same arguments, without building it."""
+    _, mod_hash = reai_mod(multi_op, hashed_data)
+    data_hash = data_root(data)
+    if hashed_data:
+        # the root is curried as an atom
+        data_hash = hash_atom(data_hash)
+    return curried_puzzle_hash(
+        mod_hash,
+        hash_atom(mod_hash),
+        data_hash,
+        tree_hash(version),
+        tree_hash(pub_key),
+    )
+
+
+def removal_proof(data: list, index: int) -> List:
+    """
+    (prefix, removed, tail) the v3 puzzle checks a removal of data[index]
+    against: the hashes of the items before it, its hash and the hash of the
+    rest of the list. Its size grows with index, not with the data.
+    """
+    return [
+        [tree_hash(item) for item in data[:index]],
+        tree_hash(data[index]),
+        data_root(data[index + 1:]),
+    ]
 
 
 def get_inner_puzzle_reveal(coin_spend: CoinSpend) -> Program:
 
-    if coin_spend.coin.puzzle_hash != SINGLETON_LAUNCHER_HASH:
+    if coin_spend.coin.puzzle_hash != _puzzles()["SINGLETON_LAUNCHER_HASH"]:
         full_puzzle = Program.from_bytes(bytes(coin_spend.puzzle_reveal))
         r = full_puzzle.uncurry()
         if r is not None:
@@ -50,3 +216,172 @@ def solution_for_reai(version, commit=None, new_pub_key=None, adapt=False) -> SE
     if not adapt:
         return Program.to([version, commit, new_pub_key or []])
     return Program.to([[], version, commit, new_pub_key or []])
+
+
+# Decoding straight from the serialized CLVM of a spend: positions are offsets
+# into the bytes, only the atoms that are returned get copied.
+
+ADD = 16
+REMOVE = 17
+
+
+def _atom_bounds(buf: memoryview, pos: int) -> Tuple[int, int]:
+    b = buf[pos]
+    if b == 0xFF:
+        raise ValueError(f"Expected an atom at {pos}")
+    if b < 0x80:
+        return pos, pos + 1
+    # the number of leading ones is the size of the length prefix
+    mask = 0x80
+    n = 0
+    while b & mask:
+        n += 1
+        mask >>= 1
+    size = b & (mask - 1)
+    for i in range(1, n):
+        size = (size << 8) | buf[pos + i]
+    return pos + n, pos + n + size
+
+
+def _skip(buf: memoryview, pos: int) -> int:
+    """Offset right after the node at pos, iterative so long lists don't recurse."""
+    pending = 1
+    while pending:
+        if buf[pos] == 0xFF:
+            pos += 1
+            pending += 1
+        else:
+            pos = _atom_bounds(buf, pos)[1]
+            pending -= 1
+    return pos
+
+
+def _atom(buf: memoryview, pos: int) -> bytes:
+    start, end = _atom_bounds(buf, pos)
+    return bytes(buf[start:end])
+
+
+def _list_items(buf: memoryview, pos: int):
+    while buf[pos] == 0xFF:
+        yield pos + 1
+        pos = _skip(buf, pos + 1)
+
+
+def _nth(buf: memoryview, pos: int, n: int) -> int:
+    for i, item in enumerate(_list_items(buf, pos)):
+        if i == n:
+            return item
+    raise ValueError(f"List at {pos} has no item {n}")
+
+
+def _pair(buf: memoryview, pos: int):
+    # (key . value) of two atoms, anything else the way as_python returns it
+    if buf[pos] == 0xFF and buf[pos + 1] != 0xFF:
+        key_end = _atom_bounds(buf, pos + 1)[1]
+        if buf[key_end] != 0xFF:
+            return _atom(buf, pos + 1), _atom(buf, key_end)
+    return Program.from_bytes(bytes(buf[pos:_skip(buf, pos)])).as_python()
+
+
+def _pairs(buf: memoryview, pos: int) -> List[Tuple[bytes, bytes]]:
+    return [_pair(buf, item) for item in _list_items(buf, pos)]
+
+
+def _uncurry(buf: memoryview, pos: int) -> Tuple[Tuple[int, int], List[int]]:
+    """
+    Bounds of the mod and offsets of the arguments of (a (q . mod) (c (q . arg) ... 1)).
+    """
+    # ff 02 ff (ff 01 mod) ff env 80
+    if bytes(buf[pos:pos + 3]) != b"\xff\x02\xff" or bytes(buf[pos + 3:pos + 5]) != b"\xff\x01":
+        raise ValueError("Not a curried puzzle")
+    mod_start = pos + 5
+    mod_end = _skip(buf, mod_start)
+    args = []
+    env = mod_end + 1
+    # ff 04 ff (ff 01 arg) ff env 80, down to the atom 1
+    while buf[env] != 0x01:
+        if bytes(buf[env:env + 5]) != b"\xff\x04\xff\xff\x01":
+            raise ValueError("Not a curried puzzle")
+        args.append(env + 5)
+        env = _skip(buf, env + 5) + 1
+    return (mod_start, mod_end), args
+
+
+@dataclass
+class ReaiSpend:
+    """
+    What a reai singleton spend reveals, decoded by decode_reai_spend.
+    `data` is the curried data, None for hashed data puzzles which only
+    curry `data_root`. `operations` are the (ADD, (key, value)) and
+    (REMOVE, index) of the commit, in order.
+    """
+    multi_op: bool
+    hashed_data: bool
+    version: int
+    launcher_id: Optional[bytes32] = None
+    data: Optional[List[Tuple[bytes, bytes]]] = None
+    data_root: Optional[bytes32] = None
+    operations: List[Tuple[int, object]] = field(default_factory=list)
+    # owner curried in the spent puzzle, and the new owner if the spend changes it
+    pub_key: Optional[bytes] = None
+    new_pub_key: Optional[bytes] = None
+
+
+def _operation(buf: memoryview, pos: int, hashed_data: bool) -> Tuple[int, object]:
+    items = list(_list_items(buf, pos))
+    op = int_from_bytes(_atom(buf, items[0]))
+    if op == ADD:
+        return op, _pair(buf, items[1])
+    if op == REMOVE:
+        if hashed_data:
+            # the removal proof starts with the hashes of the items before it
+            return op, sum(1 for _ in _list_items(buf, _nth(buf, items[1], 0)))
+        return op, int_from_bytes(_atom(buf, items[1]))
+    raise ValueError(f"Bad commit operator: {op}")
+
+
+def decode_reai_spend(puzzle_reveal: bytes, solution: bytes) -> ReaiSpend:
+    """
+    Decodes the spend of a reai singleton from the serialized puzzle reveal and
+    solution, without building Program trees of the whole data.
+    """
+    buf = memoryview(puzzle_reveal)
+    _, (singleton_struct, inner) = _uncurry(buf, 0)
+    (mod_start, mod_end), args = _uncurry(buf, inner)
+    kind = _puzzles()["REAI_MOD_BYTES"].get(bytes(buf[mod_start:mod_end]))
+    if kind is None:
+        raise ValueError("Not a reai puzzle")
+    multi_op, hashed_data = kind
+    spend = ReaiSpend(multi_op, hashed_data, 0)
+    # (mod_hash . (launcher_id . launcher_puzzle_hash))
+    spend.launcher_id = bytes32(_atom(buf, _nth(buf, singleton_struct, 1)))
+    if hashed_data:
+        spend.data_root = bytes32(_atom(buf, args[1]))
+    else:
+        spend.data = _pairs(buf, args[1])
+    spend.pub_key = _atom(buf, args[3])
+
+    solution_buf = memoryview(solution)
+    # (lineage_proof amount (version commit new_pub_key))
+    inner_solution = _nth(solution_buf, 0, 2)
+    version, commit, new_pub_key = list(_list_items(solution_buf, inner_solution))[:3]
+    spend.version = int_from_bytes(_atom(solution_buf, version))
+    if solution_buf[new_pub_key] != 0x80:
+        spend.new_pub_key = _atom(solution_buf, new_pub_key)
+    if solution_buf[commit] == 0xFF:
+        operations = _list_items(solution_buf, commit) if multi_op else [commit]
+        spend.operations = [
+            _operation(solution_buf, operation, hashed_data) for operation in operations
+        ]
+    return spend
+
+
+def decode_data(serialized: bytes) -> List[Tuple[bytes, bytes]]:
+    """Data list serialized with bytes(Program.to(data))."""
+    return _pairs(memoryview(serialized), 0)
+
+
+def decode_launcher_data(solution: bytes) -> List[Tuple[bytes, bytes]]:
+    """Initial data of a reai nft, the key value list of its launcher solution."""
+    buf = memoryview(solution)
+    return _pairs(buf, _nth(buf, 0, 2))
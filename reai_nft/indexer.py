@@ -0,0 +1,336 @@
+import asyncio
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from blspy import G1Element
+from chia.rpc.full_node_rpc_client import FullNodeRpcClient
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_record import CoinRecord
+from chia.util.default_root import DEFAULT_ROOT_PATH
+
+from reai_nft import driver
+
+INDEX_DB_NAME = "reai_nft/index.sqlite"
+
+# block hashes kept to find where a reorg forked, a deeper reorg needs a
+# rescan from an older checkpoint
+REORG_DEPTH = 1000
+
+
+def default_index_db_path(root_path=DEFAULT_ROOT_PATH) -> Path:
+    return Path(root_path or DEFAULT_ROOT_PATH) / INDEX_DB_NAME
+
+
+@dataclass
+class IndexedNft:
+    launcher_id: bytes32
+    # serialized pub key the nft is curried with
+    owner: bytes
+    # current singleton coin id
+    tip_id: bytes32
+    version: int
+    # height of the block the state took effect at
+    height: int
+
+
+class IndexStore:
+    """
+    Persistent launcher_id -> (owner, tip, version) index built by the
+    ChainIndexer. Every state is kept with the height it took effect at, so a
+    reorg rolls back by dropping the rows above the fork.
+    """
+
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = default_index_db_path()
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.connection = sqlite3.connect(str(db_path))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS blocks("
+            " height int PRIMARY KEY,"
+            " header_hash blob NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS nft_states("
+            " launcher_id blob NOT NULL,"
+            " height int NOT NULL,"
+            " owner blob NOT NULL,"
+            " tip_id blob NOT NULL,"
+            " version int NOT NULL,"
+            " PRIMARY KEY(launcher_id, height))"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS nft_states_tip_id ON nft_states(tip_id)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS nft_states_owner ON nft_states(owner)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def _nft(row) -> IndexedNft:
+        return IndexedNft(bytes32(row[0]), row[1], bytes32(row[2]), row[3], row[4])
+
+    def get_checkpoint(self) -> Optional[Tuple[int, bytes32]]:
+        """Height and header hash of the last indexed block."""
+        row = self.connection.execute(
+            "SELECT height, header_hash FROM blocks ORDER BY height DESC LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], bytes32(row[1])
+
+    def get_blocks(self) -> List[Tuple[int, bytes32]]:
+        """Heights and header hashes of the kept blocks, newest first."""
+        rows = self.connection.execute(
+            "SELECT height, header_hash FROM blocks ORDER BY height DESC"
+        ).fetchall()
+        return [(row[0], bytes32(row[1])) for row in rows]
+
+    def add_blocks(
+            self, blocks: List[Tuple[int, bytes32]], states: List[IndexedNft]
+    ):
+        """Records indexed blocks and the states they changed in one transaction."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO blocks VALUES(?, ?)",
+                [(height, bytes(header_hash)) for height, header_hash in blocks],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO nft_states VALUES(?, ?, ?, ?, ?)",
+                [
+                    (
+                        bytes(nft.launcher_id),
+                        nft.height,
+                        bytes(nft.owner),
+                        bytes(nft.tip_id),
+                        nft.version,
+                    )
+                    for nft in states
+                ],
+            )
+            if blocks:
+                self.connection.execute(
+                    "DELETE FROM blocks WHERE height<?", (blocks[-1][0] - REORG_DEPTH,)
+                )
+
+    def rollback(self, height: int):
+        """Forgets the blocks and states above height."""
+        with self.connection:
+            self.connection.execute("DELETE FROM blocks WHERE height>?", (height,))
+            self.connection.execute("DELETE FROM nft_states WHERE height>?", (height,))
+
+    def get_by_tips(self, tip_ids: Iterable[bytes32]) -> Dict[bytes32, IndexedNft]:
+        """Indexed nfts whose current singleton is one of tip_ids, by tip id."""
+        tip_ids = [bytes(tip_id) for tip_id in tip_ids]
+        nfts = {}
+        # stay below the sqlite limit of bound parameters
+        for i in range(0, len(tip_ids), 500):
+            chunk = tip_ids[i:i + 500]
+            rows = self.connection.execute(
+                "SELECT launcher_id, owner, tip_id, version, height FROM nft_states"
+                f" WHERE tip_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for row in rows:
+                nft = self._nft(row)
+                nfts[nft.tip_id] = nft
+        return nfts
+
+    def get_nfts(self, owner: Optional[bytes] = None) -> List[IndexedNft]:
+        """Latest state of every indexed nft, only those owned by owner if given."""
+        query = (
+            "SELECT s.launcher_id, s.owner, s.tip_id, s.version, s.height FROM nft_states s"
+            " JOIN (SELECT launcher_id, MAX(height) AS height FROM nft_states"
+            " GROUP BY launcher_id) latest USING (launcher_id, height)"
+        )
+        params: tuple = ()
+        if owner is not None:
+            query += " WHERE s.owner=?"
+            params = (bytes(owner),)
+        rows = self.connection.execute(query + " ORDER BY s.height", params).fetchall()
+        return [self._nft(row) for row in rows]
+
+    def close(self):
+        self.connection.close()
+
+
+class ChainIndexer:
+    """
+    Scans blocks from the last checkpoint for launcher spends of reai nfts
+    curried with pub_key, then follows every indexed nft through its spends
+    to keep its owner, tip and version current.
+    """
+
+    def __init__(
+            self,
+            node: FullNodeRpcClient,
+            store: IndexStore,
+            pub_key: G1Element,
+            batch_size: int = 32,
+            verbose=False,
+    ):
+        self.node_client = node
+        self.store = store
+        self.pub_key = pub_key
+        self.batch_size = batch_size
+        self.verbose = verbose
+
+    async def _peak_height(self) -> Optional[int]:
+        state = await self.node_client.get_blockchain_state()
+        peak = state.get("peak")
+        if peak is None:
+            return None
+        return peak.height
+
+    async def _resume_height(self, start_height: int) -> int:
+        """
+        First height to index, rolls the store back to the fork point when the
+        blocks it indexed last are no longer on the chain.
+        """
+        blocks = self.store.get_blocks()
+        if not blocks:
+            return start_height
+        for height, header_hash in blocks:
+            record = await self.node_client.get_block_record_by_height(height)
+            if record is not None and record.header_hash == header_hash:
+                if height != blocks[0][0]:
+                    if self.verbose:
+                        print(f"Reorg detected, rolling back to height {height}")
+                    self.store.rollback(height)
+                return height + 1
+        raise ValueError(
+            f"Reorg deeper than the last {len(blocks)} indexed blocks, rescan from an older height"
+        )
+
+    async def _launched_nft(
+            self, launcher: Coin, children: Dict[bytes32, Coin], height: int
+    ) -> Optional[IndexedNft]:
+        """The indexed nft if launcher created a reai singleton curried with pub_key."""
+        singleton = children.get(launcher.name())
+        if singleton is None:
+            return None
+        coin_spend = await self.node_client.get_puzzle_and_solution(launcher.name(), height)
+        try:
+            data = driver.decode_launcher_data(bytes(coin_spend.solution))
+        except (ValueError, IndexError):
+            # launched by another project with a different key value list
+            return None
+        for multi_op, hashed_data in driver.PUZZLE_KINDS:
+            inner_puzzle_hash = driver.reai_puzzle_hash(
+                data, self.pub_key, multi_op=multi_op, hashed_data=hashed_data
+            )
+            if driver.singleton_puzzle_hash(launcher.name(), inner_puzzle_hash) == singleton.puzzle_hash:
+                return IndexedNft(
+                    launcher.name(), bytes(self.pub_key), singleton.name(), 1, height
+                )
+        return None
+
+    async def _follow_spends(
+            self,
+            nft: IndexedNft,
+            children: Dict[bytes32, Coin],
+            spent: Set[bytes32],
+            height: int,
+    ) -> IndexedNft:
+        """Moves nft to the last singleton of its lineage created at height."""
+        while nft.tip_id in spent and nft.tip_id in children:
+            coin_spend = await self.node_client.get_puzzle_and_solution(nft.tip_id, height)
+            spend = driver.decode_reai_spend(
+                bytes(coin_spend.puzzle_reveal), bytes(coin_spend.solution)
+            )
+            nft = IndexedNft(
+                nft.launcher_id,
+                spend.new_pub_key or spend.pub_key,
+                children[nft.tip_id].name(),
+                spend.version,
+                height,
+            )
+        return nft
+
+    async def _index_block(
+            self, height: int, additions: List[CoinRecord], removals: List[CoinRecord]
+    ) -> List[IndexedNft]:
+        children = {record.coin.parent_coin_info: record.coin for record in additions}
+        spent = {record.coin.name() for record in removals}
+        # the tips at the start of the block, singletons created and spent in
+        # the block are reached from their parent
+        tracked = self.store.get_by_tips(spent)
+        nfts = []
+        for record in removals:
+            coin = record.coin
+            if coin.puzzle_hash == driver.SINGLETON_LAUNCHER_HASH:
+                nft = await self._launched_nft(coin, children, height)
+            else:
+                nft = tracked.get(coin.name())
+            if nft is not None:
+                nft = await self._follow_spends(nft, children, spent, height)
+                if self.verbose:
+                    print(f"Indexed 0x{nft.launcher_id.hex()} version {nft.version} at height {height}")
+                nfts.append(nft)
+        return nfts
+
+    async def scan(self, start_height: int = 0) -> Optional[int]:
+        """
+        Indexes the blocks from the last checkpoint, or start_height on the
+        first run, up to the peak. Returns the last indexed height.
+        """
+        peak = await self._peak_height()
+        if peak is None:
+            raise ValueError("The full node has no peak yet")
+        height = await self._resume_height(start_height)
+        while height <= peak:
+            end = min(height + self.batch_size, peak + 1)
+            records = await asyncio.gather(
+                *(self.node_client.get_block_record_by_height(h) for h in range(height, end))
+            )
+            # only transaction blocks have additions and removals
+            coin_changes = await asyncio.gather(
+                *(
+                    self.node_client.get_additions_and_removals(record.header_hash)
+                    for record in records
+                    if record is not None and record.is_transaction_block
+                )
+            )
+            changes_by_hash = {
+                record.header_hash: changes
+                for record, changes in zip(
+                    [r for r in records if r is not None and r.is_transaction_block],
+                    coin_changes,
+                )
+            }
+            checkpoint = self.store.get_checkpoint()
+            previous_hash = checkpoint[1] if checkpoint else None
+            moved = False
+            for record in records:
+                if record is None or (previous_hash is not None and record.prev_hash != previous_hash):
+                    # the chain moved under the batch, roll back and retry
+                    moved = True
+                    break
+                nfts: List[IndexedNft] = []
+                if record.header_hash in changes_by_hash:
+                    additions, removals = changes_by_hash[record.header_hash]
+                    nfts = await self._index_block(record.height, additions, removals)
+                # the next block looks its tips up in the store
+                self.store.add_blocks([(record.height, record.header_hash)], nfts)
+                previous_hash = record.header_hash
+            if moved:
+                height = await self._resume_height(start_height)
+                peak = await self._peak_height()
+            else:
+                height = end
+        checkpoint = self.store.get_checkpoint()
+        return checkpoint[0] if checkpoint else None
+
+    async def follow(self, start_height: int = 0, poll_interval: float = 10):
+        """Keeps indexing new blocks as they come, until cancelled."""
+        while True:
+            height = await self.scan(start_height)
+            if self.verbose:
+                print(f"Indexed up to height {height}")
+            await asyncio.sleep(poll_interval)
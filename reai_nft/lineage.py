@@ -0,0 +1,169 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_record import CoinRecord
+from chia.types.coin_spend import CoinSpend
+from chia.util.default_root import DEFAULT_ROOT_PATH
+
+LINEAGE_DB_NAME = "reai_nft/lineage.sqlite"
+
+
+def default_lineage_db_path(root_path=DEFAULT_ROOT_PATH) -> Path:
+    return Path(root_path or DEFAULT_ROOT_PATH) / LINEAGE_DB_NAME
+
+
+class LineageStore:
+    """
+    Persistent launcher_id -> (parent record, tip record) cache so lineage
+    walks can resume from the last known singleton instead of the launcher,
+    the spends of every singleton so history queries only fetch new ones, and
+    the last replayed data of hashed data nfts so reads only replay new spends.
+
+    Writes made inside `batch()` are committed once, when the outermost batch
+    exits, so bulk reads don't commit per nft.
+    """
+
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = default_lineage_db_path()
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.connection = sqlite3.connect(str(db_path))
+        self._batch_depth = 0
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS lineage("
+            " launcher_id blob PRIMARY KEY,"
+            " parent_record blob NOT NULL,"
+            " tip_record blob NOT NULL,"
+            " updated_at int NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS history("
+            " launcher_id blob NOT NULL,"
+            " seq int NOT NULL,"
+            " coin_record blob NOT NULL,"
+            " coin_spend blob NOT NULL,"
+            " PRIMARY KEY(launcher_id, seq))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS replayed_data("
+            " launcher_id blob PRIMARY KEY,"
+            " coin_record blob NOT NULL,"
+            " data blob NOT NULL)"
+        )
+        self.connection.commit()
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.connection.commit()
+
+    def commit(self):
+        """Commits the writes so far, even inside a batch."""
+        self.connection.commit()
+
+    def _commit(self):
+        if not self._batch_depth:
+            self.connection.commit()
+
+    def get_tip(
+            self, launcher_id: bytes32
+    ) -> Optional[Tuple[CoinRecord, CoinRecord]]:
+        row = self.connection.execute(
+            "SELECT parent_record, tip_record FROM lineage WHERE launcher_id=?",
+            (bytes(launcher_id),),
+        ).fetchone()
+        if row is None:
+            return None
+        return CoinRecord.from_bytes(row[0]), CoinRecord.from_bytes(row[1])
+
+    def set_tip(
+            self,
+            launcher_id: bytes32,
+            parent_record: CoinRecord,
+            tip_record: CoinRecord,
+    ):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO lineage VALUES(?, ?, ?, ?)",
+            (
+                bytes(launcher_id),
+                bytes(parent_record),
+                bytes(tip_record),
+                int(time.time()),
+            ),
+        )
+        self._commit()
+
+    def invalidate(self, launcher_id: bytes32):
+        self.connection.execute(
+            "DELETE FROM lineage WHERE launcher_id=?", (bytes(launcher_id),)
+        )
+        self._commit()
+
+    def get_history(self, launcher_id: bytes32) -> List[Tuple[CoinRecord, CoinSpend]]:
+        """Records and spends of the launcher and every spent singleton, in order."""
+        rows = self.connection.execute(
+            "SELECT coin_record, coin_spend FROM history WHERE launcher_id=? ORDER BY seq",
+            (bytes(launcher_id),),
+        ).fetchall()
+        return [(CoinRecord.from_bytes(row[0]), CoinSpend.from_bytes(row[1])) for row in rows]
+
+    def add_history(
+            self,
+            launcher_id: bytes32,
+            start: int,
+            entries: List[Tuple[CoinRecord, CoinSpend]],
+    ):
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO history VALUES(?, ?, ?, ?)",
+            [
+                (bytes(launcher_id), start + i, bytes(coin_record), bytes(coin_spend))
+                for i, (coin_record, coin_spend) in enumerate(entries)
+            ],
+        )
+        self._commit()
+
+    def invalidate_history(self, launcher_id: bytes32):
+        self.connection.execute(
+            "DELETE FROM history WHERE launcher_id=?", (bytes(launcher_id),)
+        )
+        self._commit()
+
+    def get_replayed_data(self, launcher_id: bytes32) -> Optional[Tuple[CoinRecord, bytes]]:
+        """
+        Record of the last singleton whose hashed data was replayed and its
+        data, serialized.
+        """
+        row = self.connection.execute(
+            "SELECT coin_record, data FROM replayed_data WHERE launcher_id=?",
+            (bytes(launcher_id),),
+        ).fetchone()
+        if row is None:
+            return None
+        return CoinRecord.from_bytes(row[0]), row[1]
+
+    def set_replayed_data(self, launcher_id: bytes32, coin_record: CoinRecord, data: bytes):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO replayed_data VALUES(?, ?, ?)",
+            (bytes(launcher_id), bytes(coin_record), data),
+        )
+        self._commit()
+
+    def invalidate_replayed_data(self, launcher_id: bytes32):
+        self.connection.execute(
+            "DELETE FROM replayed_data WHERE launcher_id=?", (bytes(launcher_id),)
+        )
+        self._commit()
+
+    def close(self):
+        self.connection.close()
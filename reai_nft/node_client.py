@@ -0,0 +1,482 @@
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from enum import Enum
+from itertools import islice
+from pprint import pprint
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from reai_nft import driver
+from reai_nft.driver import ReaiSpend, data_root
+from reai_nft.lineage import LineageStore, default_lineage_db_path
+from chia.rpc.full_node_rpc_client import FullNodeRpcClient
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_record import CoinRecord
+from chia.types.coin_spend import CoinSpend
+from chia.util.config import load_config
+from chia.util.default_root import DEFAULT_ROOT_PATH
+from chia.util.ints import uint16
+from chia.wallet.lineage_proof import LineageProof
+from chia.wallet.puzzles import singleton_top_layer
+
+
+class Operation(Enum):
+    ADD = 16
+    REMOVE = 17
+
+
+async def get_node_client(config_path=DEFAULT_ROOT_PATH) -> Optional[FullNodeRpcClient]:
+    try:
+        if not config_path:
+            config_path = DEFAULT_ROOT_PATH
+        config = load_config(config_path, "config.yaml")
+        self_hostname = config["self_hostname"]
+        full_node_rpc_port = config["full_node"]["rpc_port"]
+        full_node_client: FullNodeRpcClient = await FullNodeRpcClient.create(
+            self_hostname, uint16(full_node_rpc_port), DEFAULT_ROOT_PATH, config
+        )
+        return full_node_client
+    except Exception as e:
+        if isinstance(e, aiohttp.ClientConnectorError):
+            pprint(
+                f"Connection error. Check if full node is running at {full_node_rpc_port}"
+            )
+        else:
+            pprint(f"Exception from 'harvester' {e}")
+        return None
+
+
+@dataclass
+class DataResult:
+    launcher_id: bytes32
+    version: Optional[int] = None
+    data: Optional[list] = None
+    error: Optional[Exception] = None
+
+
+@dataclass
+class SingletonState:
+    # None while the spend creating the singleton is still in the mempool
+    parent_record: Optional[CoinRecord]
+    singleton: Coin
+    coin_spend: CoinSpend
+    lineage_proof: LineageProof
+    version: int
+    data: list
+    # puzzle v2 or v3 (multi-operation commits), None if the parent is the launcher
+    multi_op: Optional[bool] = None
+    # puzzle v3 (hashed data), None if the parent is the launcher
+    hashed_data: Optional[bool] = None
+
+
+@dataclass
+class HistoryEntry:
+    # version and data from `height` on, until the next entry
+    version: int
+    height: int
+    data: list
+
+
+DEFAULT_CONCURRENCY = 32
+# how often get_data_many commits the lineage store, in results and seconds
+COMMIT_EVERY = 100
+COMMIT_INTERVAL = 5.0
+
+
+class ReaiNodeClient:
+    """
+    Read-only access to reai nfts through the full node RPC, needs no wallet,
+    login or private key.
+    """
+
+    def __init__(
+            self,
+            node: FullNodeRpcClient,
+            verbose=False,
+            lineage_store: Optional[LineageStore] = None,
+    ):
+        self.node_client = node
+        self.verbose = verbose
+        self.lineage_store = lineage_store
+
+    @staticmethod
+    @asynccontextmanager
+    async def create(config_file_path: str = None, verbose=False):
+        client = None
+        try:
+            node_client = await get_node_client(config_file_path)
+            if not node_client:
+                raise ValueError("Couldn't connect to the full node")
+            client = ReaiNodeClient(
+                node_client,
+                verbose=verbose,
+                lineage_store=LineageStore(default_lineage_db_path(config_file_path)),
+            )
+            yield client
+        finally:
+            if client:
+                await client.close()
+
+    async def close(self):
+        self.node_client.close()
+        await self.node_client.await_closed()
+        if self.lineage_store:
+            self.lineage_store.close()
+
+    def _store_batch(self):
+        """Commits the lineage store writes made inside once, if there is a store."""
+        return self.lineage_store.batch() if self.lineage_store else nullcontext()
+
+    async def get_lineage_tip(self, launcher_id: bytes32) -> Tuple[CoinRecord, CoinRecord]:
+        """The current singleton coin record of a reai nft and its parent's record."""
+        return await self._get_latest_singleton(launcher_id)
+
+    async def get_singleton_state(self, launcher_id: bytes32) -> SingletonState:
+        """Current singleton, lineage proof, version and data of a reai nft."""
+        return await self._resolve_singleton_state(launcher_id)
+
+    async def _resolve_singleton_state(self, coin_name: bytes32) -> SingletonState:
+        with self._store_batch():
+            parent_record, singleton_record = await self._get_latest_singleton(coin_name)
+            return await self._singleton_state_from_records(parent_record, singleton_record)
+
+    async def _singleton_state_from_records(
+            self, parent_record: CoinRecord, singleton_record: CoinRecord
+    ) -> SingletonState:
+        coin_spend = await self.node_client.get_puzzle_and_solution(
+            parent_record.coin.name(), parent_record.spent_block_index
+        )
+        version, data, spend = await self._decode_coin_spend(coin_spend, parent_record)
+        return SingletonState(
+            parent_record,
+            singleton_record.coin,
+            coin_spend,
+            singleton_top_layer.lineage_proof_for_coinsol(coin_spend),
+            version,
+            data,
+            spend.multi_op if spend else None,
+            spend.hashed_data if spend else None,
+        )
+
+    async def _decode_coin_spend(
+            self, coin_spend: CoinSpend, coin_record: CoinRecord
+    ) -> Tuple[int, list, Optional[ReaiSpend]]:
+        """
+        Version and data after coin_spend, the spend of coin_record, and the
+        decoded spend unless it's the launcher's.
+        """
+        if coin_spend.coin.puzzle_hash == driver.SINGLETON_LAUNCHER_HASH:
+            return 1, driver.decode_launcher_data(bytes(coin_spend.solution)), None
+        spend = driver.decode_reai_spend(bytes(coin_spend.puzzle_reveal), bytes(coin_spend.solution))
+        previous_data = None
+        if spend.hashed_data:
+            previous_data = await self._replay_hashed_data(spend.launcher_id, coin_record)
+        version, data = self._data_from_reai_spend(spend, previous_data)
+        return version, data, spend
+
+    def _cached_replayed_data(self, launcher_id: bytes32) -> Optional[Tuple[CoinRecord, list]]:
+        if not self.lineage_store:
+            return None
+        cached = self.lineage_store.get_replayed_data(launcher_id)
+        if not cached:
+            return None
+        coin_record, data = cached
+        return coin_record, driver.decode_data(data)
+
+    async def _replay_hashed_data(self, launcher_id: bytes32, coin_record: CoinRecord) -> list:
+        """
+        Data curried in coin_record's singleton when its puzzle only curries
+        the data root (v3), replayed through the commits since the last
+        singleton replayed for launcher_id, or since the launcher.
+        """
+        cached = self._cached_replayed_data(launcher_id)
+        spends = []
+        record = coin_record
+        data = []
+        while record.coin.puzzle_hash != driver.SINGLETON_LAUNCHER_HASH:
+            if cached and record.coin.name() == cached[0].coin.name():
+                # the coin must still be confirmed where it was cached,
+                # otherwise a reorg happened and the cached data can't be trusted
+                if record.confirmed_block_index == cached[0].confirmed_block_index:
+                    data = cached[1]
+                    break
+                if self.verbose:
+                    print(f"Cached data is stale, replaying from launcher: {launcher_id.hex()}")
+                self.lineage_store.invalidate_replayed_data(launcher_id)
+                cached = None
+            parent_record: CoinRecord = await self.node_client.get_coin_record_by_name(
+                record.coin.parent_coin_info
+            )
+            if not parent_record:
+                raise ValueError(f"Can't find coin: {record.coin.parent_coin_info.hex()}")
+            spends.append(
+                await self.node_client.get_puzzle_and_solution(
+                    parent_record.coin.name(), parent_record.spent_block_index
+                )
+            )
+            record = parent_record
+        for spend in reversed(spends):
+            _, data = self._data_from_coin_spend(spend, data)
+        if self.verbose:
+            print(f"Replayed {len(spends)} spends of {launcher_id.hex()}")
+        if self.lineage_store and spends:
+            self.lineage_store.set_replayed_data(
+                launcher_id, coin_record, bytes(Program.to(data))
+            )
+        return data
+
+    async def get_data(self, coin_name) -> Tuple[int, list]:
+        with self._store_batch():
+            try:
+                parent_record, singleton_record = await self._get_latest_singleton(coin_name)
+            except ValueError:
+                return 1, []
+            state = await self._singleton_state_from_records(parent_record, singleton_record)
+        return state.version, state.data
+
+    async def _data_result(self, launcher_id: bytes32) -> DataResult:
+        try:
+            version, data = await self.get_data(launcher_id)
+        except Exception as e:
+            return DataResult(launcher_id, error=e)
+        return DataResult(launcher_id, version, data)
+
+    async def get_data_many(
+            self,
+            launcher_ids: Iterable[bytes32],
+            concurrency: int = DEFAULT_CONCURRENCY,
+            commit_every: int = COMMIT_EVERY,
+            commit_interval: float = COMMIT_INTERVAL,
+    ) -> AsyncIterator[DataResult]:
+        """
+        Resolves the data of many reai nfts, keeping `concurrency` lookups in
+        flight and starting the next one as soon as one finishes, yielding
+        results as they complete. launcher_ids is consumed lazily so memory
+        doesn't grow with the input. The lineage store writes are committed
+        every `commit_every` results or `commit_interval` seconds, whichever
+        comes first, so a long stream doesn't keep the store locked.
+        """
+        launcher_ids = iter(launcher_ids)
+        concurrency = max(concurrency, 1)
+        pending = set()
+        loop = asyncio.get_running_loop()
+
+        def fill():
+            for launcher_id in islice(launcher_ids, concurrency - len(pending)):
+                pending.add(asyncio.ensure_future(self._data_result(launcher_id)))
+
+        def commit():
+            nonlocal uncommitted, committed_at
+            if self.lineage_store:
+                self.lineage_store.commit()
+            uncommitted = 0
+            committed_at = loop.time()
+
+        uncommitted = 0
+        committed_at = loop.time()
+        try:
+            with self._store_batch():
+                fill()
+                while pending:
+                    timeout = max(committed_at + commit_interval - loop.time(), 0)
+                    done, _ = await asyncio.wait(
+                        pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    pending -= done
+                    fill()
+                    uncommitted += len(done)
+                    if uncommitted >= commit_every or loop.time() >= committed_at + commit_interval:
+                        commit()
+                    for task in done:
+                        yield task.result()
+        finally:
+            # the caller stopped early
+            for task in pending:
+                task.cancel()
+
+    async def _spent_lineage(self, coin_record: CoinRecord) -> List[CoinRecord]:
+        """Records of coin_record and its spent descendants, in order."""
+        records = []
+        while coin_record.spent:
+            records.append(coin_record)
+            descendants = await self.node_client.get_coin_records_by_parent_ids(
+                [coin_record.coin.name()]
+            )
+            if len(descendants) != 1:
+                raise ValueError("Not a singleton")
+            coin_record = descendants[0]
+        return records
+
+    async def _cached_history(self, launcher_id: bytes32) -> List[Tuple[CoinRecord, CoinSpend]]:
+        if not self.lineage_store:
+            return []
+        cached = self.lineage_store.get_history(launcher_id)
+        if cached:
+            last, _ = cached[-1]
+            record = await self.node_client.get_coin_record_by_name(last.coin.name())
+            # a reorg changed the lineage since it was cached
+            if not record or record.spent_block_index != last.spent_block_index:
+                if self.verbose:
+                    print(f"Cached history is stale, walking from launcher: {launcher_id.hex()}")
+                self.lineage_store.invalidate_history(launcher_id)
+                return []
+        return cached
+
+    async def get_history(
+            self, launcher_id: bytes32, concurrency: int = DEFAULT_CONCURRENCY
+    ) -> AsyncIterator[HistoryEntry]:
+        """
+        Streams the version and data of a reai nft after its launch and after
+        every spend since, oldest first. The singleton chain is walked once,
+        the spends are fetched concurrently and the commits replayed as they
+        arrive. Spends are kept in the lineage store, later calls only fetch
+        the new ones.
+        """
+        cached = await self._cached_history(launcher_id)
+        if cached:
+            last, _ = cached[-1]
+            descendants = await self.node_client.get_coin_records_by_parent_ids(
+                [last.coin.name()]
+            )
+            if len(descendants) != 1:
+                raise ValueError("Not a singleton")
+            records = await self._spent_lineage(descendants[0])
+        else:
+            launcher_record = await self.node_client.get_coin_record_by_name(launcher_id)
+            if not launcher_record:
+                raise ValueError(f"Can't find coin: {launcher_id.hex()}")
+            records = await self._spent_lineage(launcher_record)
+        if self.verbose:
+            print(f"History of {launcher_id.hex()}: {len(cached)} cached and {len(records)} new spends")
+
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def fetch(coin_record: CoinRecord) -> CoinSpend:
+            async with semaphore:
+                return await self.node_client.get_puzzle_and_solution(
+                    coin_record.coin.name(), coin_record.spent_block_index
+                )
+
+        tasks = [asyncio.ensure_future(fetch(coin_record)) for coin_record in records]
+        fetched = []
+        data = []
+        try:
+            for coin_record, coin_spend in cached:
+                version, data = self._data_from_coin_spend(coin_spend, data)
+                yield HistoryEntry(version, coin_record.spent_block_index, data)
+            for coin_record, task in zip(records, tasks):
+                coin_spend = await task
+                fetched.append((coin_record, coin_spend))
+                version, data = self._data_from_coin_spend(coin_spend, data)
+                yield HistoryEntry(version, coin_record.spent_block_index, data)
+        finally:
+            # the caller stopped early
+            for task in tasks:
+                task.cancel()
+            if self.lineage_store and fetched:
+                self.lineage_store.add_history(launcher_id, len(cached), fetched)
+
+    @staticmethod
+    def _data_from_coin_spend(
+            coin_spend: CoinSpend, previous_data: Optional[list] = None
+    ) -> Tuple[int, list]:
+        """
+        Version and data after coin_spend. Puzzles curried with the data root
+        (v3) don't reveal the data, previous_data is the data they spend.
+        """
+        if coin_spend.coin.puzzle_hash == driver.SINGLETON_LAUNCHER_HASH:
+            # launcher spend, the initial data is recorded as its key value list
+            return 1, driver.decode_launcher_data(bytes(coin_spend.solution))
+        spend = driver.decode_reai_spend(bytes(coin_spend.puzzle_reveal), bytes(coin_spend.solution))
+        return ReaiNodeClient._data_from_reai_spend(spend, previous_data)
+
+    @staticmethod
+    def _data_from_reai_spend(
+            spend: ReaiSpend, previous_data: Optional[list] = None
+    ) -> Tuple[int, list]:
+        if spend.hashed_data:
+            if previous_data is None:
+                raise ValueError("The data of a hashed data puzzle must be replayed")
+            if data_root(previous_data) != spend.data_root:
+                raise ValueError("Replayed data doesn't match the puzzle's data root")
+            data = list(previous_data)
+        else:
+            data = spend.data
+        # manually apply last commit to data to
+        # get latest version of data content
+        for op, value in spend.operations:
+            if op == Operation.ADD.value:
+                data.insert(0, value)
+            elif 0 <= value < len(data):
+                # the v1 and v2 puzzles leave the data as is when no pair is at the index
+                del data[value]
+        return spend.version, data
+
+    async def _get_latest_singleton(
+            self, coin_id: bytes32
+    ) -> Tuple[CoinRecord, CoinRecord]:
+        if self.verbose:
+            print(f"Finding latest singleton for launcher: {coin_id.hex()}")
+        if self.lineage_store:
+            cached = self.lineage_store.get_tip(coin_id)
+            if cached:
+                latest = await self._resume_from_cached_tip(coin_id, *cached)
+                if latest:
+                    return latest
+                if self.verbose:
+                    print(f"Cached lineage is stale, walking from launcher: {coin_id.hex()}")
+                self.lineage_store.invalidate(coin_id)
+        coin_record: CoinRecord = await self.node_client.get_coin_record_by_name(
+            coin_id
+        )
+
+        if not coin_record:
+            raise Exception(f"Can't find coin: {coin_id.hex()}")
+        if not coin_record.spent:
+            # fresh reai nft, return now
+            return (
+                await self.node_client.get_coin_record_by_name(
+                    coin_record.coin.parent_coin_info
+                ),
+                coin_record,
+            )
+        return await self._walk_lineage(coin_id, coin_record)
+
+    async def _resume_from_cached_tip(
+            self, launcher_id: bytes32, parent_record: CoinRecord, tip_record: CoinRecord
+    ) -> Optional[Tuple[CoinRecord, CoinRecord]]:
+        tip: Optional[CoinRecord] = await self.node_client.get_coin_record_by_name(
+            tip_record.coin.name()
+        )
+        # the tip must still exist and be created by the spend of the cached parent,
+        # otherwise a reorg happened and the cached lineage can't be trusted
+        if not tip or tip.confirmed_block_index != parent_record.spent_block_index:
+            return None
+        if not tip.spent:
+            return parent_record, tip
+        try:
+            return await self._walk_lineage(launcher_id, tip)
+        except ValueError:
+            return None
+
+    async def _walk_lineage(
+            self, launcher_id: bytes32, coin_record: CoinRecord
+    ) -> Tuple[CoinRecord, CoinRecord]:
+        while True:
+            descendants = await self.node_client.get_coin_records_by_parent_ids(
+                [coin_record.coin.name()]
+            )
+            if len(descendants) != 1:
+                raise ValueError("Not a singleton")
+            descendant: CoinRecord = descendants[0]
+            if descendant.spent:
+                coin_record = descendant
+            else:
+                assert coin_record.spent
+                if self.lineage_store:
+                    self.lineage_store.set_tip(launcher_id, coin_record, descendant)
+                return coin_record, descendant
@@ -0,0 +1,110 @@
+import asyncio
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from chia.types.blockchain_format.coin import Coin
+
+from reai_nft.driver import COIN_AMOUNT
+
+if TYPE_CHECKING:
+    from reai_nft.wallet import ReaiWallet
+
+
+class CoinPoolKeeper:
+    """
+    Keeps about `target` coins of COIN_AMOUNT plus `fee_budget` ready for
+    minting, splitting the largest wallet coins in the background whenever
+    the usable coins, counting the ones pending splits will create, drop
+    below `low_water`. Minting never waits on it, it uses whatever coins are
+    usable when a batch starts.
+    """
+
+    def __init__(
+            self,
+            wallet: "ReaiWallet",
+            target: int,
+            fee_budget: int = 0,
+            fee: int = 0,
+            low_water: Optional[int] = None,
+            max_parallel: int = 4,
+            poll_interval: float = 5,
+            log: Callable[[str], None] = print,
+    ):
+        self.wallet = wallet
+        self.target = target
+        self.coin_amount = COIN_AMOUNT + fee_budget
+        self.fee = fee
+        self.low_water = target // 2 if low_water is None else low_water
+        self.max_parallel = max_parallel
+        self.poll_interval = poll_interval
+        self.log = log
+        self._task: Optional[asyncio.Task] = None
+
+    def _mintable(self, coins: List[Coin]) -> List[Coin]:
+        """
+        Coins of at least coin_amount, leaving out the largest coin when it is
+        big enough to be split into several, that one is kept for splitting.
+        """
+        if coins:
+            largest = max(coins, key=lambda c: c.amount)
+            if self.wallet._affordable_splits(largest.amount, self.coin_amount, self.fee) > 1:
+                coins = [coin for coin in coins if coin != largest]
+        return [coin for coin in coins if coin.amount >= self.coin_amount]
+
+    async def ready_coins(self) -> int:
+        """Mintable usable coins plus the change pending spends will create."""
+        coin_pool = self.wallet.coin_pool
+        available = self._mintable(await coin_pool.available_coins())
+        incoming = [
+            coin for coin in coin_pool.incoming_change() if coin.amount >= self.coin_amount
+        ]
+        return len(available) + len(incoming)
+
+    async def mintable_coins(self) -> int:
+        """Usable coins the mint loop can take without the one kept for splitting."""
+        return len(self._mintable(await self.wallet.coin_pool.available_coins()))
+
+    def choose_mint_coins(self, coins: List[Coin], k: int) -> List[Coin]:
+        """
+        coin_pool.acquire choice of coins to mint with: the k smallest mintable
+        coins, so larger ones stay around for splitting, or none if there
+        aren't k.
+        """
+        mintable = sorted(self._mintable(coins), key=lambda c: c.amount)
+        return mintable[:k] if len(mintable) >= k else []
+
+    async def top_up(self) -> int:
+        """Splits coins if the pool is below low_water, returns the number of coins created."""
+        ready = await self.ready_coins()
+        if ready >= self.low_water:
+            return 0
+        created, failures = await self.wallet.split_coins(
+            self.target - ready, self.coin_amount, self.fee, self.max_parallel
+        )
+        for failure in failures:
+            self.log(failure)
+        if created:
+            self.log(f"{ready} coins ready, splitting {created} more of {self.coin_amount} mojos")
+        elif not failures:
+            self.log(f"{ready} coins ready, no coin left to split")
+        return created
+
+    async def run(self):
+        while True:
+            try:
+                await self.top_up()
+            except Exception as error:
+                self.log(f"error topping up the coin pool: {error}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
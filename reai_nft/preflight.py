@@ -0,0 +1,149 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from blspy import AugSchemeMPL, G2Element
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.condition_tools import (
+    conditions_by_opcode,
+    created_outputs_for_conditions_dict,
+    parse_sexp_to_conditions,
+    pkm_pairs_for_conditions_dict,
+)
+from clvm.casts import int_from_bytes
+
+from reai_nft.cost import max_spend_bundle_cost, spend_bundle_cost
+
+
+@dataclass
+class PreflightResult:
+    name: bytes32
+    cost: int = 0
+    fee: int = 0
+    additions: List[Coin] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def __str__(self):
+        status = "valid" if self.ok else "invalid: " + "; ".join(self.errors)
+        return (
+            f"spend bundle 0x{self.name} {status} "
+            f"(cost: {self.cost}, fee: {self.fee} mojos, {len(self.additions)} additions)"
+        )
+
+
+class PreflightError(ValueError):
+    def __init__(self, result: PreflightResult):
+        super().__init__(f"Preflight failed for {result}")
+        self.result = result
+
+
+def _atoms(program: Program):
+    if program.pair:
+        yield from _atoms(program.first())
+        yield from _atoms(program.rest())
+    elif program.atom:
+        yield program.atom
+
+
+def _describe_clvm_error(e: Exception) -> str:
+    # (x ...) raises carry their arguments as the failing sexp
+    sexp = getattr(e, "_sexp", None)
+    if sexp is None:
+        return str(e)
+    words = []
+    for atom in _atoms(Program.to(sexp)):
+        text = atom.decode("utf8", errors="replace")
+        words.append(text.strip() if text.isprintable() else str(int_from_bytes(atom)))
+    return f"{e}: {' '.join(words)}"
+
+
+def _run_coin_spend(coin_spend: CoinSpend, result: PreflightResult, pairs: list) -> int:
+    """Records additions, signature pairs and errors, returns the reserved fee."""
+    coin = coin_spend.coin
+    coin_id = coin.name()
+    if coin_spend.puzzle_reveal.get_tree_hash() != coin.puzzle_hash:
+        result.errors.append(f"0x{coin_id}: puzzle reveal doesn't match the puzzle hash")
+        return 0
+    try:
+        _, output = coin_spend.puzzle_reveal.run_with_cost(
+            INFINITE_COST, coin_spend.solution
+        )
+    except Exception as e:
+        result.errors.append(f"0x{coin_id}: {_describe_clvm_error(e)}")
+        return 0
+    error, conditions = parse_sexp_to_conditions(output)
+    if error or conditions is None:
+        result.errors.append(f"0x{coin_id}: bad conditions {error}")
+        return 0
+    conditions_dict = conditions_by_opcode(conditions)
+    pairs.extend(
+        pkm_pairs_for_conditions_dict(
+            conditions_dict, coin_id, DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
+        )
+    )
+    result.additions.extend(created_outputs_for_conditions_dict(conditions_dict, coin_id))
+    return sum(
+        int_from_bytes(cwa.vars[0])
+        for cwa in conditions_dict.get(ConditionOpcode.RESERVE_FEE, [])
+    )
+
+
+def preflight_spend_bundle(
+        spend_bundle: SpendBundle,
+        min_fee: int = 0,
+        max_cost: Optional[int] = None,
+        check_signature: bool = True,
+) -> PreflightResult:
+    """
+    Runs every coin spend locally and checks the aggregated signature, cost
+    and fee of the bundle without talking to the node. The signature check
+    is most of the time taken and can be skipped for bundles signed locally.
+    """
+    result = PreflightResult(spend_bundle.name())
+    pairs: list = []
+    reserved_fee = 0
+    for coin_spend in spend_bundle.coin_spends:
+        reserved_fee += _run_coin_spend(coin_spend, result, pairs)
+    if not result.ok:
+        return result
+
+    removed = sum(coin_spend.coin.amount for coin_spend in spend_bundle.coin_spends)
+    result.fee = removed - sum(coin.amount for coin in result.additions)
+    if result.fee < 0:
+        result.errors.append(f"spends create {-result.fee} mojos more than they remove")
+    elif result.fee < max(reserved_fee, min_fee):
+        result.errors.append(
+            f"insufficient fee: {result.fee} mojos, needs {max(reserved_fee, min_fee)}"
+        )
+
+    if not check_signature:
+        signature_ok = True
+    elif pairs:
+        pks, messages = zip(*pairs)
+        signature_ok = AugSchemeMPL.aggregate_verify(
+            list(pks), list(messages), spend_bundle.aggregated_signature
+        )
+    else:
+        signature_ok = spend_bundle.aggregated_signature == G2Element()
+    if not signature_ok:
+        result.errors.append("aggregated signature doesn't match the AGG_SIG conditions")
+
+    try:
+        result.cost = spend_bundle_cost(spend_bundle)
+    except ValueError as e:
+        result.errors.append(str(e))
+        return result
+    if max_cost is None:
+        max_cost = max_spend_bundle_cost(0.5)
+    if result.cost > max_cost:
+        result.errors.append(f"cost {result.cost} is above the limit {max_cost}")
+    return result
@@ -0,0 +1,183 @@
+import os
+import secrets
+from pathlib import Path
+from typing import Optional
+
+from aiohttp import web
+
+from reai_nft import driver
+from reai_nft.daemon_client import TOKEN_HEADER, read_token
+from reai_nft.wallet import ReaiWallet
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+# listening on these accepts any Host header, the token still has to match
+WILDCARD_HOSTS = (None, "", "0.0.0.0", "::")
+
+
+def load_or_create_token(path: Path) -> str:
+    """
+    The secret clients must send, generated into a file only the owner can
+    read the first time the daemon starts.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return read_token(path)
+    token = secrets.token_hex(32)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    return token
+
+
+def _launcher_id(body: dict) -> bytes:
+    value = body.get("launcher_id", "")
+    if value[:2] == "0x":
+        value = value[2:]
+    launcher_id = bytes.fromhex(value)
+    if len(launcher_id) != 32:
+        raise ValueError("Launcher ID must be 32 bytes")
+    return launcher_id
+
+
+def _to_json(value):
+    # bytes are sent as hex so keys and values survive the round trip exactly,
+    # items that aren't (key . value) pairs keep their as_python shape
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, (tuple, list)):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _data_to_json(version: int, data: list) -> dict:
+    return {"version": version, "data": [_to_json(item) for item in data]}
+
+
+def _mint_items_to_json(items: list) -> list:
+    return [
+        {"launcher_id": f"0x{launcher_id}", "transaction_id": f"0x{tx_id}"}
+        for tx_id, launcher_id in items
+    ]
+
+
+def _error(message: str, status: int) -> web.Response:
+    return web.json_response({"error": message}, status=status)
+
+
+def _json_handler(f):
+    async def handler(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json() if request.can_read_body else {}
+            result = await f(self, body)
+        except Exception as e:
+            if self.wallet.verbose:
+                print(f"{request.path} failed: {e!r}")
+            return web.json_response({"error": str(e) or repr(e)}, status=400)
+        return web.json_response(result)
+
+    return handler
+
+
+class ReaiServer:
+    """
+    Serves one logged in ReaiWallet over a local HTTP API, so scripts don't
+    pay the connect, login and key derivation cost on every call.
+
+    Every endpoint takes a JSON body and answers with JSON, errors come back
+    as {"error": message} with status 400. Requests must carry `token` in the
+    X-Reai-Token header, and browsers are turned away by their Origin and
+    Host headers, so no web page can spend the wallet's coins.
+    """
+
+    def __init__(self, wallet: ReaiWallet, token: str):
+        self.wallet = wallet
+        self.token = token
+        self.allowed_hosts: Optional[tuple] = LOCAL_HOSTS
+        self.app = web.Application(middlewares=[self._check_request])
+        self.app.add_routes(
+            [
+                web.post("/mint", self.mint),
+                web.post("/mint_k", self.mint_k),
+                web.post("/add_pair", self.add_pair),
+                web.post("/get_data", self.get_data),
+            ]
+        )
+        self.runner: Optional[web.AppRunner] = None
+
+    @web.middleware
+    async def _check_request(self, request: web.Request, handler):
+        if "Origin" in request.headers:
+            return _error("Cross origin requests are not allowed", 403)
+        if self.allowed_hosts is not None and request.url.host not in self.allowed_hosts:
+            return _error(f"Unexpected Host header {request.host!r}", 403)
+        if not secrets.compare_digest(request.headers.get(TOKEN_HEADER, ""), self.token):
+            return _error(f"Missing or wrong {TOKEN_HEADER} header", 401)
+        if request.content_type != "application/json":
+            return _error("Request body must be application/json", 415)
+        return await handler(request)
+
+    @_json_handler
+    async def mint(self, body: dict) -> dict:
+        tx_id, launcher_id = await self.wallet.mint(
+            fee=int(body.get("fee", 0)),
+            multi_op=bool(body.get("multi_op", False)),
+            data=body.get("data"),
+            hashed_data=bool(body.get("hashed_data", False)),
+        )
+        return {"launcher_id": f"0x{launcher_id}", "transaction_id": f"0x{tx_id}"}
+
+    @_json_handler
+    async def mint_k(self, body: dict) -> dict:
+        kwargs = {
+            "fee": int(body.get("fee", 0)),
+            "k": int(body.get("k", 50)),
+            "multi_op": bool(body.get("multi_op", False)),
+            "hashed_data": bool(body.get("hashed_data", False)),
+        }
+        if "data" in body:
+            kwargs["data"] = body["data"]
+        if "max_cost_fraction" in body:
+            kwargs["max_cost_fraction"] = float(body["max_cost_fraction"])
+        success, items, failures = await self.wallet.mint_k(**kwargs)
+        return {
+            "success": success,
+            "items": _mint_items_to_json(items),
+            "failures": [
+                {"items": _mint_items_to_json(chunk.items), "error": str(chunk.error)}
+                for chunk in failures
+            ],
+        }
+
+    @_json_handler
+    async def add_pair(self, body: dict) -> dict:
+        tx_id = await self.wallet.add_pair(
+            _launcher_id(body), (body["key"], body["value"]), fee=int(body.get("fee", 0))
+        )
+        return {"transaction_id": f"0x{tx_id}"}
+
+    @_json_handler
+    async def get_data(self, body: dict) -> dict:
+        version, data = await self.wallet.get_data(_launcher_id(body))
+        return _data_to_json(version, data)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path: str = None):
+        # load the puzzles now rather than on the first request
+        driver.REAI_MOD
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        if socket_path:
+            site = web.UnixSite(self.runner, socket_path)
+        else:
+            site = web.TCPSite(self.runner, host, port)
+            self.allowed_hosts = None if host in WILDCARD_HOSTS else LOCAL_HOSTS + (host,)
+        await site.start()
+        if socket_path:
+            os.chmod(socket_path, 0o600)
+        return site.name
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
@@ -0,0 +1,192 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from blspy import AugSchemeMPL, G2Element, PrivateKey
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.ints import uint64
+from chia.wallet.puzzles.p2_delegated_puzzle_or_hidden_puzzle import (
+    DEFAULT_HIDDEN_PUZZLE_HASH,
+    calculate_synthetic_secret_key,
+    puzzle_for_pk,
+    solution_for_delegated_puzzle,
+)
+from chia.wallet.puzzles import singleton_top_layer
+
+from reai_nft import driver
+
+
+class SigningContext:
+    """
+    Everything derived from the wallet key that spend builders need,
+    computed once per wallet instead of once per coin.
+    """
+
+    def __init__(self, sk: PrivateKey):
+        self.sk = sk
+        self.pk = sk.get_g1()
+        self.synthetic_sk = calculate_synthetic_secret_key(sk, DEFAULT_HIDDEN_PUZZLE_HASH)
+        self.standard_puzzle: Program = puzzle_for_pk(self.pk)
+        self.standard_puzzle_hash: bytes32 = self.standard_puzzle.get_tree_hash()
+        self.reai_puzzle: Program = driver.create_reai_puzzle([], self.pk)
+        self.reai_puzzle_hash: bytes32 = self.reai_puzzle.get_tree_hash()
+        self.reai_puzzle_v2: Program = driver.create_reai_puzzle([], self.pk, multi_op=True)
+        self.reai_puzzle_v2_hash: bytes32 = self.reai_puzzle_v2.get_tree_hash()
+        self.reai_puzzle_v3: Program = driver.create_reai_puzzle([], self.pk, hashed_data=True)
+        self.reai_puzzle_v3_hash: bytes32 = self.reai_puzzle_v3.get_tree_hash()
+
+    def base_reai_puzzle(self, multi_op=False, hashed_data=False) -> Program:
+        """
+        Puzzle new reai nfts are launched with, v2 accepts multi-operation
+        commits and v3 also curries only the hash of the data.
+        """
+        if hashed_data:
+            return self.reai_puzzle_v3
+        return self.reai_puzzle_v2 if multi_op else self.reai_puzzle
+
+    def sign_standard_spend(
+            self, coin: Coin, conditions: List[Program]
+    ) -> Tuple[CoinSpend, G2Element]:
+        """Spends a standard wallet coin with the given conditions."""
+        # same program p2_conditions.puzzle_for_conditions returns, without running clvm
+        delegated_puzzle = Program.to((1, conditions))
+        solution = solution_for_delegated_puzzle(delegated_puzzle, Program.to(0))
+        signature: G2Element = AugSchemeMPL.sign(
+            self.synthetic_sk,
+            (
+                    delegated_puzzle.get_tree_hash()
+                    + coin.name()
+                    + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
+            ),
+        )
+        return CoinSpend(coin, self.standard_puzzle, solution), signature
+
+    def sign_reai_spend(self, coin: Coin, message_hash: bytes32) -> G2Element:
+        """Signs the AGG_SIG_ME the reai puzzle asks for when spending coin."""
+        return AugSchemeMPL.sign(
+            self.sk,
+            message_hash + coin.name() + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA,
+        )
+
+    def build_launch_spend(
+            self, coin: Coin, puzzle: Program, amount: int, fee: int = 0,
+            comment: Optional[Program] = None,
+    ) -> Tuple[SpendBundle, bytes32]:
+        """
+        Spends a standard coin into a singleton launcher of `amount` curried with
+        `puzzle`, keeping the rest minus `fee` as change. `comment` is the
+        launcher's key value list, the initial data of the reai nft.
+        Returns the spend bundle and the launcher id.
+        """
+        (
+            conditions,
+            launcher_coinsol,
+        ) = singleton_top_layer.launch_conditions_and_coinsol(  # noqa
+            coin, puzzle, comment if comment is not None else Program.to([]), amount
+        )
+        if amount < coin.amount:
+            conditions.append(
+                Program.to(
+                    [ConditionOpcode.CREATE_COIN, coin.puzzle_hash, coin.amount - amount - fee]
+                )
+            )
+        coinsol, signature = self.sign_standard_spend(coin, conditions)
+        return SpendBundle([coinsol, launcher_coinsol], signature), launcher_coinsol.coin.name()
+
+
+# signing context of a process pool worker, set by _init_worker
+_worker_context: Optional[SigningContext] = None
+
+
+def _init_worker(sk_bytes: bytes):
+    global _worker_context
+    _worker_context = SigningContext(PrivateKey.from_bytes(sk_bytes))
+
+
+def _build_launch_spends_worker(
+        puzzle_bytes: bytes,
+        amount: int,
+        coins: List[Tuple[bytes, bytes, int, int, Optional[bytes], Optional[bytes]]],
+) -> List[Tuple[bytes, bytes]]:
+    # only bytes cross the process boundary
+    assert _worker_context is not None
+    puzzle = Program.from_bytes(puzzle_bytes)
+    results = []
+    for parent_coin_info, puzzle_hash, coin_amount, fee, coin_puzzle, comment in coins:
+        coin = Coin(bytes32(parent_coin_info), bytes32(puzzle_hash), uint64(coin_amount))
+        spend_bundle, launcher_id = _worker_context.build_launch_spend(
+            coin,
+            Program.from_bytes(coin_puzzle) if coin_puzzle else puzzle,
+            amount,
+            fee,
+            Program.from_bytes(comment) if comment else None,
+        )
+        results.append((bytes(spend_bundle), bytes(launcher_id)))
+    return results
+
+
+class ParallelSpendBuilder:
+    """
+    Builds and signs launch spends in a pool of worker processes, each with
+    its own SigningContext, so large batches don't block the event loop.
+    """
+
+    def __init__(self, sk: PrivateKey, workers: int):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(bytes(sk),)
+        )
+
+    async def build_launch_spends(
+            self,
+            coins: List[Coin],
+            fees: List[int],
+            puzzle: Program,
+            amount: int,
+            puzzles: Optional[List[Program]] = None,
+            comments: Optional[List[Program]] = None,
+    ) -> List[Tuple[SpendBundle, bytes32]]:
+        """
+        puzzles and comments, when given, are per coin and replace the shared
+        puzzle and the empty launcher comment.
+        """
+        loop = asyncio.get_running_loop()
+        puzzles = puzzles or [None] * len(coins)
+        comments = comments or [None] * len(coins)
+        items = [
+            (
+                bytes(coin.parent_coin_info),
+                bytes(coin.puzzle_hash),
+                int(coin.amount),
+                fee,
+                bytes(coin_puzzle) if coin_puzzle is not None else None,
+                bytes(comment) if comment is not None else None,
+            )
+            for coin, fee, coin_puzzle, comment in zip(coins, fees, puzzles, comments)
+        ]
+        # one task per worker keeps the pickling overhead to a few messages
+        size = -(-len(items) // self.workers)
+        futures = [
+            loop.run_in_executor(
+                self.executor,
+                _build_launch_spends_worker,
+                bytes(puzzle),
+                amount,
+                items[i:i + size],
+            )
+            for i in range(0, len(items), size)
+        ]
+        results = []
+        for chunk in await asyncio.gather(*futures):
+            for spend_bundle_bytes, launcher_id in chunk:
+                results.append((SpendBundle.from_bytes(spend_bundle_bytes), bytes32(launcher_id)))
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -1,13 +1,27 @@
+import asyncio
 from contextlib import asynccontextmanager
-from enum import Enum
+from dataclasses import dataclass, field
+from functools import partial
 from pprint import pprint
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import aiohttp
 
 from reai_nft import driver
-from reai_nft.driver import get_inner_puzzle_reveal, solution_for_reai
-from blspy import AugSchemeMPL, G2Element, PrivateKey
+from reai_nft.coin_pool import CoinPool
+from reai_nft.cost import DEFAULT_MAX_COST_FRACTION, max_spend_bundle_cost, spend_bundle_cost
+from reai_nft.driver import solution_for_reai
+from reai_nft.preflight import PreflightError, preflight_spend_bundle
+from reai_nft.lineage import LineageStore, default_lineage_db_path
+from reai_nft.node_client import (
+    DEFAULT_CONCURRENCY,
+    Operation,
+    ReaiNodeClient,
+    SingletonState,
+    get_node_client,
+)
+from reai_nft.signing import ParallelSpendBuilder, SigningContext
+from blspy import G2Element, PrivateKey
 from chia.consensus.coinbase import create_puzzlehash_for_pk
 from chia.consensus.default_constants import DEFAULT_CONSTANTS
 from chia.rpc.full_node_rpc_client import FullNodeRpcClient
@@ -16,7 +30,6 @@ from chia.types.blockchain_format.coin import Coin
 from chia.types.blockchain_format.program import Program
 from chia.types.blockchain_format.sized_bytes import bytes32
 from chia.types.blockchain_format.tree_hash import sha256_treehash
-from chia.types.coin_record import CoinRecord
 from chia.types.coin_spend import CoinSpend
 from chia.types.spend_bundle import SpendBundle
 from chia.util.bech32m import decode_puzzle_hash, encode_puzzle_hash
@@ -27,45 +40,17 @@ from chia.util.ints import uint16, uint32, uint64
 from chia.wallet.derive_keys import (
     master_sk_to_wallet_sk,
 )
-from chia.wallet.lineage_proof import LineageProof
-from chia.wallet.puzzles import (
-    p2_conditions,
-    p2_delegated_puzzle_or_hidden_puzzle,
-    singleton_top_layer,
-)
-from chia.wallet.puzzles.p2_delegated_puzzle_or_hidden_puzzle import (
-    calculate_synthetic_secret_key,
-)
+from chia.wallet.puzzles import singleton_top_layer
 from clvm.casts import int_from_bytes, int_to_bytes
 import random
+import time
 
 COIN_AMOUNT = 1
-
-
-class Operation(Enum):
-    ADD = 16
-    REMOVE = 17
-
-
-async def get_node_client(config_path=DEFAULT_ROOT_PATH) -> Optional[FullNodeRpcClient]:
-    try:
-        if not config_path:
-            config_path = DEFAULT_ROOT_PATH
-        config = load_config(config_path, "config.yaml")
-        self_hostname = config["self_hostname"]
-        full_node_rpc_port = config["full_node"]["rpc_port"]
-        full_node_client: FullNodeRpcClient = await FullNodeRpcClient.create(
-            self_hostname, uint16(full_node_rpc_port), DEFAULT_ROOT_PATH, config
-        )
-        return full_node_client
-    except Exception as e:
-        if isinstance(e, aiohttp.ClientConnectorError):
-            pprint(
-                f"Connection error. Check if full node is running at {full_node_rpc_port}"
-            )
-        else:
-            pprint(f"Exception from 'harvester' {e}")
-        return None
+# outputs of one split spend, about a quarter of the spend bundle cost limit
+MAX_SPLIT_OUTPUTS = 500
+# the full node only lets a spend bundle replace conflicting mempool items
+# when it pays at least this much more in fees, MEMPOOL_MIN_FEE_INCREASE in chia
+MIN_REPLACEMENT_FEE = 10000000
 
 
 async def get_wallet_client(config_path=DEFAULT_ROOT_PATH) -> Optional[WalletRpcClient]:
@@ -89,7 +74,30 @@ async def get_wallet_client(config_path=DEFAULT_ROOT_PATH) -> Optional[WalletRpc
         return None
 
 
-class ReaiWallet:
+@dataclass
+class ChunkResult:
+    spend_bundle: SpendBundle
+    items: list
+    error: Optional[Exception] = None
+
+
+@dataclass
+class BulkResult:
+    launcher_id: bytes32
+    transaction_id: Optional[bytes32] = None
+    error: Optional[Exception] = None
+
+
+@dataclass
+class PendingSingleton:
+    # state of the unconfirmed child singleton
+    state: SingletonState
+    # the bundle in the mempool that creates it
+    spend_bundle: SpendBundle
+    checked_at: float = field(default_factory=time.monotonic)
+
+
+class ReaiWallet(ReaiNodeClient):
     def __init__(
             self,
             wallet_id: str,
@@ -98,15 +106,37 @@ class ReaiWallet:
             wallet_address,
             private_key: PrivateKey,
             verbose=False,
+            lineage_store: Optional[LineageStore] = None,
     ):
+        super().__init__(node, verbose=verbose, lineage_store=lineage_store)
         self.wallet_client = wallet_client
         self.wallet_id = wallet_id
-        self.node_client = node
         self.private_key = private_key
         self.wallet_address = wallet_address
         self.sk = master_sk_to_wallet_sk(self.private_key, uint32(0))
         self.pk = self.sk.get_g1()
-        self.verbose = verbose
+        self.signing = SigningContext(self.sk)
+        self.coin_pool = CoinPool(node, decode_puzzle_hash(wallet_address))
+        # validate spend bundles locally but never push them
+        self.dry_run = False
+        # bundles paying a lower fee are refused before pushing, see --min-fee
+        self.min_fee = 0
+        # builds mint_k spends in worker processes, see set_signing_workers
+        self.spend_builder: Optional[ParallelSpendBuilder] = None
+        # mutate nfts whose last spend is still in the mempool, see _resolve_for_spend
+        self.chain_mempool = False
+        # launcher id -> unconfirmed singleton created by the last spend pushed
+        self.in_flight: Dict[bytes32, PendingSingleton] = {}
+        # cost of one launch in the last mint_k batch, what batch sizing goes by
+        self.launch_cost: Optional[int] = None
+
+    def set_signing_workers(self, workers: int):
+        """Signs mint_k batches in `workers` processes, 0 or 1 signs in-process."""
+        if self.spend_builder:
+            self.spend_builder.close()
+            self.spend_builder = None
+        if workers > 1:
+            self.spend_builder = ParallelSpendBuilder(self.sk, workers)
 
     @staticmethod
     @asynccontextmanager
@@ -149,6 +179,7 @@ class ReaiWallet:
                 wallet_address,
                 private_key,
                 verbose=verbose,
+                lineage_store=LineageStore(default_lineage_db_path(config_file_path)),
             )
             if verbose:
                 print(f"Connected to wallet: {wallet_address}")
@@ -159,179 +190,424 @@ class ReaiWallet:
 
     async def close(self):
         self.wallet_client.close()
-        self.node_client.close()
         await self.wallet_client.await_closed()
-        await self.node_client.await_closed()
-
-    async def _mutate_data(
-            self, coin_name: bytes32, operation: Operation, value, fee=0
-    ) -> bytes32:
-
-        parent_record, singleton_record = await self._get_latest_singleton(coin_name)
-
-        coin_spend = await self.node_client.get_puzzle_and_solution(
-            parent_record.coin.name(), parent_record.spent_block_index
-        )
-        lineage_proof: LineageProof = singleton_top_layer.lineage_proof_for_coinsol(
-            coin_spend
+        await super().close()
+        if self.spend_builder:
+            self.spend_builder.close()
+
+    def _puzzle_kind(self, coin_name: bytes32, state: SingletonState) -> Tuple[bool, bool]:
+        """Whether the nft's puzzle takes multi-op commits and curries hashed data."""
+        if state.multi_op is not None:
+            return state.multi_op, bool(state.hashed_data)
+        # fresh nft, the launcher spend doesn't reveal the inner puzzle
+        for multi_op, hashed_data in driver.PUZZLE_KINDS:
+            puzzle_hash = driver.singleton_puzzle_hash(
+                coin_name,
+                driver.reai_puzzle_hash(
+                    state.data, self.pk, multi_op=multi_op, hashed_data=hashed_data
+                ),
+            )
+            if puzzle_hash == state.singleton.puzzle_hash:
+                return multi_op, hashed_data
+        return False, False
+
+    def _launch_puzzle(
+            self, data=None, multi_op=False, hashed_data=False
+    ) -> Tuple[Program, Program]:
+        """
+        Inner puzzle of a new reai nft holding `data`, a list of (key, value)
+        pairs, and the launcher comment that records the data for readers.
+        """
+        if not data:
+            return self.signing.base_reai_puzzle(multi_op, hashed_data), Program.to([])
+        for pair in data:
+            self._check_pair(pair)
+        data = [tuple(pair) for pair in data]
+        puzzle = driver.create_reai_puzzle(
+            data, self.pk, multi_op=multi_op, hashed_data=hashed_data
+        )
+        return puzzle, Program.to(data)
+
+    def _singleton_spend(
+            self, coin_name: bytes32, state: SingletonState, inner_solution: Program, message
+    ) -> SpendBundle:
+        """Spends the reai singleton of `state`, signing the tree hash of message."""
+        multi_op, hashed_data = self._puzzle_kind(coin_name, state)
+        puzzle = driver.create_reai_puzzle(
+            state.data,
+            self.pk,
+            version=state.version,
+            multi_op=multi_op,
+            hashed_data=hashed_data,
         )
-        singleton: Coin = singleton_record.coin
-        version, data = await self.get_data(coin_name)
-        if self.verbose:
-            print(f"Mutating {version=} and {data=}")
-        puzzle = driver.create_reai_puzzle(data, self.pk, version=version)
         puzzle_reveal: Program = singleton_top_layer.puzzle_for_singleton(
             coin_name,
             puzzle,
         )
-        new_version = version + 1
-        if self.verbose:
-            print(f"Applying {new_version=} with {operation=} {value=}")
-        inner_solution = solution_for_reai(new_version, [operation.value, value])
         full_solution: Program = singleton_top_layer.solution_for_singleton(
-            lineage_proof, singleton.amount, inner_solution
+            state.lineage_proof, state.singleton.amount, inner_solution
         )
-
-        signature: G2Element = AugSchemeMPL.sign(
-            self.sk,
-            (
-                    sha256_treehash(Program.to([operation.value, value]))
-                    + singleton.name()
-                    + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
-            ),
+        signature: G2Element = self.signing.sign_reai_spend(
+            state.singleton, sha256_treehash(Program.to(message))
         )
-        singleton_spend = SpendBundle(
+        return SpendBundle(
             [
-                CoinSpend(singleton, puzzle_reveal, full_solution),
+                CoinSpend(state.singleton, puzzle_reveal, full_solution),
             ],
             signature,
         )
+
+    def _mutation_spend(
+            self, coin_name: bytes32, state: SingletonState, operations: List[Tuple[Operation, object]]
+    ) -> SpendBundle:
+        if not operations:
+            raise ValueError("Nothing to apply")
+        multi_op, hashed_data = self._puzzle_kind(coin_name, state)
+        if len(operations) > 1 and not multi_op:
+            raise ValueError(
+                "Only reai nfts minted with --multi-op or --hashed-data accept "
+                "several edits in one spend"
+            )
+        self._check_removals(state.data, operations)
+        if self.verbose:
+            print(f"Mutating version={state.version} and data={state.data}")
+        new_version = state.version + 1
+        if hashed_data:
+            commit = self._hashed_data_commit(state.data, operations)
+        else:
+            commit = [[operation.value, value] for operation, value in operations]
+        if not multi_op:
+            commit = commit[0]
+        if self.verbose:
+            print(f"Applying {new_version=} with {commit=}")
+        return self._singleton_spend(
+            coin_name, state, solution_for_reai(new_version, commit), commit
+        )
+
+    @staticmethod
+    def _check_removals(data: list, operations: List[Tuple[Operation, object]]):
+        # v1 and v2 puzzles ignore a removal with no pair at its index, the edit
+        # would be paid for and reported without changing anything, and v3
+        # ones have no proof to check it against
+        size = len(data)
+        for operation, value in operations:
+            if operation == Operation.ADD:
+                size += 1
+                continue
+            index = int_from_bytes(value)
+            if not 0 <= index < size:
+                raise ValueError(f"No pair at index {index}")
+            size -= 1
+
+    @staticmethod
+    def _hashed_data_commit(data: list, operations: List[Tuple[Operation, object]]) -> list:
+        # v3 puzzles only know the data root, removals carry a proof against
+        # the data as left by the previous operations
+        data = list(data)
+        commit = []
+        for operation, value in operations:
+            if operation == Operation.ADD:
+                pair = tuple(value)
+                data.insert(0, pair)
+                commit.append([operation.value, pair])
+            else:
+                index = int_from_bytes(value)
+                commit.append([operation.value, driver.removal_proof(data, index)])
+                del data[index]
+        return commit
+
+    def _freeze_spend(self, coin_name: bytes32, state: SingletonState) -> SpendBundle:
+        new_version = 0
+        return self._singleton_spend(
+            coin_name, state, solution_for_reai(new_version), new_version
+        )
+
+    def _ownership_spend(
+            self, coin_name: bytes32, state: SingletonState, new_pub_key
+    ) -> SpendBundle:
+        return self._singleton_spend(
+            coin_name,
+            state,
+            solution_for_reai(state.version, new_pub_key=new_pub_key),
+            new_pub_key,
+        )
+
+    async def _resolve_for_spend(
+            self, coin_name: bytes32
+    ) -> Tuple[SingletonState, Optional[SpendBundle]]:
+        """
+        The singleton state to spend and, with chain_mempool, the bundle still in
+        the mempool that creates it. The new spend is then pushed together with
+        that bundle and replaces it, so by the mempool rules it must pay at least
+        MIN_REPLACEMENT_FEE on top, which _push_singleton_spend checks.
+        """
+        pending = self.in_flight.get(coin_name) if self.chain_mempool else None
+        if pending:
+            tx_id = pending.spend_bundle.name()
+            if await self.node_client.get_mempool_item_by_tx_id(tx_id) is not None:
+                if self.verbose:
+                    print(f"Chaining onto unconfirmed singleton of 0x{tx_id}")
+                return pending.state, pending.spend_bundle
+            # confirmed or dropped, the node knows the tip again
+            del self.in_flight[coin_name]
+        return await self._resolve_singleton_state(coin_name), None
+
+    def _track_in_flight(
+            self,
+            coin_name: bytes32,
+            state: SingletonState,
+            singleton_spend: SpendBundle,
+            pushed: SpendBundle,
+    ):
+        coin_spend = singleton_spend.coin_spends[0]
+        spend = driver.decode_reai_spend(bytes(coin_spend.puzzle_reveal), bytes(coin_spend.solution))
+        version, data = self._data_from_reai_spend(spend, state.data)
+        self.in_flight[coin_name] = PendingSingleton(
+            SingletonState(
+                None,
+                singleton_spend.additions()[0],
+                coin_spend,
+                singleton_top_layer.lineage_proof_for_coinsol(coin_spend),
+                version,
+                data,
+                spend.multi_op,
+                spend.hashed_data,
+            ),
+            pushed,
+        )
+
+    async def _prune_in_flight(self):
+        """
+        Forgets the in flight singletons whose bundle left the mempool, confirmed
+        or dropped, checking each at most every mempool_check_interval like the
+        coin pool does.
+        """
+        now = time.monotonic()
+        stale = [
+            (coin_name, pending) for coin_name, pending in self.in_flight.items()
+            if now - pending.checked_at > self.coin_pool.mempool_check_interval
+        ]
+        for coin_name, pending in stale:
+            pending.checked_at = now
+        items = await asyncio.gather(*[
+            self.node_client.get_mempool_item_by_tx_id(pending.spend_bundle.name())
+            for _, pending in stale
+        ])
+        for (coin_name, pending), item in zip(stale, items):
+            # a spend pushed meanwhile replaced the entry
+            if item is None and self.in_flight.get(coin_name) is pending:
+                del self.in_flight[coin_name]
+
+    async def _push_singleton_spend(
+            self,
+            coin_name: bytes32,
+            state: SingletonState,
+            singleton_spend: SpendBundle,
+            fee=0,
+            pending: Optional[SpendBundle] = None,
+    ) -> bytes32:
+        if pending and fee < MIN_REPLACEMENT_FEE:
+            raise ValueError(
+                f"The previous edit 0x{pending.name()} is still in the mempool, chaining onto it "
+                f"replaces it and needs a fee of at least {MIN_REPLACEMENT_FEE} mojos, got {fee}"
+            )
+        spend_bundle = singleton_spend
+        if pending:
+            spend_bundle = SpendBundle.aggregate([pending, spend_bundle])
         if fee > 0:
             fee_spend = await self._get_fee_spend_bundle(fee)
-            singleton_spend = SpendBundle.aggregate([singleton_spend, fee_spend])
+            spend_bundle = SpendBundle.aggregate([spend_bundle, fee_spend])
         if self.verbose:
-            singleton_spend.debug(
+            spend_bundle.debug(
                 agg_sig_additional_data=DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
             )
-        result = await self.node_client.push_tx(singleton_spend)
+        result = await self._push_tx(spend_bundle)
         if result and result.get("success"):
-            return singleton_spend.name()
-        singleton_spend.debug()
-        raise Exception("Error pushing transaction: %s" % singleton_spend.name())
+            if self.chain_mempool and not self.dry_run:
+                self._track_in_flight(coin_name, state, singleton_spend, spend_bundle)
+                await self._prune_in_flight()
+            return spend_bundle.name()
+        raise Exception("Error pushing transaction: %s" % spend_bundle.name())
 
-    async def add_pair(
-            self, coin_name: bytes32, pair: Tuple[bytes, bytes], fee=0
-    ) -> bool:
+    async def _mutate_data(
+            self, coin_name: bytes32, operations: List[Tuple[Operation, object]], fee=0
+    ) -> bytes32:
+        state, pending = await self._resolve_for_spend(coin_name)
+        return await self._push_singleton_spend(
+            coin_name, state, self._mutation_spend(coin_name, state, operations), fee, pending
+        )
+
+    @staticmethod
+    def _check_pair(pair):
         if not isinstance(pair, (tuple, list)):
             raise ValueError("cons must be tuple or list")
         if len(pair) != 2:
             raise ValueError("Pairs must contain 2 items exactly")
-        return await self._mutate_data(coin_name, Operation.ADD, pair, fee=fee)
+
+    async def add_pair(
+            self, coin_name: bytes32, pair: Tuple[bytes, bytes], fee=0
+    ) -> bool:
+        self._check_pair(pair)
+        return await self._mutate_data(coin_name, [(Operation.ADD, pair)], fee=fee)
 
     async def remove_pair_at(self, coin_name, index: int, fee=0) -> int:
         return await self._mutate_data(
-            coin_name, Operation.REMOVE, int_to_bytes(index), fee=fee
+            coin_name, [(Operation.REMOVE, int_to_bytes(index))], fee=fee
         )
 
-    async def freeze(self, coin_name, fee=0) -> bool:
-        parent_record, singleton_record = await self._get_latest_singleton(coin_name)
+    async def apply_edits(
+            self, coin_name: bytes32, edits: List[Tuple[Operation, object]], fee=0
+    ) -> bytes32:
+        """
+        Applies many edits in one spend, in order: (Operation.ADD, (key, value))
+        prepends a pair and (Operation.REMOVE, index) removes the pair at index
+        of the data as left by the previous edits.
+        Only works on reai nfts minted with the multi-op or hashed data puzzle.
+        """
+        operations = []
+        for operation, value in edits:
+            if operation == Operation.ADD:
+                self._check_pair(value)
+                operations.append((operation, value))
+            elif operation == Operation.REMOVE:
+                operations.append((operation, int_to_bytes(int(value))))
+            else:
+                raise ValueError(f"Unknown operation: {operation}")
+        return await self._mutate_data(coin_name, operations, fee=fee)
 
-        coin_spend = await self.node_client.get_puzzle_and_solution(
-            parent_record.coin.name(), parent_record.spent_block_index
-        )
-        lineage_proof: LineageProof = singleton_top_layer.lineage_proof_for_coinsol(
-            coin_spend
-        )
-        singleton: Coin = singleton_record.coin
-        version, data = await self.get_data(coin_name)
-        puzzle = driver.create_reai_puzzle(data, self.pk, version=version)
-        puzzle_reveal: Program = singleton_top_layer.puzzle_for_singleton(
-            coin_name,
-            puzzle,
-        )
-        new_version = 0
-        inner_solution = solution_for_reai(new_version)
-        full_solution: Program = singleton_top_layer.solution_for_singleton(
-            lineage_proof, singleton.amount, inner_solution
+    async def freeze(self, coin_name, fee=0) -> bool:
+        state, pending = await self._resolve_for_spend(coin_name)
+        return await self._push_singleton_spend(
+            coin_name, state, self._freeze_spend(coin_name, state), fee, pending
         )
 
-        signature: G2Element = AugSchemeMPL.sign(
-            self.sk,
-            (
-                    sha256_treehash(Program.to(new_version))
-                    + singleton.name()
-                    + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
-            ),
-        )
-        singleton_spend = SpendBundle(
-            [
-                CoinSpend(singleton, puzzle_reveal, full_solution),
-            ],
-            signature,
-        )
-        if fee > 0:
-            fee_spend = await self._get_fee_spend_bundle(fee)
-            singleton_spend = SpendBundle.aggregate([singleton_spend, fee_spend])
-        if self.verbose:
-            singleton_spend.debug()
-        result = await self.node_client.push_tx(singleton_spend)
-        if result and result.get("success"):
-            return singleton_spend.name()
-        raise Exception("Error pushing transaction: %s" % singleton_spend.name())
+    async def set_ownership(self, coin_name, new_pub_key: bytes32, fee=0) -> bool:
+        state, pending = await self._resolve_for_spend(coin_name)
+        return await self._push_singleton_spend(
+            coin_name, state, self._ownership_spend(coin_name, state, new_pub_key), fee, pending
+        )
+
+    def _bulk_spend(self, launcher_id: bytes32, state: SingletonState, operation) -> SpendBundle:
+        kind, *args = operation
+        if kind == "add":
+            self._check_pair(args[0])
+            return self._mutation_spend(launcher_id, state, [(Operation.ADD, args[0])])
+        if kind == "remove":
+            return self._mutation_spend(
+                launcher_id, state, [(Operation.REMOVE, int_to_bytes(int(args[0])))]
+            )
+        if kind == "freeze":
+            return self._freeze_spend(launcher_id, state)
+        if kind == "owner":
+            return self._ownership_spend(launcher_id, state, args[0])
+        raise ValueError(f"Unknown operation: {kind}")
 
-    async def get_data(self, coin_name) -> Tuple[int, list]:
-        try:
-            parent_record, _ = await self._get_latest_singleton(coin_name)
-        except ValueError:
-            return 1, []
-        coin_spend = await self.node_client.get_puzzle_and_solution(
-            parent_record.coin.name(), parent_record.spent_block_index
+    def _fee_spend_cost(self) -> int:
+        # every fee spend is the same standard spend, cost a throwaway one
+        coin = Coin(bytes32(bytes(32)), self.signing.standard_puzzle_hash, uint64(2))
+        coinsol, signature = self.signing.sign_standard_spend(
+            coin, [Program.to([ConditionOpcode.CREATE_COIN, coin.puzzle_hash, 1])]
         )
-        puzzle_reveal = get_inner_puzzle_reveal(coin_spend)
-        if not puzzle_reveal:
-            return 1, []
-        solution_args = coin_spend.solution.to_program().rest().rest().first()
-        commit = solution_args.rest().first().as_python()
-        version = solution_args.first().as_python()
-        version = int_from_bytes(version)
-        r = coin_spend.puzzle_reveal.uncurry()
-        _, args = r
-        # extract curried data from previous version
-        data = (
-            args.rest()
-                .first()
-                .rest()
-                .rest()
-                .first()
-                .rest()
-                .rest()
-                .first()
-                .rest()
-                .first()
-        ).as_python()
-        if len(data) == 1:
-            data = int_from_bytes(data[0])
-            data = []
-        else:
-            data = data[1:]
-        if commit:
-            op = int_from_bytes(commit[0])
-            # manually apply last commit to data to
-            # get latest version of data content
-            if op == Operation.ADD.value:
-                data.insert(0, commit[1])
-            elif op == Operation.REMOVE.value:
-                index = int_from_bytes(commit[1])
-                del data[index]
+        return spend_bundle_cost(SpendBundle([coinsol], signature))
+
+    async def mutate_many(
+            self,
+            items: List[Tuple[bytes32, tuple]],
+            fee=0,
+            max_cost_fraction=DEFAULT_MAX_COST_FRACTION,
+            concurrency=DEFAULT_CONCURRENCY,
+    ) -> List[BulkResult]:
+        """
+        Applies one operation to each of many reai nfts: ("add", (key, value)),
+        ("remove", index), ("freeze",) or ("owner", new_pub_key).
+
+        The singleton states are resolved concurrently and the spends are pushed
+        aggregated in as few bundles as fit under the cost limit, each carrying
+        one fee spend for its share of `fee`. Returns a result per launcher id.
+        """
+        launcher_ids = [launcher_id for launcher_id, _ in items]
+        if len(set(launcher_ids)) != len(launcher_ids):
+            raise ValueError("A reai nft can only be spent once per batch")
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def build(launcher_id, operation):
+            async with semaphore:
+                state = await self._resolve_singleton_state(launcher_id)
+            spend = self._bulk_spend(launcher_id, state, operation)
+            return spend, spend_bundle_cost(spend)
+
+        built = await asyncio.gather(
+            *[build(launcher_id, operation) for launcher_id, operation in items],
+            return_exceptions=True,
+        )
+        results = {}
+        chunks: List[Tuple[List[SpendBundle], list]] = []
+        chunk_cost = 0
+        budget = max_spend_bundle_cost(max_cost_fraction)
+        if fee > 0:
+            budget -= self._fee_spend_cost()
+        for launcher_id, spend in zip(launcher_ids, built):
+            if isinstance(spend, Exception):
+                results[launcher_id] = BulkResult(launcher_id, error=spend)
+                continue
+            spend_bundle, cost = spend
+            if not chunks or chunk_cost + cost > budget:
+                chunks.append(([], []))
+                chunk_cost = 0
+            chunks[-1][0].append(spend_bundle)
+            chunks[-1][1].append(launcher_id)
+            chunk_cost += cost
+        if chunks:
+            if self.verbose:
+                print(f"Pushing {sum(len(ids) for _, ids in chunks)} spends in {len(chunks)} bundles")
+            try:
+                await self._add_fee_spends(chunks, fee)
+            except Exception as e:
+                for _, chunk_ids in chunks:
+                    for launcher_id in chunk_ids:
+                        results[launcher_id] = BulkResult(launcher_id, error=e)
             else:
-                raise ValueError(f"Bad commit: {commit}")
-        return version, data
+                for chunk in await self._push_chunks(chunks):
+                    for launcher_id in chunk.items:
+                        if chunk.error:
+                            results[launcher_id] = BulkResult(launcher_id, error=chunk.error)
+                        else:
+                            results[launcher_id] = BulkResult(
+                                launcher_id, chunk.spend_bundle.name()
+                            )
+        return [results[launcher_id] for launcher_id in launcher_ids]
+
+    async def _add_fee_spends(self, chunks: List[Tuple[List[SpendBundle], list]], fee):
+        """
+        Adds a spend paying its share of `fee` to each chunk. The fee coins are
+        reserved together, and released again if any of them can't be spent.
+        """
+        fees = [fee // len(chunks)] * len(chunks)
+        fees[0] += fee % len(chunks)
+        paying = [
+            (spend_bundles, chunk_fee)
+            for (spend_bundles, _), chunk_fee in zip(chunks, fees) if chunk_fee > 0
+        ]
+        if not paying:
+            return
+        coins = await self.coin_pool.acquire(len(paying))
+        if not coins:
+            raise ValueError(f"Not enough usable coins for the fees of {len(paying)} bundles")
+        try:
+            fee_spends = [
+                self._fee_spend_bundle(coin, chunk_fee)
+                for coin, (_, chunk_fee) in zip(coins, paying)
+            ]
+        except Exception:
+            self.coin_pool.release(coins)
+            raise
+        for (spend_bundles, _), fee_spend in zip(paying, fee_spends):
+            spend_bundles.append(fee_spend)
 
     async def _get_fee_spend_bundle(self, fee):
-        starting_coin = await self._find_usable_coin()
-        starting_puzzle: Program = p2_delegated_puzzle_or_hidden_puzzle.puzzle_for_pk(
-            self.pk
-        )  # noqa
+        return self._fee_spend_bundle(await self._find_usable_coin(), fee)
+
+    def _fee_spend_bundle(self, starting_coin: Coin, fee) -> SpendBundle:
         conditions = [Program.to(
             [
                 ConditionOpcode.CREATE_COIN,
@@ -339,234 +615,313 @@ class ReaiWallet:
                 starting_coin.amount - fee,
             ]
         )]
-        full_solution: Program = (
-            p2_delegated_puzzle_or_hidden_puzzle.solution_for_conditions(conditions)
-        )  # noqa
-
-        starting_coinsol = CoinSpend(
-            starting_coin,
-            starting_puzzle,
-            full_solution,
-        )
-        delegated_puzzle: Program = p2_conditions.puzzle_for_conditions(conditions)
-
-        ssk = calculate_synthetic_secret_key(
-            self.sk, p2_delegated_puzzle_or_hidden_puzzle.DEFAULT_HIDDEN_PUZZLE_HASH
-        )
-        signature: G2Element = AugSchemeMPL.sign(
-            ssk,
-            (
-                    delegated_puzzle.get_tree_hash()
-                    + starting_coin.name()
-                    + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
-            ),
+        starting_coinsol, signature = self.signing.sign_standard_spend(
+            starting_coin, conditions
         )
 
         spend_bundle = SpendBundle([starting_coinsol], signature)
         return spend_bundle
 
     async def _find_usable_coin(self) -> Coin:
-        puzzle_hash = decode_puzzle_hash(self.wallet_address)
-        unspent_coin_records: List[
-            CoinRecord
-        ] = await self.node_client.get_coin_records_by_puzzle_hash(
-            puzzle_hash, include_spent_coins=False
-        )
-
-        coin_record: CoinRecord
-        for coin_record in unspent_coin_records:
-            coin: Coin = coin_record.coin
-            if coin.amount > 0 and not coin_record.spent:
-                return coin
-        raise ValueError("No usable coins found in the wallet. Pick another.")
+        """Reserves a coin in the pool, it's released or committed by _push_tx."""
+        coins = await self.coin_pool.acquire(1)
+        if not coins:
+            raise ValueError("No usable coins found in the wallet. Pick another.")
+        return coins[0]
 
     async def _find_usable_coins(self) -> List[Coin]:
-        puzzle_hash = decode_puzzle_hash(self.wallet_address)
-        unspent_coin_records: List[
-            CoinRecord
-        ] = await self.node_client.get_coin_records_by_puzzle_hash(
-            puzzle_hash, include_spent_coins=False
-        )
-        coins_with_balance = []
-        coin_record: CoinRecord
-        for coin_record in unspent_coin_records:
-            coin: Coin = coin_record.coin
-            if coin.amount > 0 and not coin_record.spent:
-                coins_with_balance.append(coin)
+        coins_with_balance = await self.coin_pool.available_coins()
         if len(coins_with_balance) < 1:
             raise ValueError("No usable coins found in the wallet. Pick another.")
         return coins_with_balance
 
+    async def _push_tx(self, spend_bundle: SpendBundle):
+        if self.verbose or self.dry_run:
+            preflight = preflight_spend_bundle(spend_bundle, min_fee=self.min_fee)
+            print(f"Preflight: {preflight}")
+        else:
+            # the wallet signed the bundle itself, so the pairing check is left
+            # to the node and the puzzles are run off the event loop
+            preflight = await asyncio.get_running_loop().run_in_executor(
+                None,
+                partial(
+                    preflight_spend_bundle, spend_bundle, self.min_fee, check_signature=False
+                ),
+            )
+        if not preflight.ok:
+            self.coin_pool.release(spend_bundle.removals())
+            raise PreflightError(preflight)
+        if self.dry_run:
+            self.coin_pool.release(spend_bundle.removals())
+            return {"success": True, "dry_run": True}
+        try:
+            resp = await self.node_client.push_tx(spend_bundle)
+        except Exception:
+            self.coin_pool.release(spend_bundle.removals())
+            raise
+        if resp and resp.get("success"):
+            self.coin_pool.commit(spend_bundle)
+        else:
+            self.coin_pool.release(spend_bundle.removals())
+        return resp
+
+    @staticmethod
+    def _split_amounts(amount: int, k: int, fee=0, coin_amount: Optional[int] = None) -> List[int]:
+        """
+        Amounts splitting a coin of `amount` minus `fee` into k coins, evenly
+        or of about coin_amount each with the rest as one change coin. Coins
+        created by one spend must differ, so the amounts step by one mojo.
+        """
+        if k < 1:
+            raise ValueError("Nothing to split into")
+        spread = k * (k - 1) // 2
+        if coin_amount is None:
+            base = (amount - fee - spread) // k
+            if base < 1:
+                raise ValueError(f"A coin of {amount} can't be split into {k} coins")
+            amounts = [base + i for i in range(k)]
+            amounts[-1] += amount - fee - sum(amounts)
+            return amounts
+        amounts = [coin_amount + i for i in range(k)]
+        change = amount - fee - sum(amounts)
+        if change < 0:
+            raise ValueError(f"A coin of {amount} can't make {k} coins of {coin_amount}")
+        if change in amounts:
+            amounts[-1] += change
+        elif change > 0:
+            amounts.append(change)
+        return amounts
+
+    @staticmethod
+    def _affordable_splits(amount: int, coin_amount: int, fee=0) -> int:
+        """How many coins of about coin_amount a coin of `amount` can be split into."""
+        k = min(MAX_SPLIT_OUTPUTS, max(0, (amount - fee) // coin_amount))
+        while k > 0 and k * coin_amount + k * (k - 1) // 2 + fee > amount:
+            k -= 1
+        return k
+
+    def _split_spend(self, coin: Coin, amounts: List[int]) -> SpendBundle:
+        conditions = [
+            Program.to([ConditionOpcode.CREATE_COIN, coin.puzzle_hash, amount])
+            for amount in amounts
+        ]
+        coinsol, signature = self.signing.sign_standard_spend(coin, conditions)
+        return SpendBundle([coinsol], signature)
+
     async def split_largest_coin_into_k(self, k=10, fee=0) -> bool:
-        puzzle = driver.create_reai_puzzle([], self.pk)
-        starting_coins = await self._find_usable_coins()
+        """Splits the largest usable coin into k coins of about the same amount."""
+        starting_coins = await self.coin_pool.acquire(
+            1, lambda coins, _: [max(coins, key=lambda c: c.amount)]
+        )
         if not starting_coins or len(starting_coins) == 0:
             return False
         largest_coin = starting_coins[0]
-        for c in starting_coins:
-            if c.amount > largest_coin.amount:
-                largest_coin = c
-
-        if largest_coin.amount <= k + fee:
+        try:
+            amounts = self._split_amounts(largest_coin.amount, k, fee)
+        except ValueError:
+            self.coin_pool.release(starting_coins)
             return False
 
-        (
-            conditions,
-            launcher_coinsol,
-        ) = singleton_top_layer.launch_conditions_and_coinsol(  # noqa
-            largest_coin, puzzle, Program.to([]), 1
-        )
-        total_available = largest_coin.amount - 1
-        if k + fee < total_available:
-            amount_per_coin = (total_available - fee) // k
-            alreadyAdded = 0
-            for x in range(0, k):
-                amount_to_assign = amount_per_coin - k + x
-                if x == k - 1:
-                    amount_to_assign = total_available - fee - alreadyAdded
-                conditions.append(
-                    Program.to(
-                        [
-                            ConditionOpcode.CREATE_COIN,
-                            largest_coin.puzzle_hash,
-                            amount_to_assign,
-                        ]
-                    )
-                )
-                alreadyAdded = alreadyAdded + amount_to_assign
-
-        full_solution: Program = (
-            p2_delegated_puzzle_or_hidden_puzzle.solution_for_conditions(conditions)
-        )  # noqa
-
-        largest_coin_puzzle: Program = p2_delegated_puzzle_or_hidden_puzzle.puzzle_for_pk(
-            self.pk
-        )  # noqa
-
-        largest_coinsol = CoinSpend(
-            largest_coin,
-            largest_coin_puzzle,
-            full_solution,
-        )
-        delegated_puzzle: Program = p2_conditions.puzzle_for_conditions(conditions)
-
-        ssk = calculate_synthetic_secret_key(
-            self.sk, p2_delegated_puzzle_or_hidden_puzzle.DEFAULT_HIDDEN_PUZZLE_HASH
-        )
-        signature: G2Element = AugSchemeMPL.sign(
-            ssk,
-            (
-                    delegated_puzzle.get_tree_hash()
-                    + largest_coin.name()
-                    + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
-            ),
-        )
-
-        spend_bundle = SpendBundle([largest_coinsol, launcher_coinsol], signature)
-        resp = await self.node_client.push_tx(spend_bundle)
+        resp = await self._push_tx(self._split_spend(largest_coin, amounts))
         if not resp["success"]:
             raise ValueError("Couldn't push the transaction: %s" % resp)
 
         return True
 
+    async def split_coins(
+            self, count: int, coin_amount: int, fee=0, max_parallel=4
+    ) -> Tuple[int, List[str]]:
+        """
+        Splits up to max_parallel of the largest usable coins into about
+        `count` coins of coin_amount, one bundle per split pushed at the same
+        time, each paying `fee`. Returns the number of coins the pushed splits
+        create and why the other splits failed.
+        """
+        splits = max(1, min(max_parallel, -(-count // MAX_SPLIT_OUTPUTS)))
+
+        def choose(coins: List[Coin], _) -> List[Coin]:
+            largest = sorted(coins, key=lambda c: c.amount, reverse=True)[:splits]
+            return [
+                coin for coin in largest
+                if self._affordable_splits(coin.amount, coin_amount, fee) > 0
+            ]
+
+        starting_coins = await self.coin_pool.acquire(1, choose)
+        if not starting_coins:
+            return 0, []
+        bundles = []
+        remaining = count
+        for coin in starting_coins:
+            k = min(remaining, -(-count // len(starting_coins)), self._affordable_splits(
+                coin.amount, coin_amount, fee
+            ))
+            if k < 1:
+                self.coin_pool.release([coin])
+                continue
+            amounts = self._split_amounts(coin.amount, k, fee, coin_amount)
+            bundles.append((self._split_spend(coin, amounts), k))
+            remaining -= k
+        responses = await asyncio.gather(
+            *[self._push_tx(spend_bundle) for spend_bundle, _ in bundles],
+            return_exceptions=True,
+        )
+        created = 0
+        failures = []
+        for (spend_bundle, k), resp in zip(bundles, responses):
+            if isinstance(resp, Exception) or not resp or not resp.get("success"):
+                failures.append(f"split {spend_bundle.name()} of {k} coins failed: {resp}")
+            else:
+                created += k
+        return created, failures
+
     async def get_number_of_coins_available(self) -> int:
         starting_coins = await self._find_usable_coins()
         if starting_coins:
             return len(starting_coins)
         return 0
 
-    async def mint_k(self, fee=0, k=50) -> Tuple[bool, List[Tuple[bytes32, bytes32]]]:
-        puzzle = driver.create_reai_puzzle([], self.pk)
-        all_available_coins = await self._find_usable_coins()
-        if len(all_available_coins) < k:
-            return False, []
+    @staticmethod
+    def _launch_fees(starting_coins: List[Coin], fee=0) -> List[int]:
+        # the first coin with enough change pays the whole fee
+        fees = [0] * len(starting_coins)
+        for i, starting_coin in enumerate(starting_coins):
+            if COIN_AMOUNT < starting_coin.amount - fee:
+                fees[i] = fee
+                break
+        return fees
+
+    async def _build_mint_k_spends(
+            self,
+            starting_coins: List[Coin],
+            launches: List[Tuple[Program, Program]],
+            fee=0,
+    ) -> Tuple[List[SpendBundle], List[Tuple[bytes32, bytes32]]]:
+        """launches holds the (inner puzzle, launcher comment) of every coin."""
+        fees = self._launch_fees(starting_coins, fee)
+        puzzles = [puzzle for puzzle, _ in launches]
+        comments = [comment for _, comment in launches]
+        if self.spend_builder and len(starting_coins) > 1:
+            # tokens without data share one puzzle, don't send a copy per coin
+            per_coin = any(puzzle is not puzzles[0] for puzzle in puzzles)
+            built = await self.spend_builder.build_launch_spends(
+                starting_coins,
+                fees,
+                puzzles[0],
+                COIN_AMOUNT,
+                puzzles if per_coin else None,
+                comments if per_coin else None,
+            )
         else:
-            starting_coins = random.sample(all_available_coins, k)
-
-            starting_puzzle: Program = p2_delegated_puzzle_or_hidden_puzzle.puzzle_for_pk(
-                self.pk
-            )  # noqa
-            spend_bundles = []
-            listOfTuplesOfTxIdAndLauncherId = []
-            hasDeductFee = False
-            for starting_coin in starting_coins:
-                (
-                    conditions,
-                    launcher_coinsol,
-                ) = singleton_top_layer.launch_conditions_and_coinsol(  # noqa
-                    starting_coin, puzzle, Program.to([]), COIN_AMOUNT
+            built = [
+                self.signing.build_launch_spend(
+                    starting_coin, puzzle, COIN_AMOUNT, coin_fee, comment
                 )
-                if COIN_AMOUNT < starting_coin.amount:
-                    if not hasDeductFee and COIN_AMOUNT < starting_coin.amount - fee:
-                        conditions.append(
-                            Program.to(
-                                [
-                                    ConditionOpcode.CREATE_COIN,
-                                    starting_coin.puzzle_hash,
-                                    starting_coin.amount - COIN_AMOUNT - fee,
-                                ]
-                            )
-                        )
-                        hasDeductFee = True
-                    else:
-                        conditions.append(
-                            Program.to(
-                                [
-                                    ConditionOpcode.CREATE_COIN,
-                                    starting_coin.puzzle_hash,
-                                    starting_coin.amount - COIN_AMOUNT,
-                                ]
-                            )
-                        )
-                full_solution: Program = (
-                    p2_delegated_puzzle_or_hidden_puzzle.solution_for_conditions(conditions)
-                )  # noqa
-
-                starting_coinsol = CoinSpend(
-                    starting_coin,
-                    starting_puzzle,
-                    full_solution,
+                for starting_coin, coin_fee, puzzle, comment in zip(
+                    starting_coins, fees, puzzles, comments
                 )
-                delegated_puzzle: Program = p2_conditions.puzzle_for_conditions(conditions)
-
-                ssk = calculate_synthetic_secret_key(
-                    self.sk, p2_delegated_puzzle_or_hidden_puzzle.DEFAULT_HIDDEN_PUZZLE_HASH
-                )
-                signature: G2Element = AugSchemeMPL.sign(
-                    ssk,
-                    (
-                            delegated_puzzle.get_tree_hash()
-                            + starting_coin.name()
-                            + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
-                    ),
-                )
-
-                spend_bundle = SpendBundle([starting_coinsol, launcher_coinsol], signature)
-                spend_bundles.append(spend_bundle)
-                launcher_coin: Coin = singleton_top_layer.generate_launcher_coin(
-                    starting_coin,
-                    uint64(COIN_AMOUNT),
-                )
-                listOfTuplesOfTxIdAndLauncherId.append((spend_bundle.name(), launcher_coin.name()))
-
-            combined_spend = SpendBundle.aggregate(spend_bundles)
-            resp = await self.node_client.push_tx(combined_spend)
-            if not resp["success"]:
+            ]
+        spend_bundles = [spend_bundle for spend_bundle, _ in built]
+        tx_and_launcher_ids = [
+            (spend_bundle.name(), launcher_id) for spend_bundle, launcher_id in built
+        ]
+        return spend_bundles, tx_and_launcher_ids
+
+    async def _push_chunks(
+            self, chunks: List[Tuple[List[SpendBundle], list]]
+    ) -> List[ChunkResult]:
+        async def push(spend_bundle: SpendBundle):
+            resp = await self._push_tx(spend_bundle)
+            if not resp or not resp.get("success"):
                 raise ValueError("Couldn't push the transaction: %s" % resp)
 
-            return True, listOfTuplesOfTxIdAndLauncherId
+        results = [
+            ChunkResult(SpendBundle.aggregate(spend_bundles), items)
+            for spend_bundles, items in chunks
+        ]
+        errors = await asyncio.gather(
+            *[push(result.spend_bundle) for result in results], return_exceptions=True
+        )
+        for result, error in zip(results, errors):
+            result.error = error
+        return results
 
-    async def mint(self, fee=0) -> Tuple[bytes32, bytes32]:
-        puzzle = driver.create_reai_puzzle([], self.pk)
+    async def mint_k(
+            self,
+            fee=0,
+            k=50,
+            max_cost_fraction=DEFAULT_MAX_COST_FRACTION,
+            multi_op=False,
+            data: Optional[List[list]] = None,
+            hashed_data=False,
+            choose: Optional[Callable[[List[Coin], int], List[Coin]]] = None,
+    ) -> Tuple[bool, List[Tuple[bytes32, bytes32]], List[ChunkResult]]:
+        """
+        Mints k reai nfts, or one per entry of `data` (the initial list of
+        (key, value) pairs of each token) when it's given, from coins picked
+        by `choose(coins, k)`, k random ones by default. Returns whether
+        there were k usable coins, the (transaction id, launcher id) of every
+        pushed launch and the chunks that failed to push, with their error.
+        Raises the first chunk's error if no chunk was pushed.
+        """
+        if data is not None:
+            k = len(data)
+        else:
+            data = [[]] * k
+        if k < 1:
+            raise ValueError("Nothing to mint")
+        launches = [
+            self._launch_puzzle(token_data, multi_op, hashed_data) for token_data in data
+        ]
+        starting_coins = await self.coin_pool.acquire(k, choose or random.sample)
+        if len(starting_coins) < k:
+            self.coin_pool.release(starting_coins)
+            return False, [], []
+        try:
+            # launcher spends only differ by their data, size the chunks from the largest one
+            largest = max(range(k), key=lambda i: len(bytes(launches[i][1])))
+            sample_spends, _ = await self._build_mint_k_spends(
+                starting_coins[:1], [launches[largest]]
+            )
+            self.launch_cost = spend_bundle_cost(sample_spends[0])
+            chunk_size = max(1, max_spend_bundle_cost(max_cost_fraction) // self.launch_cost)
+            coin_chunks = [
+                (starting_coins[i:i + chunk_size], launches[i:i + chunk_size])
+                for i in range(0, k, chunk_size)
+            ]
+            # each chunk is a separate transaction and pays its share of the fee
+            fees = [fee // len(coin_chunks)] * len(coin_chunks)
+            fees[0] += fee % len(coin_chunks)
+            if self.verbose:
+                print(f"Minting {k} coins in {len(coin_chunks)} chunks of up to {chunk_size}")
+            chunks = [
+                await self._build_mint_k_spends(coins, chunk_launches, chunk_fee)
+                for (coins, chunk_launches), chunk_fee in zip(coin_chunks, fees)
+            ]
+        except Exception:
+            # nothing was pushed, the coins are usable again
+            self.coin_pool.release(starting_coins)
+            raise
+
+        results = await self._push_chunks(chunks)
+        tx_and_launcher_ids = [
+            item for result in results if not result.error for item in result.items
+        ]
+        if not tx_and_launcher_ids:
+            raise results[0].error
+
+        return True, tx_and_launcher_ids, [result for result in results if result.error]
+
+    async def mint(
+            self, fee=0, multi_op=False, data=None, hashed_data=False
+    ) -> Tuple[bytes32, bytes32]:
+        """Mints one reai nft, holding `data`, a list of (key, value) pairs, if given."""
+        puzzle, comment = self._launch_puzzle(data, multi_op, hashed_data)
         starting_coin = await self._find_usable_coin()
-        starting_puzzle: Program = p2_delegated_puzzle_or_hidden_puzzle.puzzle_for_pk(
-            self.pk
-        )  # noqa
         (
             conditions,
             launcher_coinsol,
         ) = singleton_top_layer.launch_conditions_and_coinsol(  # noqa
-            starting_coin, puzzle, Program.to([]), COIN_AMOUNT
+            starting_coin, puzzle, comment, COIN_AMOUNT
         )
         if COIN_AMOUNT < starting_coin.amount:
             conditions.append(
@@ -578,27 +933,8 @@ class ReaiWallet:
                     ]
                 )
             )
-        full_solution: Program = (
-            p2_delegated_puzzle_or_hidden_puzzle.solution_for_conditions(conditions)
-        )  # noqa
-
-        starting_coinsol = CoinSpend(
-            starting_coin,
-            starting_puzzle,
-            full_solution,
-        )
-        delegated_puzzle: Program = p2_conditions.puzzle_for_conditions(conditions)
-
-        ssk = calculate_synthetic_secret_key(
-            self.sk, p2_delegated_puzzle_or_hidden_puzzle.DEFAULT_HIDDEN_PUZZLE_HASH
-        )
-        signature: G2Element = AugSchemeMPL.sign(
-            ssk,
-            (
-                    delegated_puzzle.get_tree_hash()
-                    + starting_coin.name()
-                    + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
-            ),
+        starting_coinsol, signature = self.signing.sign_standard_spend(
+            starting_coin, conditions
         )
 
         spend_bundle = SpendBundle([starting_coinsol, launcher_coinsol], signature)
@@ -608,7 +944,7 @@ class ReaiWallet:
             )
         # assert False
         # assert False
-        resp = await self.node_client.push_tx(spend_bundle)
+        resp = await self._push_tx(spend_bundle)
         if not resp["success"]:
             raise ValueError("Couldn't push the transaction: %s" % resp)
         launcher_coin: Coin = singleton_top_layer.generate_launcher_coin(
@@ -616,79 +952,3 @@ class ReaiWallet:
             uint64(COIN_AMOUNT),
         )
         return spend_bundle.name(), launcher_coin.name()
-
-    async def set_ownership(self, coin_name, new_pub_key: bytes32, fee=0) -> bool:
-        parent_record, singleton_record = await self._get_latest_singleton(coin_name)
-
-        coin_spend = await self.node_client.get_puzzle_and_solution(
-            parent_record.coin.name(), parent_record.spent_block_index
-        )
-        lineage_proof: LineageProof = singleton_top_layer.lineage_proof_for_coinsol(
-            coin_spend
-        )
-        singleton: Coin = singleton_record.coin
-        version, data = await self.get_data(coin_name)
-        puzzle = driver.create_reai_puzzle(data, self.pk, version=version)
-        puzzle_reveal: Program = singleton_top_layer.puzzle_for_singleton(
-            coin_name,
-            puzzle,
-        )
-        inner_solution = solution_for_reai(version, new_pub_key=new_pub_key)
-        full_solution: Program = singleton_top_layer.solution_for_singleton(
-            lineage_proof, singleton.amount, inner_solution
-        )
-
-        signature: G2Element = AugSchemeMPL.sign(
-            self.sk,
-            (
-                    sha256_treehash(Program.to(new_pub_key))
-                    + singleton.name()
-                    + DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA
-            ),
-        )
-        singleton_spend = SpendBundle(
-            [
-                CoinSpend(singleton, puzzle_reveal, full_solution),
-            ],
-            signature,
-        )
-        if fee > 0:
-            fee_spend = await self._get_fee_spend_bundle(fee)
-            singleton_spend = SpendBundle.aggregate([singleton_spend, fee_spend])
-        if self.verbose:
-            singleton_spend.debug()
-        result = await self.node_client.push_tx(singleton_spend)
-        if result and result.get("success"):
-            return singleton_spend.name()
-        raise Exception("Error pushing transaction: %s" % singleton_spend.name())
-
-    async def _get_latest_singleton(
-            self, coin_id: bytes32
-    ) -> Tuple[CoinRecord, CoinRecord]:
-        if self.verbose:
-            print(f"Finding latest singleton for launcher: {coin_id.hex()}")
-        coin_record: CoinRecord = await self.node_client.get_coin_record_by_name(
-            coin_id
-        )
-
-        if not coin_record:
-            raise Exception(f"Can't find coin: {coin_id.hex()}")
-        if not coin_record.spent:
-            # fresh reai nft, return now
-            return (
-                await self.node_client.get_coin_record_by_name(coin_record.parent_info),
-                coin_record,
-            )
-        while True:
-            descendants = await self.node_client.get_coin_records_by_parent_ids(
-                [coin_id]
-            )
-            if len(descendants) != 1:
-                raise ValueError("Not a singleton")
-            descendant: CoinRecord = descendants[0]
-            if descendant.spent:
-                coin_record = descendant
-                coin_id = descendant.coin.name()
-            else:
-                assert coin_record.spent
-                return coin_record, descendant
@@ -24,7 +24,7 @@ setup(
         "console_scripts": ["reai-nft = reai_nft.cmd:cli"],
     },
     package_data={
-        "": ["*.clvm", "*.clvm.hex", "*.clib", "*.clsp", "*.clsp.hex"],
+        "": ["*.clvm", "*.clvm.hex", "*.clib", "*.clsp", "*.clsp.hex", "*.clsp.hash"],
     },
     setup_requires=["setuptools_scm"],
     install_requires=dependencies,
@@ -0,0 +1,299 @@
+"""
+In-memory stand-in for the FullNodeRpcClient calls the package makes, and
+reai nfts launched and mutated on it.
+"""
+import hashlib
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from blspy import AugSchemeMPL
+from chia.consensus.coinbase import create_puzzlehash_for_pk
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_record import CoinRecord
+from chia.types.coin_spend import CoinSpend
+from chia.types.spend_bundle import SpendBundle
+from chia.util.bech32m import encode_puzzle_hash
+from chia.util.ints import uint32, uint64
+from chia.wallet.derive_keys import master_sk_to_wallet_sk
+from chia.wallet.puzzles import singleton_top_layer
+
+from reai_nft import driver
+from reai_nft.wallet import ReaiWallet
+
+PUB_KEY = AugSchemeMPL.key_gen(b"\1" * 32).get_g1()
+
+
+class FakeNode:
+    def __init__(self):
+        self.records: Dict[bytes32, CoinRecord] = {}
+        self.spends: Dict[bytes32, CoinSpend] = {}
+        self.mempool: Dict[bytes32, SpendBundle] = {}
+        self.height = 1
+        # heights reorgs forked the chain at, the blocks from there on get new hashes
+        self.forks: List[int] = []
+        # rpc method name -> number of calls
+        self.calls = Counter()
+
+    def add_coin(self, coin: Coin, height: Optional[int] = None) -> CoinRecord:
+        height = self.height if height is None else height
+        record = CoinRecord(coin, uint32(height), uint32(0), False, False, uint64(height))
+        self.records[coin.name()] = record
+        return record
+
+    def spend_coin(self, coin_spend: CoinSpend, height: Optional[int] = None):
+        height = self.height if height is None else height
+        name = coin_spend.coin.name()
+        record = self.records[name]
+        self.records[name] = CoinRecord(
+            record.coin, record.confirmed_block_index, uint32(height), True,
+            record.coinbase, record.timestamp,
+        )
+        self.spends[name] = coin_spend
+
+    def remove_coin(self, coin_id: bytes32):
+        """Forgets a coin and its spend, the way a reorg does."""
+        self.records.pop(coin_id, None)
+        self.spends.pop(coin_id, None)
+
+    def farm_block(self, tx_ids: Optional[List[bytes32]] = None) -> int:
+        """Confirms the mempool bundles of tx_ids, all by default, in a new block."""
+        self.height += 1
+        for tx_id in list(self.mempool) if tx_ids is None else tx_ids:
+            spend_bundle = self.mempool.pop(tx_id)
+            # coins created and spent in the same block are ephemeral
+            for coin in spend_bundle.additions():
+                self.add_coin(coin)
+            for coin_spend in spend_bundle.coin_spends:
+                self.spend_coin(coin_spend)
+        return self.height
+
+    def fork(self, height: int):
+        """Replaces the blocks from height on, the coins are left as they are."""
+        self.forks.append(height)
+
+    def header_hash(self, height: int) -> bytes32:
+        forks = len([fork for fork in self.forks if fork <= height])
+        return bytes32(hashlib.sha256(f"{height}/{forks}".encode()).digest())
+
+    def block_record(self, height: int) -> SimpleNamespace:
+        """The BlockRecord fields the indexer reads, every block is a transaction block."""
+        return SimpleNamespace(
+            height=height,
+            header_hash=self.header_hash(height),
+            prev_hash=self.header_hash(height - 1),
+            is_transaction_block=True,
+        )
+
+    async def get_blockchain_state(self) -> dict:
+        self.calls["get_blockchain_state"] += 1
+        return {"peak": self.block_record(self.height)}
+
+    async def get_block_record_by_height(self, height: int) -> Optional[SimpleNamespace]:
+        self.calls["get_block_record_by_height"] += 1
+        if not 0 <= height <= self.height:
+            return None
+        return self.block_record(height)
+
+    async def get_additions_and_removals(
+            self, header_hash: bytes32
+    ) -> Tuple[List[CoinRecord], List[CoinRecord]]:
+        self.calls["get_additions_and_removals"] += 1
+        (height,) = [h for h in range(self.height + 1) if self.header_hash(h) == header_hash]
+        additions = [
+            record for record in self.records.values() if record.confirmed_block_index == height
+        ]
+        removals = [
+            record for record in self.records.values()
+            if record.spent and record.spent_block_index == height
+        ]
+        return additions, removals
+
+    async def get_coin_records_by_names(
+            self, names: List[bytes32], include_spent_coins: bool = True
+    ) -> List[CoinRecord]:
+        self.calls["get_coin_records_by_names"] += 1
+        records = [self.records[name] for name in names if name in self.records]
+        return [record for record in records if include_spent_coins or not record.spent]
+
+    async def get_coin_record_by_name(self, coin_id: bytes32) -> Optional[CoinRecord]:
+        self.calls["get_coin_record_by_name"] += 1
+        return self.records.get(coin_id)
+
+    async def get_coin_records_by_parent_ids(
+            self, parent_ids: List[bytes32], include_spent_coins: bool = True
+    ) -> List[CoinRecord]:
+        self.calls["get_coin_records_by_parent_ids"] += 1
+        return [
+            record for record in self.records.values()
+            if record.coin.parent_coin_info in parent_ids
+            and (include_spent_coins or not record.spent)
+        ]
+
+    async def get_coin_records_by_puzzle_hash(
+            self, puzzle_hash: bytes32, include_spent_coins: bool = True
+    ) -> List[CoinRecord]:
+        self.calls["get_coin_records_by_puzzle_hash"] += 1
+        return [
+            record for record in self.records.values()
+            if record.coin.puzzle_hash == puzzle_hash
+            and (include_spent_coins or not record.spent)
+        ]
+
+    async def get_puzzle_and_solution(self, coin_id: bytes32, height: int) -> Optional[CoinSpend]:
+        self.calls["get_puzzle_and_solution"] += 1
+        return self.spends.get(coin_id)
+
+    async def get_mempool_item_by_tx_id(self, tx_id: bytes32) -> Optional[dict]:
+        self.calls["get_mempool_item_by_tx_id"] += 1
+        spend_bundle = self.mempool.get(tx_id)
+        return None if spend_bundle is None else {"spend_bundle": spend_bundle.to_json_dict()}
+
+    async def push_tx(self, spend_bundle: SpendBundle) -> dict:
+        self.calls["push_tx"] += 1
+        self.mempool[spend_bundle.name()] = spend_bundle
+        return {"status": "SUCCESS", "success": True}
+
+
+class FakeReaiNft:
+    """
+    A reai nft launched on a FakeNode. Spends aren't run, the child puzzle
+    hashes are computed with the driver the way the puzzles compute them.
+    """
+
+    def __init__(
+            self, node: FakeNode, data: list, multi_op=False, hashed_data=False, seed=0,
+            pub_key=PUB_KEY,
+    ):
+        self.node = node
+        self.pub_key = pub_key
+        self.multi_op = multi_op
+        self.hashed_data = hashed_data
+        self.version = 1
+        self.data = list(data)
+        # (version, data) before each spend
+        self.states = []
+        origin = Coin(bytes32(bytes([seed]) * 32), bytes32(b"\0" * 32), driver.COIN_AMOUNT)
+        launcher = Coin(origin.name(), driver.SINGLETON_LAUNCHER_HASH, driver.COIN_AMOUNT)
+        self.launcher_id = launcher.name()
+        singleton = Coin(self.launcher_id, self._puzzle_hash(), driver.COIN_AMOUNT)
+        launcher_spend = CoinSpend(
+            launcher,
+            driver.LAUNCHER_PUZZLE,
+            Program.to([singleton.puzzle_hash, driver.COIN_AMOUNT, self.data]),
+        )
+        node.add_coin(launcher)
+        node.height += 1
+        node.spend_coin(launcher_spend)
+        node.add_coin(singleton)
+        self.parent_spend = launcher_spend
+        self.singleton = singleton
+        # singleton coin records, oldest first
+        self.lineage = [node.records[self.launcher_id], node.records[singleton.name()]]
+
+    def _inner_puzzle(self) -> Program:
+        return driver.create_reai_puzzle(
+            self.data, self.pub_key, self.version,
+            multi_op=self.multi_op, hashed_data=self.hashed_data,
+        )
+
+    def _puzzle_hash(self) -> bytes32:
+        return driver.singleton_puzzle_hash(
+            self.launcher_id,
+            driver.reai_puzzle_hash(
+                self.data, self.pub_key, self.version,
+                multi_op=self.multi_op, hashed_data=self.hashed_data,
+            ),
+        )
+
+    def mutate(self, commit, new_data: list):
+        """Spends the singleton with commit, new_data is the data it results in."""
+        coin_spend = CoinSpend(
+            self.singleton,
+            singleton_top_layer.puzzle_for_singleton(self.launcher_id, self._inner_puzzle()),
+            singleton_top_layer.solution_for_singleton(
+                singleton_top_layer.lineage_proof_for_coinsol(self.parent_spend),
+                self.singleton.amount,
+                driver.solution_for_reai(self.version + 1, commit),
+            ),
+        )
+        self.states.append((self.version, self.data))
+        self.version += 1
+        self.data = list(new_data)
+        self.node.height += 1
+        self.node.spend_coin(coin_spend)
+        self.singleton = Coin(self.singleton.name(), self._puzzle_hash(), driver.COIN_AMOUNT)
+        self.node.add_coin(self.singleton)
+        self.parent_spend = coin_spend
+        self.lineage[-1] = self.node.records[coin_spend.coin.name()]
+        self.lineage.append(self.node.records[self.singleton.name()])
+
+    def add(self, pair):
+        if self.multi_op:
+            commit = [[driver.ADD, pair]]
+        else:
+            commit = [driver.ADD, pair]
+        self.mutate(commit, [pair] + self.data)
+
+    def remove(self, index: int):
+        if self.hashed_data:
+            commit = [[driver.REMOVE, driver.removal_proof(self.data, index)]]
+        elif self.multi_op:
+            commit = [[driver.REMOVE, index]]
+        else:
+            commit = [driver.REMOVE, index]
+        self.mutate(commit, self.data[:index] + self.data[index + 1:])
+
+    def reorg(self, index: int, shift: int = 10):
+        """
+        Re-includes the spends from the one creating lineage[index] on, `shift`
+        blocks later: same coins, different heights.
+        """
+        for i in range(index - 1, len(self.lineage)):
+            record = self.lineage[i]
+            confirmed = record.confirmed_block_index + (shift if i >= index else 0)
+            spent = record.spent_block_index + shift if record.spent else 0
+            record = CoinRecord(
+                record.coin, uint32(confirmed), uint32(spent), record.spent,
+                record.coinbase, uint64(confirmed),
+            )
+            self.node.records[record.coin.name()] = record
+            self.lineage[i] = record
+        self.node.height += shift
+
+    def rewind(self):
+        """Undoes the last spend, the way a reorg dropping it does."""
+        self.node.remove_coin(self.singleton.name())
+        self.lineage.pop()
+        parent = self.lineage[-1]
+        self.node.spends.pop(parent.coin.name())
+        self.lineage[-1] = self.node.add_coin(parent.coin, parent.confirmed_block_index)
+        self.singleton = parent.coin
+        self.parent_spend = self.node.spends[self.lineage[-2].coin.name()]
+        self.version, self.data = self.states.pop()
+
+
+def make_data(n: int) -> list:
+    """n distinct (key, value) pairs."""
+    return [(f"key{i}".encode(), f"value{i}".encode()) for i in range(n)]
+
+
+def make_wallet(node: FakeNode, seed: bytes = b"\5" * 32) -> ReaiWallet:
+    """A wallet spending coins on node, without a wallet rpc client."""
+    private_key = AugSchemeMPL.key_gen(seed)
+    puzzle_hash = create_puzzlehash_for_pk(master_sk_to_wallet_sk(private_key, uint32(0)).get_g1())
+    return ReaiWallet(None, None, node, encode_puzzle_hash(puzzle_hash, "txch"), private_key)
+
+
+def fund(wallet: ReaiWallet, amounts: List[int]) -> List[Coin]:
+    """Adds coins of amounts to the wallet's puzzle hash."""
+    node = wallet.node_client
+    coins = []
+    for amount in amounts:
+        parent = bytes32(len(node.records).to_bytes(32, "big"))
+        coin = Coin(parent, wallet.coin_pool.puzzle_hash, amount)
+        node.add_coin(coin)
+        coins.append(coin)
+    return coins
@@ -0,0 +1,131 @@
+"""
+BatchController sizing of mint batches and coin splits from how the
+previous batches did.
+"""
+import pytest
+
+from reai_nft.batch_control import BatchController
+
+
+def make_controller(k=40, min_k=5, max_k=100, min_split=10, max_split=150, **kwargs):
+    messages = []
+    controller = BatchController(
+        k, min_k, max_k, min_split, max_split, target_inclusion=180, log=messages.append, **kwargs
+    )
+    return controller, messages
+
+
+@pytest.mark.parametrize("k, expected", [(40, 40), (1, 5), (500, 100)])
+def test_initial_k_is_bounded(k, expected):
+    controller, _ = make_controller(k)
+    assert controller.k == expected
+
+
+@pytest.mark.parametrize("bounds", [(0, 10, 1, 10), (10, 5, 1, 10), (1, 10, 5, 4)])
+def test_bad_bounds_raise(bounds):
+    min_k, max_k, min_split, max_split = bounds
+    with pytest.raises(ValueError):
+        BatchController(5, min_k, max_k, min_split, max_split)
+
+
+def test_fast_inclusions_grow_k_while_the_rate_rises():
+    controller, _ = make_controller()
+    controller.record_inclusion(40, 40, 60)
+    assert controller.k == 45
+    controller.record_inclusion(45, 45, 60)
+    assert controller.k == 50
+
+
+def test_falling_rate_turns_k_back():
+    controller, _ = make_controller()
+    controller.record_inclusion(40, 40, 60)
+    assert controller.k == 45
+    # fewer tokens per minute than the last batch
+    controller.record_inclusion(45, 45, 120)
+    assert controller.direction == -1
+    assert controller.k == 40
+    # shrinking raised the rate again, keep shrinking
+    controller.record_inclusion(40, 40, 30)
+    assert controller.k == 35
+
+
+def test_slow_inclusion_shrinks_k_by_a_quarter():
+    controller, messages = make_controller()
+    controller.record_inclusion(40, 40, 200)
+    assert controller.k == 30
+    assert controller.direction == -1
+    assert "over the 180s target" in messages[-1]
+
+
+@pytest.mark.parametrize("k, rejected, expected", [(40, 1, 20), (40, 40, 20), (10, 3, 5), (80, 2, 20)])
+def test_rejections_halve_k(k, rejected, expected):
+    controller, _ = make_controller()
+    controller.record_rejection(k, rejected)
+    assert controller.k == expected
+    assert controller.direction == -1
+
+
+def test_unconfirmed_launches_count_as_rejected():
+    controller, _ = make_controller()
+    controller.record_inclusion(40, 39, 60)
+    assert controller.k == 20
+    assert controller.last_rate is None
+
+
+def test_no_rejection_keeps_k():
+    controller, messages = make_controller()
+    controller.record_rejection(40, 0)
+    assert controller.k == 40
+    assert not messages
+
+
+def test_k_stays_within_bounds():
+    controller, _ = make_controller(k=100)
+    controller.record_inclusion(100, 100, 10)
+    assert controller.k == 100
+    for _ in range(10):
+        controller.record_rejection(controller.k, 1)
+    assert controller.k == 5
+
+
+def test_launch_cost_caps_k():
+    controller, messages = make_controller(k=100, max_batch_cost=1000)
+    controller.record_cost(25)
+    assert controller.k == 40
+    assert "above 1000" in messages[-1]
+    # growing stops at the cap
+    controller.record_inclusion(40, 40, 10)
+    assert controller.k == 40
+    # a cheaper launch lifts it
+    controller.record_cost(10)
+    controller.record_inclusion(40, 40, 5)
+    assert controller.k == 45
+
+
+def test_cost_cap_never_goes_below_min_k():
+    controller, _ = make_controller(max_batch_cost=1000)
+    controller.record_cost(500)
+    assert controller.k == 5
+
+
+def test_unknown_launch_cost_is_ignored():
+    controller, messages = make_controller(max_batch_cost=1000)
+    controller.record_cost(None)
+    controller.record_cost(0)
+    assert controller.launch_cost is None
+    assert controller.k == 40
+    assert not messages
+
+
+@pytest.mark.parametrize("k, split_size", [(40, 80), (5, 10), (100, 150)])
+def test_split_size_covers_split_ahead_batches(k, split_size):
+    controller, _ = make_controller(k)
+    assert controller.split_size == split_size
+
+
+def test_split_size_follows_k():
+    controller, messages = make_controller(k=40, split_ahead=3)
+    assert controller.split_size == 120
+    controller.record_rejection(40, 1)
+    assert controller.split_size == 60
+    assert "split size 120 -> 60" in messages[-1]
@@ -0,0 +1,100 @@
+"""
+Edits chained onto singletons whose last spend is still in the mempool, on
+a fake node.
+"""
+import pytest
+
+from reai_nft.wallet import MIN_REPLACEMENT_FEE
+from tests.fake_node import FakeNode, FakeReaiNft, fund, make_data, make_wallet
+
+
+def chaining_wallet(node: FakeNode):
+    wallet = make_wallet(node)
+    wallet.chain_mempool = True
+    fund(wallet, [MIN_REPLACEMENT_FEE * 10])
+    return wallet
+
+
+@pytest.mark.asyncio
+async def test_pushed_edit_is_tracked_in_flight():
+    node = FakeNode()
+    wallet = chaining_wallet(node)
+    nft = FakeReaiNft(node, make_data(2), pub_key=wallet.pk)
+    tx_id = await wallet.add_pair(nft.launcher_id, (b"new", b"pair"))
+    pending = wallet.in_flight[nft.launcher_id]
+    assert pending.spend_bundle.name() == tx_id
+    assert pending.state.version == 2
+    assert pending.state.data == [(b"new", b"pair")] + make_data(2)
+    # the child the pushed spend creates
+    assert pending.state.singleton in node.mempool[tx_id].additions()
+
+
+@pytest.mark.asyncio
+async def test_resolve_chains_onto_the_mempool_spend():
+    node = FakeNode()
+    wallet = chaining_wallet(node)
+    nft = FakeReaiNft(node, make_data(2), pub_key=wallet.pk)
+    tx_id = await wallet.add_pair(nft.launcher_id, (b"new", b"pair"))
+    state, pending = await wallet._resolve_for_spend(nft.launcher_id)
+    assert pending is node.mempool[tx_id]
+    assert state is wallet.in_flight[nft.launcher_id].state
+
+
+@pytest.mark.asyncio
+async def test_resolve_forgets_a_spend_that_left_the_mempool():
+    node = FakeNode()
+    wallet = chaining_wallet(node)
+    nft = FakeReaiNft(node, make_data(2), pub_key=wallet.pk)
+    tx_id = await wallet.add_pair(nft.launcher_id, (b"new", b"pair"))
+    del node.mempool[tx_id]
+    state, pending = await wallet._resolve_for_spend(nft.launcher_id)
+    assert pending is None
+    assert state.singleton == nft.singleton
+    assert nft.launcher_id not in wallet.in_flight
+
+
+@pytest.mark.asyncio
+async def test_chained_edit_needs_the_replacement_fee():
+    node = FakeNode()
+    wallet = chaining_wallet(node)
+    nft = FakeReaiNft(node, make_data(2), pub_key=wallet.pk)
+    first = await wallet.add_pair(nft.launcher_id, (b"new", b"pair"))
+    with pytest.raises(ValueError, match="still in the mempool"):
+        await wallet.add_pair(nft.launcher_id, (b"other", b"pair"), fee=MIN_REPLACEMENT_FEE - 1)
+    assert node.calls["push_tx"] == 1
+    second = await wallet.add_pair(nft.launcher_id, (b"other", b"pair"), fee=MIN_REPLACEMENT_FEE)
+    # the replacement carries the first spend along
+    removals = node.mempool[second].removals()
+    assert set(node.mempool[first].removals()) <= set(removals)
+    assert wallet.in_flight[nft.launcher_id].spend_bundle.name() == second
+    assert wallet.in_flight[nft.launcher_id].state.data == [
+        (b"other", b"pair"), (b"new", b"pair")
+    ] + make_data(2)
+
+
+@pytest.mark.asyncio
+async def test_spends_that_left_the_mempool_are_pruned():
+    node = FakeNode()
+    wallet = chaining_wallet(node)
+    wallet.coin_pool.mempool_check_interval = 0
+    nfts = [FakeReaiNft(node, make_data(1), seed=i, pub_key=wallet.pk) for i in range(3)]
+    dropped = await wallet.add_pair(nfts[0].launcher_id, (b"new", b"pair"))
+    await wallet.add_pair(nfts[1].launcher_id, (b"new", b"pair"))
+    del node.mempool[dropped]
+    # pushing any edit checks the others, without mutating their nfts again
+    await wallet.add_pair(nfts[2].launcher_id, (b"new", b"pair"))
+    assert set(wallet.in_flight) == {nfts[1].launcher_id, nfts[2].launcher_id}
+
+
+@pytest.mark.asyncio
+async def test_in_flight_spends_are_checked_once_per_interval():
+    node = FakeNode()
+    wallet = chaining_wallet(node)
+    nfts = [FakeReaiNft(node, make_data(1), seed=i, pub_key=wallet.pk) for i in range(2)]
+    dropped = await wallet.add_pair(nfts[0].launcher_id, (b"new", b"pair"))
+    del node.mempool[dropped]
+    node.calls.clear()
+    await wallet.add_pair(nfts[1].launcher_id, (b"new", b"pair"))
+    # checked too recently
+    assert node.calls["get_mempool_item_by_tx_id"] == 0
+    assert nfts[0].launcher_id in wallet.in_flight
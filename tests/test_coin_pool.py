@@ -0,0 +1,194 @@
+"""
+CoinPool reservations and pending spends, on a fake node.
+"""
+import asyncio
+
+import pytest
+from blspy import G2Element
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+
+from reai_nft.coin_pool import CoinPool
+from tests.fake_node import FakeNode, fund, make_wallet
+
+PUZZLE_HASH = Program.to(1).get_tree_hash()
+
+
+def add_coins(node: FakeNode, amounts) -> list:
+    coins = []
+    for amount in amounts:
+        coin = Coin(bytes32(len(node.records).to_bytes(32, "big")), PUZZLE_HASH, amount)
+        node.add_coin(coin)
+        coins.append(coin)
+    return coins
+
+
+def spend_bundle(coins, change_amount=None) -> SpendBundle:
+    """Spends coins with the (1) puzzle, the first one creating change."""
+    coin_spends = []
+    for i, coin in enumerate(coins):
+        conditions = []
+        if i == 0 and change_amount is not None:
+            conditions.append([ConditionOpcode.CREATE_COIN, PUZZLE_HASH, change_amount])
+        coin_spends.append(CoinSpend(coin, Program.to(1), Program.to(conditions)))
+    return SpendBundle(coin_spends, G2Element())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_acquire_never_returns_the_same_coin():
+    node = FakeNode()
+    coins = add_coins(node, range(1, 11))
+    pool = CoinPool(node, PUZZLE_HASH)
+    acquired = await asyncio.gather(*[pool.acquire(1) for _ in range(12)])
+    picked = [coin for selected in acquired for coin in selected]
+    assert sorted(coin.name() for coin in picked) == sorted(coin.name() for coin in coins)
+    assert acquired.count([]) == 2
+
+
+def test_pool_built_outside_the_event_loop_works_inside_it():
+    node = FakeNode()
+    add_coins(node, [1, 2, 3])
+    pool = CoinPool(node, PUZZLE_HASH)
+
+    async def acquire_concurrently():
+        return await asyncio.gather(*[pool.acquire(1) for _ in range(3)])
+
+    assert len({coin.name() for (coin,) in asyncio.run(acquire_concurrently())}) == 3
+
+
+@pytest.mark.asyncio
+async def test_acquire_takes_all_or_nothing():
+    node = FakeNode()
+    add_coins(node, [1, 2, 3])
+    pool = CoinPool(node, PUZZLE_HASH)
+    assert len(await pool.acquire(2)) == 2
+    assert await pool.acquire(2) == []
+    assert len(await pool.acquire(1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_released_coins_are_usable_again():
+    node = FakeNode()
+    coins = add_coins(node, [1, 2])
+    pool = CoinPool(node, PUZZLE_HASH)
+    selected = await pool.acquire(2)
+    assert await pool.available_coins() == []
+    pool.release(selected)
+    assert await pool.available_coins() == coins
+
+
+@pytest.mark.asyncio
+async def test_failed_push_releases_the_coins():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    coins = fund(wallet, [1000])
+
+    async def push_tx(spend_bundle):
+        raise ValueError("node unreachable")
+
+    node.push_tx = push_tx
+    with pytest.raises(ValueError, match="node unreachable"):
+        await wallet._push_tx(await wallet._get_fee_spend_bundle(10))
+    assert await wallet.coin_pool.available_coins() == coins
+
+
+@pytest.mark.asyncio
+async def test_rejected_push_releases_the_coins():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    coins = fund(wallet, [1000])
+
+    async def push_tx(spend_bundle):
+        return {"success": False, "error": "DOUBLE_SPEND"}
+
+    node.push_tx = push_tx
+    await wallet._push_tx(await wallet._get_fee_spend_bundle(10))
+    assert await wallet.coin_pool.available_coins() == coins
+
+
+@pytest.mark.asyncio
+async def test_committed_spend_is_pending_until_confirmed():
+    node = FakeNode()
+    coins = add_coins(node, [100, 200])
+    pool = CoinPool(node, PUZZLE_HASH)
+    selected = await pool.acquire(1)
+    bundle = spend_bundle(selected, 90)
+    pool.commit(bundle)
+    assert pool.reserved == {}
+    assert pool.pending[bundle.name()].removals == {selected[0].name()}
+    assert [coin.amount for coin in pool.incoming_change()] == [90]
+    assert await pool.available_coins() == [coin for coin in coins if coin != selected[0]]
+    # confirmed: the spent coin leaves the unspent set
+    node.spend_coin(bundle.coin_spends[0])
+    await pool.available_coins()
+    assert pool.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_replacing_bundle_takes_over_the_pending_coins():
+    node = FakeNode()
+    add_coins(node, [100, 200, 300])
+    pool = CoinPool(node, PUZZLE_HASH)
+    first = await pool.acquire(1)
+    replaced = spend_bundle(first, 90)
+    pool.commit(replaced)
+    # the replacement spends the same coin plus a new one for the higher fee
+    extra = await pool.acquire(1)
+    replacement = spend_bundle(first + extra, 80)
+    pool.commit(replacement)
+    assert list(pool.pending) == [replacement.name()]
+    assert pool.pending[replacement.name()].removals == {coin.name() for coin in first + extra}
+    assert [coin.amount for coin in pool.incoming_change()] == [80]
+    assert pool.reserved == {}
+
+
+@pytest.mark.asyncio
+async def test_bundle_without_pool_coins_is_not_tracked():
+    node = FakeNode()
+    pool = CoinPool(node, PUZZLE_HASH)
+    other = Coin(bytes32(b"\1" * 32), bytes32(b"\2" * 32), 1)
+    pool.commit(spend_bundle([other]))
+    assert pool.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_dropped_spend_expires_after_the_mempool_check():
+    node = FakeNode()
+    coins = add_coins(node, [100, 200])
+    pool = CoinPool(node, PUZZLE_HASH, mempool_check_interval=0)
+    selected = await pool.acquire(1)
+    bundle = spend_bundle(selected, 90)
+    node.mempool[bundle.name()] = bundle
+    pool.commit(bundle)
+    # still in the mempool
+    assert await pool.available_coins() == [coin for coin in coins if coin != selected[0]]
+    assert bundle.name() in pool.pending
+    del node.mempool[bundle.name()]
+    assert await pool.available_coins() == coins
+    assert pool.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_mempool_is_checked_once_per_interval():
+    node = FakeNode()
+    add_coins(node, [100, 200])
+    pool = CoinPool(node, PUZZLE_HASH, mempool_check_interval=3600)
+    selected = await pool.acquire(1)
+    pool.commit(spend_bundle(selected, 90))
+    await pool.available_coins()
+    assert node.calls["get_mempool_item_by_tx_id"] == 0
+    assert len(pool.pending) == 1
+
+
+@pytest.mark.asyncio
+async def test_reservations_time_out():
+    node = FakeNode()
+    coins = add_coins(node, [100])
+    pool = CoinPool(node, PUZZLE_HASH, reservation_timeout=0)
+    assert await pool.acquire(1) == coins
+    await asyncio.sleep(0.01)
+    assert await pool.available_coins() == coins
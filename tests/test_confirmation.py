@@ -0,0 +1,106 @@
+"""
+ConfirmationTracker resolving minted launchers as the peak moves, on a fake
+node.
+"""
+import pytest
+
+from reai_nft.confirmation import ConfirmationTracker
+from tests.fake_node import FakeNode, fund, make_wallet
+
+
+async def mint(wallet, k: int) -> list:
+    """(launcher id, tx id) of k launches pushed to the mempool."""
+    fund(wallet, [1000] * k)
+    ok, tx_and_launcher_ids, failures = await wallet.mint_k(k=k)
+    assert ok and not failures
+    return [(launcher_id, tx_id) for tx_id, launcher_id in tx_and_launcher_ids]
+
+
+def make_tracker(node: FakeNode, launches, timeout: float = 600) -> ConfirmationTracker:
+    tracker = ConfirmationTracker(node, poll_interval=0, timeout=timeout)
+    for launcher_id, tx_id in launches:
+        tracker.add(launcher_id, tx_id)
+    return tracker
+
+
+def on_poll(node: FakeNode, actions: dict):
+    """Runs actions[n]() when the peak is polled for the n-th time."""
+    get_blockchain_state = node.get_blockchain_state
+
+    async def poll():
+        action = actions.get(node.calls["get_blockchain_state"] + 1)
+        if action:
+            action()
+        return await get_blockchain_state()
+
+    node.get_blockchain_state = poll
+
+
+async def collect(tracker: ConfirmationTracker) -> list:
+    return [
+        [(record.coin.name(), tx_id, record.confirmed_block_index) for record, tx_id in confirmed]
+        async for confirmed in tracker.confirmations()
+    ]
+
+
+@pytest.mark.asyncio
+async def test_launches_are_confirmed_on_a_new_peak():
+    node = FakeNode()
+    launches = await mint(make_wallet(node), 3)
+    on_poll(node, {3: node.farm_block})
+    tracker = make_tracker(node, launches)
+    (confirmed,) = await collect(tracker)
+    assert sorted(confirmed) == sorted(
+        (launcher_id, tx_id, node.height) for launcher_id, tx_id in launches
+    )
+    assert not tracker.pending
+    # the records are only looked up when the peak moves: the first poll and the block
+    assert node.calls["get_blockchain_state"] == 3
+    assert node.calls["get_coin_records_by_names"] == 2
+
+
+@pytest.mark.asyncio
+async def test_launches_are_confirmed_block_by_block():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    first = await mint(wallet, 2)
+    (first_bundle,) = node.mempool
+    second = await mint(wallet, 1)
+    on_poll(node, {2: lambda: node.farm_block([first_bundle]), 3: node.farm_block})
+    confirmed = await collect(make_tracker(node, first + second))
+    assert [len(block) for block in confirmed] == [2, 1]
+    assert {launcher_id for launcher_id, _, _ in confirmed[0]} == {
+        launcher_id for launcher_id, _ in first
+    }
+    assert confirmed[0][0][2] < confirmed[1][0][2]
+
+
+@pytest.mark.asyncio
+async def test_dropped_batch_stays_pending_until_the_timeout():
+    node = FakeNode()
+    launches = await mint(make_wallet(node), 2)
+    # dropped from the mempool, the next block doesn't have it
+    node.mempool.clear()
+    on_poll(node, {2: node.farm_block})
+    tracker = make_tracker(node, launches, timeout=0.2)
+    assert await collect(tracker) == []
+    assert tracker.pending == dict(launches)
+
+
+@pytest.mark.asyncio
+async def test_re_pushed_batch_is_confirmed():
+    node = FakeNode()
+    launches = await mint(make_wallet(node), 2)
+    (spend_bundle,) = node.mempool.values()
+    node.mempool.clear()
+
+    def re_push():
+        node.mempool[spend_bundle.name()] = spend_bundle
+
+    on_poll(node, {2: node.farm_block, 3: re_push, 4: node.farm_block})
+    tracker = make_tracker(node, launches)
+    (confirmed,) = await collect(tracker)
+    assert {launcher_id for launcher_id, _, _ in confirmed} == {
+        launcher_id for launcher_id, _ in launches
+    }
+    assert not tracker.pending
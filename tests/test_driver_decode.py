@@ -0,0 +1,236 @@
+"""
+decode_reai_spend against uncurrying the Programs of spends built with
+Program and curry, the way get_data decoded them before.
+"""
+import pytest
+from blspy import AugSchemeMPL
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.wallet.lineage_proof import LineageProof
+from chia.wallet.puzzles import singleton_top_layer
+from chia.wallet.puzzles.p2_delegated_puzzle_or_hidden_puzzle import puzzle_for_pk
+from clvm.casts import int_to_bytes
+
+from reai_nft import driver
+from reai_nft.node_client import ReaiNodeClient
+from tests.fake_node import make_data
+
+PUB_KEY = AugSchemeMPL.key_gen(b"\1" * 32).get_g1()
+NEW_PUB_KEY = AugSchemeMPL.key_gen(b"\2" * 32).get_g1()
+LAUNCHER_ID = bytes32(b"\3" * 32)
+
+# atom sizes around the serialization boundaries: a single byte below 0x80
+# is its own atom, up to 0x3f bytes take a one byte length prefix, up to
+# 0x1fff bytes two and up to 0xfffff bytes three
+ATOM_SIZES = [0, 1, 0x3F, 0x40, 0x1FFF, 0x2000]
+
+# (multi_op, hashed_data) of v1, v2 and v3
+V1 = (False, False)
+V2 = (True, False)
+V3 = (True, True)
+
+
+def make_spend(data, commit=None, kind=V1, version=3, new_pub_key=None):
+    multi_op, hashed_data = kind
+    inner_puzzle = driver.create_reai_puzzle(
+        data, PUB_KEY, version=version, multi_op=multi_op, hashed_data=hashed_data
+    )
+    return make_singleton_spend(
+        inner_puzzle, driver.solution_for_reai(version, commit, new_pub_key)
+    )
+
+
+def make_singleton_spend(inner_puzzle: Program, inner_solution: Program):
+    puzzle = singleton_top_layer.puzzle_for_singleton(LAUNCHER_ID, inner_puzzle)
+    solution = singleton_top_layer.solution_for_singleton(
+        LineageProof(bytes32(b"\4" * 32), inner_puzzle.get_tree_hash(), 1),
+        1,
+        inner_solution,
+    )
+    return bytes(puzzle), bytes(solution)
+
+
+def uncurry_spend(puzzle_bytes: bytes, solution_bytes: bytes) -> dict:
+    _, singleton_args = Program.from_bytes(puzzle_bytes).uncurry()
+    singleton_struct, inner_puzzle = singleton_args.as_iter()
+    _, args = inner_puzzle.uncurry()
+    _, data, version, pub_key = args.as_iter()
+    inner_solution = Program.from_bytes(solution_bytes).rest().rest().first()
+    _, commit, new_pub_key = inner_solution.as_iter()
+    return {
+        "launcher_id": singleton_struct.rest().first().as_atom(),
+        "data": data,
+        "version": version.as_int(),
+        "pub_key": pub_key.as_atom(),
+        "commit": commit,
+        "new_pub_key": new_pub_key.as_atom() or None,
+    }
+
+
+def commit_operations(commit: Program, multi_op: bool, hashed_data: bool) -> list:
+    """(op, value) of a commit, ADD values are left as Programs."""
+    if not commit.listp():
+        return []
+    operations = []
+    for operation in commit.as_iter() if multi_op else [commit]:
+        op, value = operation.as_iter()
+        op = op.as_int()
+        if op == driver.REMOVE:
+            # the v3 removal proof starts with the hashes of the items before the removed one
+            value = len(list(value.first().as_iter())) if hashed_data else value.as_int()
+        operations.append((op, value))
+    return operations
+
+
+def assert_decodes(puzzle_bytes: bytes, solution_bytes: bytes, kind) -> driver.ReaiSpend:
+    """
+    Compares the decoded spend with the uncurried Programs. Pairs are compared
+    as trees: as_python turns (key . nil) into [key] where the decoder keeps
+    (key, b"").
+    """
+    multi_op, hashed_data = kind
+    spend = driver.decode_reai_spend(puzzle_bytes, solution_bytes)
+    expected = uncurry_spend(puzzle_bytes, solution_bytes)
+    assert (spend.multi_op, spend.hashed_data) == kind
+    assert spend.launcher_id == expected["launcher_id"]
+    assert spend.pub_key == expected["pub_key"]
+    assert spend.version == expected["version"]
+    assert spend.new_pub_key == expected["new_pub_key"]
+    if hashed_data:
+        assert spend.data is None
+        assert spend.data_root == expected["data"].as_atom()
+    else:
+        assert spend.data_root is None
+        assert Program.to(spend.data) == expected["data"]
+    operations = commit_operations(expected["commit"], multi_op, hashed_data)
+    assert [op for op, _ in spend.operations] == [op for op, _ in operations]
+    for (op, value), (_, expected_value) in zip(spend.operations, operations):
+        if op == driver.ADD:
+            assert Program.to(value) == expected_value
+        else:
+            assert value == expected_value
+    return spend
+
+
+@pytest.mark.parametrize("size", ATOM_SIZES)
+def test_atom_length_prefixes(size):
+    data = [(b"k" * size, b"v" * size), (bytes([0x7F]), bytes([0x80]))] + make_data(3)
+    pair = (b"a" * size, b"b" * size)
+    puzzle_bytes, solution_bytes = make_spend(data, [driver.ADD, pair])
+    spend = assert_decodes(puzzle_bytes, solution_bytes, V1)
+    assert spend.data == data
+    assert spend.operations == [(driver.ADD, pair)]
+
+
+@pytest.mark.parametrize("kind", [V1, V2, V3])
+@pytest.mark.parametrize("n", [0, 1, 10])
+def test_nil_commit(kind, n):
+    data = make_data(n)
+    spend = assert_decodes(*make_spend(data, kind=kind), kind)
+    assert spend.operations == []
+    if kind == V3:
+        assert spend.data_root == driver.data_root(data)
+    else:
+        assert spend.data == data
+
+
+@pytest.mark.parametrize("index", [0, 1, 9])
+def test_v1_remove(index):
+    data = make_data(10)
+    commit = [driver.REMOVE, int_to_bytes(index)]
+    spend = assert_decodes(*make_spend(data, commit), V1)
+    assert spend.operations == [(driver.REMOVE, index)]
+
+
+def test_v2_remove_and_add():
+    data = make_data(10)
+    commit = [
+        [driver.REMOVE, int_to_bytes(0)],
+        [driver.ADD, (b"new", b"pair")],
+        [driver.REMOVE, int_to_bytes(200)],
+    ]
+    spend = assert_decodes(*make_spend(data, commit, V2), V2)
+    assert spend.operations == [
+        (driver.REMOVE, 0),
+        (driver.ADD, (b"new", b"pair")),
+        (driver.REMOVE, 200),
+    ]
+
+
+@pytest.mark.parametrize("index", [0, 1, 9])
+def test_v3_remove(index):
+    data = make_data(10)
+    commit = [
+        [driver.ADD, (b"new", b"pair")],
+        [driver.REMOVE, driver.removal_proof([(b"new", b"pair")] + data, index)],
+    ]
+    spend = assert_decodes(*make_spend(data, commit, V3), V3)
+    assert spend.operations == [(driver.ADD, (b"new", b"pair")), (driver.REMOVE, index)]
+
+
+@pytest.mark.parametrize("kind", [V1, V2, V3])
+def test_ownership_change(kind):
+    data = make_data(3)
+    spend = assert_decodes(*make_spend(data, kind=kind, new_pub_key=NEW_PUB_KEY), kind)
+    assert spend.pub_key == bytes(PUB_KEY)
+    assert spend.new_pub_key == bytes(NEW_PUB_KEY)
+
+
+def test_same_owner_has_no_new_pub_key():
+    spend = assert_decodes(*make_spend(make_data(3)), V1)
+    assert spend.new_pub_key is None
+
+
+def test_standard_inner_puzzle_is_not_reai():
+    puzzle_bytes, solution_bytes = make_singleton_spend(puzzle_for_pk(PUB_KEY), Program.to([]))
+    with pytest.raises(ValueError):
+        driver.decode_reai_spend(puzzle_bytes, solution_bytes)
+
+
+def test_uncurried_inner_puzzle_is_not_reai():
+    puzzle_bytes, solution_bytes = make_singleton_spend(Program.to(1), Program.to([]))
+    with pytest.raises(ValueError):
+        driver.decode_reai_spend(puzzle_bytes, solution_bytes)
+
+
+def test_uncurried_puzzle_is_not_reai():
+    with pytest.raises(ValueError):
+        driver.decode_reai_spend(bytes(Program.to(1)), bytes(Program.to([])))
+
+
+def test_modified_reai_mod_is_not_reai():
+    mod, mod_hash = driver.reai_mod()
+    inner_puzzle = Program.to([1, mod]).curry(mod_hash, make_data(3), 3, PUB_KEY)
+    puzzle_bytes, solution_bytes = make_singleton_spend(inner_puzzle, driver.solution_for_reai(3))
+    with pytest.raises(ValueError):
+        driver.decode_reai_spend(puzzle_bytes, solution_bytes)
+
+
+@pytest.mark.parametrize("size", ATOM_SIZES)
+def test_decode_data(size):
+    data = [(b"k" * size, b"v" * size)] + make_data(3)
+    assert driver.decode_data(bytes(Program.to(data))) == data
+    assert driver.decode_data(bytes(Program.to([]))) == []
+
+
+@pytest.mark.parametrize("kind", [V1, V2])
+@pytest.mark.parametrize("index", [1, 5, -1])
+def test_remove_without_a_pair_at_index_keeps_the_data(kind, index):
+    data = make_data(1)
+    operation = [driver.REMOVE, int_to_bytes(index)]
+    commit = [operation] if kind == V2 else operation
+    puzzle_bytes, solution_bytes = make_spend(data, commit, kind)
+    spend = assert_decodes(puzzle_bytes, solution_bytes, kind)
+    assert ReaiNodeClient._data_from_reai_spend(spend) == (3, data)
+    # the puzzle accepts the spend and recreates the singleton with the same data
+    multi_op, _ = kind
+    inner_puzzle = driver.create_reai_puzzle(data, PUB_KEY, version=2, multi_op=multi_op)
+    conditions = inner_puzzle.run(driver.solution_for_reai(3, commit, adapt=True))
+    (create_coin,) = [
+        condition for condition in conditions.as_iter()
+        if condition.first().as_atom() == ConditionOpcode.CREATE_COIN
+    ]
+    assert create_coin.rest().first().as_atom() == driver.reai_puzzle_hash(
+        data, PUB_KEY, 3, multi_op=multi_op
+    )
@@ -0,0 +1,111 @@
+"""
+ChainIndexer scans, resumed from the checkpoint and rolled back on reorgs,
+on a fake node.
+"""
+import pytest
+from blspy import AugSchemeMPL
+
+from reai_nft import driver
+from reai_nft.indexer import ChainIndexer, IndexStore
+from tests.fake_node import PUB_KEY, FakeNode, FakeReaiNft, make_data
+
+
+def make_indexer(node: FakeNode) -> ChainIndexer:
+    return ChainIndexer(node, IndexStore(":memory:"), PUB_KEY)
+
+
+def indexed(indexer: ChainIndexer) -> dict:
+    return {
+        nft.launcher_id: (nft.tip_id, nft.version) for nft in indexer.store.get_nfts()
+    }
+
+
+def expected(*nfts: FakeReaiNft) -> dict:
+    return {nft.launcher_id: (nft.singleton.name(), nft.version) for nft in nfts}
+
+
+@pytest.mark.asyncio
+async def test_scan_indexes_the_nfts_of_every_kind():
+    node = FakeNode()
+    nfts = [
+        FakeReaiNft(node, make_data(2), multi_op, hashed_data, seed=i)
+        for i, (multi_op, hashed_data) in enumerate(driver.PUZZLE_KINDS)
+    ]
+    for nft in nfts:
+        nft.add((b"new", b"pair"))
+    nfts[0].remove(0)
+    # someone else's
+    FakeReaiNft(node, make_data(2), seed=9, pub_key=AugSchemeMPL.key_gen(b"\2" * 32).get_g1())
+    indexer = make_indexer(node)
+    assert await indexer.scan() == node.height
+    assert indexed(indexer) == expected(*nfts)
+
+
+@pytest.mark.asyncio
+async def test_scan_resumes_from_the_checkpoint():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(2), multi_op=True)
+    indexer = make_indexer(node)
+    await indexer.scan()
+    checkpoint = node.height
+    other = FakeReaiNft(node, make_data(1), seed=1)
+    nft.add((b"new", b"pair"))
+    nft.remove(1)
+    node.calls.clear()
+    assert await indexer.scan() == node.height
+    assert indexed(indexer) == expected(nft, other)
+    # only the new blocks are read
+    assert node.calls["get_additions_and_removals"] == node.height - checkpoint
+
+
+@pytest.mark.asyncio
+async def test_scan_without_new_blocks_reads_nothing():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(2))
+    indexer = make_indexer(node)
+    await indexer.scan()
+    node.calls.clear()
+    assert await indexer.scan() == node.height
+    assert node.calls["get_additions_and_removals"] == 0
+    assert indexed(indexer) == expected(nft)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("multi_op, hashed_data", driver.PUZZLE_KINDS)
+async def test_reorg_rolls_back_to_the_fork(multi_op, hashed_data):
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(2), multi_op, hashed_data)
+    nft.add((b"new", b"pair"))
+    nft.add((b"dropped", b"pair"))
+    indexer = make_indexer(node)
+    await indexer.scan()
+    assert indexed(indexer) == expected(nft)
+    # the block with the last spend is replaced by one without it
+    dropped_at = node.height
+    nft.rewind()
+    node.fork(dropped_at)
+    assert indexed(indexer) != expected(nft)
+    node.height += 2
+    nft.remove(0)
+    assert await indexer.scan() == node.height
+    assert indexed(indexer) == expected(nft)
+    (state,) = indexer.store.get_nfts()
+    assert state.height == node.height
+    assert indexer.store.get_checkpoint() == (node.height, node.header_hash(node.height))
+
+
+@pytest.mark.asyncio
+async def test_reorg_dropping_a_launch_forgets_the_nft():
+    node = FakeNode()
+    kept = FakeReaiNft(node, make_data(1))
+    dropped = FakeReaiNft(node, make_data(1), seed=1)
+    indexer = make_indexer(node)
+    await indexer.scan()
+    assert set(indexed(indexer)) == {kept.launcher_id, dropped.launcher_id}
+    # the launch of the second nft is undone
+    node.remove_coin(dropped.singleton.name())
+    node.remove_coin(dropped.launcher_id)
+    node.fork(node.height - 1)
+    node.height += 1
+    await indexer.scan()
+    assert indexed(indexer) == expected(kept)
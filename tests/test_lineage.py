@@ -0,0 +1,254 @@
+"""
+Lineage walks resumed from the tip cached in a LineageStore, on a fake node.
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from reai_nft.lineage import LineageStore
+from reai_nft.node_client import ReaiNodeClient
+from tests.fake_node import FakeNode, FakeReaiNft, make_data
+
+
+def make_client(node: FakeNode) -> ReaiNodeClient:
+    return ReaiNodeClient(node, lineage_store=LineageStore(":memory:"))
+
+
+def mutate(nft: FakeReaiNft, n: int):
+    for i in range(n):
+        nft.add((f"new{len(nft.lineage)}".encode(), b"v"))
+
+
+def test_batch_commits_when_the_outermost_batch_exits():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(1))
+    store = LineageStore(":memory:")
+    with store.batch():
+        with store.batch():
+            store.set_tip(nft.launcher_id, *nft.lineage[-2:])
+        assert store.connection.in_transaction
+        store.invalidate(nft.launcher_id)
+        store.set_tip(nft.launcher_id, *nft.lineage[-2:])
+    assert not store.connection.in_transaction
+    assert store.get_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+
+
+def test_writes_outside_a_batch_commit():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(1))
+    store = LineageStore(":memory:")
+    store.set_tip(nft.launcher_id, *nft.lineage[-2:])
+    assert not store.connection.in_transaction
+
+
+@pytest.mark.asyncio
+async def test_walk_caches_the_tip():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(3))
+    mutate(nft, 3)
+    client = make_client(node)
+    assert await client.get_lineage_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+    assert client.lineage_store.get_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+    assert node.calls["get_coin_records_by_parent_ids"] == 4
+
+
+@pytest.mark.asyncio
+async def test_unchanged_tip_needs_one_lookup():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(3))
+    mutate(nft, 3)
+    client = make_client(node)
+    await client.get_lineage_tip(nft.launcher_id)
+    node.calls.clear()
+    assert await client.get_lineage_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+    assert node.calls == {"get_coin_record_by_name": 1}
+
+
+@pytest.mark.asyncio
+async def test_walk_resumes_from_the_cached_tip():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(3))
+    mutate(nft, 5)
+    client = make_client(node)
+    await client.get_lineage_tip(nft.launcher_id)
+    mutate(nft, 2)
+    node.calls.clear()
+    assert await client.get_lineage_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+    # from the cached tip, not the launcher
+    assert node.calls["get_coin_records_by_parent_ids"] == 2
+    assert client.lineage_store.get_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index", [1, 3, 4])
+async def test_reorged_tip_falls_back_to_a_full_walk(index):
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(3))
+    mutate(nft, 3)
+    client = make_client(node)
+    await client.get_lineage_tip(nft.launcher_id)
+    nft.reorg(index)
+    node.calls.clear()
+    assert await client.get_lineage_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+    assert node.calls["get_coin_records_by_parent_ids"] == 4
+    assert client.lineage_store.get_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+
+
+@pytest.mark.asyncio
+async def test_forked_lineage_falls_back_to_a_full_walk():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(3))
+    mutate(nft, 3)
+    client = make_client(node)
+    await client.get_lineage_tip(nft.launcher_id)
+    # the spend creating the cached tip is dropped and the parent spent differently
+    nft.rewind()
+    nft.add((b"fork", b"v"))
+    node.calls.clear()
+    assert await client.get_lineage_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+    assert node.calls["get_coin_records_by_parent_ids"] == 4
+    assert client.lineage_store.get_tip(nft.launcher_id) == tuple(nft.lineage[-2:])
+
+
+async def history(client: ReaiNodeClient, launcher_id) -> list:
+    return [
+        (entry.version, entry.height, entry.data)
+        async for entry in client.get_history(launcher_id)
+    ]
+
+
+def expected_history(nft: FakeReaiNft) -> list:
+    states = nft.states + [(nft.version, nft.data)]
+    return [
+        (version, record.spent_block_index, data)
+        for (version, data), record in zip(states, nft.lineage)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_only_fetches_new_spends():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(3), multi_op=True)
+    mutate(nft, 2)
+    nft.remove(1)
+    client = make_client(node)
+    assert await history(client, nft.launcher_id) == expected_history(nft)
+    assert node.calls["get_puzzle_and_solution"] == 4
+    mutate(nft, 2)
+    node.calls.clear()
+    assert await history(client, nft.launcher_id) == expected_history(nft)
+    assert node.calls["get_puzzle_and_solution"] == 2
+    assert len(client.lineage_store.get_history(nft.launcher_id)) == 6
+
+
+@pytest.mark.asyncio
+async def test_history_stopped_early_caches_what_was_fetched():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(3))
+    mutate(nft, 4)
+    client = make_client(node)
+    entries = client.get_history(nft.launcher_id)
+    async for entry in entries:
+        if entry.version == 2:
+            break
+    await entries.aclose()
+    assert len(client.lineage_store.get_history(nft.launcher_id)) == 2
+    assert await history(client, nft.launcher_id) == expected_history(nft)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index", [1, 3])
+async def test_reorged_history_is_walked_from_the_launcher(index):
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(3))
+    mutate(nft, 3)
+    client = make_client(node)
+    await history(client, nft.launcher_id)
+    nft.reorg(index)
+    node.calls.clear()
+    assert await history(client, nft.launcher_id) == expected_history(nft)
+    assert node.calls["get_puzzle_and_solution"] == 4
+
+
+@pytest.mark.asyncio
+async def test_hashed_data_is_replayed_from_the_last_replayed_singleton():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(5), multi_op=True, hashed_data=True)
+    mutate(nft, 2)
+    nft.remove(3)
+    client = make_client(node)
+    assert await client.get_data(nft.launcher_id) == (nft.version, nft.data)
+    # the tip's parent spend and the 3 before it
+    assert node.calls["get_puzzle_and_solution"] == 4
+    nft.remove(0)
+    mutate(nft, 1)
+    node.calls.clear()
+    assert await client.get_data(nft.launcher_id) == (nft.version, nft.data)
+    assert node.calls["get_puzzle_and_solution"] == 3
+    record, _ = client.lineage_store.get_replayed_data(nft.launcher_id)
+    assert record == nft.lineage[-2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index", [1, 2, 3])
+async def test_stale_replayed_data_is_replayed_from_the_launcher(index):
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(5), multi_op=True, hashed_data=True)
+    mutate(nft, 3)
+    client = make_client(node)
+    await client.get_data(nft.launcher_id)
+    nft.reorg(index)
+    node.calls.clear()
+    assert await client.get_data(nft.launcher_id) == (nft.version, nft.data)
+    assert node.calls["get_puzzle_and_solution"] == 4
+    record, _ = client.lineage_store.get_replayed_data(nft.launcher_id)
+    assert record == nft.lineage[-2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("commit_every, commit_interval", [(2, 60), (1000, 0)])
+async def test_get_data_many_commits_as_it_goes(tmp_path, commit_every, commit_interval):
+    node = FakeNode()
+    nfts = [FakeReaiNft(node, make_data(2), seed=i) for i in range(5)]
+    for nft in nfts:
+        mutate(nft, 1)
+    path = str(tmp_path / "lineage.db")
+    client = ReaiNodeClient(node, lineage_store=LineageStore(path))
+    # what another process reading the store sees
+    reader = sqlite3.connect(path)
+    committed = []
+    async for result in client.get_data_many(
+            [nft.launcher_id for nft in nfts], concurrency=2,
+            commit_every=commit_every, commit_interval=commit_interval,
+    ):
+        assert result.error is None
+        committed.append(reader.execute("SELECT COUNT(*) FROM lineage").fetchone()[0])
+    # the tips are committed before the stream ends, every 2 results or every time
+    assert committed[1] >= 2 and committed[3] >= 4
+    assert reader.execute("SELECT COUNT(*) FROM lineage").fetchone()[0] == 5
+
+
+@pytest.mark.asyncio
+async def test_get_data_many_slow_lookup_does_not_hold_up_the_rest():
+    node = FakeNode()
+    nfts = [FakeReaiNft(node, make_data(2), seed=i) for i in range(5)]
+    client = ReaiNodeClient(node)
+    slow = nfts[0].launcher_id
+    released = asyncio.Event()
+    data_result = client._data_result
+
+    async def lookup(launcher_id):
+        if launcher_id == slow:
+            await released.wait()
+        return await data_result(launcher_id)
+
+    client._data_result = lookup
+    order = []
+    async for result in client.get_data_many([nft.launcher_id for nft in nfts], concurrency=2):
+        order.append(result.launcher_id)
+        if len(order) == len(nfts) - 1:
+            released.set()
+    # the other four went through the second slot while the first was stuck
+    assert order[-1] == slow
+    assert set(order) == {nft.launcher_id for nft in nfts}
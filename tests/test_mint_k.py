@@ -0,0 +1,117 @@
+"""
+mint_k chunking and failure reporting, on a fake node.
+"""
+import pytest
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+
+from reai_nft.cost import max_spend_bundle_cost, spend_bundle_cost
+from reai_nft.preflight import preflight_spend_bundle
+from tests.fake_node import FakeNode, fund, make_wallet
+
+
+async def launch_cost(wallet, data=None) -> int:
+    coins = await wallet.coin_pool.available_coins()
+    spend_bundles, _ = await wallet._build_mint_k_spends(
+        coins[:1], [wallet._launch_puzzle(data)]
+    )
+    return spend_bundle_cost(spend_bundles[0])
+
+
+def cost_fraction(cost: int, chunk_size: int) -> float:
+    """max_cost_fraction making chunks of chunk_size launches of cost each."""
+    return (chunk_size + 0.5) * cost / DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM
+
+
+def pushed_bundles(node) -> list:
+    return list(node.mempool.values())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("k, chunk_size, fee", [(6, 2, 0), (7, 3, 100), (5, 5, 7), (4, 1, 3)])
+async def test_chunks_stay_under_the_cost_cap(k, chunk_size, fee):
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * k)
+    # launches only differ by their data, chunks are sized from the largest
+    data = [[["key", "value" * i]] for i in range(k)]
+    fraction = cost_fraction(await launch_cost(wallet, data[-1]), chunk_size)
+    ok, tx_and_launcher_ids, failures = await wallet.mint_k(
+        fee=fee, max_cost_fraction=fraction, data=data
+    )
+    assert ok and not failures
+    assert len(tx_and_launcher_ids) == k
+    bundles = pushed_bundles(node)
+    assert len(bundles) == -(-k // chunk_size)
+    fees = []
+    for spend_bundle in bundles:
+        assert spend_bundle_cost(spend_bundle) <= max_spend_bundle_cost(fraction)
+        preflight = preflight_spend_bundle(spend_bundle)
+        assert preflight.ok, preflight
+        fees.append(preflight.fee)
+    # each chunk pays its share of the fee
+    assert sum(fees) == fee
+    assert max(fees) - min(fees) == fee % len(bundles)
+
+
+@pytest.mark.asyncio
+async def test_failed_chunks_are_returned():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * 6)
+    pushed = []
+    push_tx = node.push_tx
+
+    async def fail_second_push(spend_bundle):
+        pushed.append(spend_bundle)
+        if len(pushed) == 2:
+            return {"success": False, "error": "MEMPOOL_FULL"}
+        return await push_tx(spend_bundle)
+
+    node.push_tx = fail_second_push
+    fraction = cost_fraction(await launch_cost(wallet), 2)
+    ok, tx_and_launcher_ids, failures = await wallet.mint_k(k=6, max_cost_fraction=fraction)
+    assert ok
+    assert len(pushed) == 3
+    assert len(tx_and_launcher_ids) == 4
+    assert len(failures) == 1
+    assert failures[0].spend_bundle == pushed[1]
+    assert len(failures[0].items) == 2
+    assert "MEMPOOL_FULL" in str(failures[0].error)
+    # the failed chunk's coins are usable again
+    assert len(await wallet.coin_pool.available_coins()) == 2
+
+
+@pytest.mark.asyncio
+async def test_no_chunk_pushed_raises():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * 4)
+
+    async def reject(spend_bundle):
+        return {"success": False, "error": "MEMPOOL_FULL"}
+
+    node.push_tx = reject
+    with pytest.raises(ValueError, match="MEMPOOL_FULL"):
+        await wallet.mint_k(k=4)
+    assert len(await wallet.coin_pool.available_coins()) == 4
+
+
+@pytest.mark.asyncio
+async def test_too_few_coins():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * 3)
+    assert await wallet.mint_k(k=4) == (False, [], [])
+    assert len(await wallet.coin_pool.available_coins()) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("k, data", [(0, None), (5, [])])
+async def test_nothing_to_mint_raises_before_reserving_coins(k, data):
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * 3)
+    with pytest.raises(ValueError, match="Nothing to mint"):
+        await wallet.mint_k(k=k, data=data)
+    assert not wallet.coin_pool.reserved
+    assert not node.mempool
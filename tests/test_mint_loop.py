@@ -0,0 +1,158 @@
+"""
+mint-in-batch-no-stop minting batches, serially or pipelined, and recording
+their confirmations, on a fake node.
+"""
+import asyncio
+
+import pytest
+from click.testing import CliRunner
+
+from reai_nft import cmd, confirmation
+from tests.fake_node import FakeNode, fund, make_wallet
+
+BATCHES = 3
+BATCH_SIZE = 2
+
+
+class FakeWalletContext:
+    def __init__(self, wallet):
+        self.wallet = wallet
+
+    async def __aenter__(self):
+        return self.wallet
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class QuickTracker(confirmation.ConfirmationTracker):
+    def __init__(self, node_client):
+        super().__init__(node_client, poll_interval=0, timeout=1)
+
+
+@pytest.fixture
+def loop_env(tmp_path, monkeypatch):
+    """A funded wallet on a fake node, in a directory with the keep minting flag set."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "keep_minting_flag").write_text("1")
+    sleep = asyncio.sleep
+
+    async def no_wait(delay, result=None):
+        return await sleep(0, result)
+
+    monkeypatch.setattr(asyncio, "sleep", no_wait)
+    monkeypatch.setattr(confirmation, "ConfirmationTracker", QuickTracker)
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * 10)
+    return tmp_path, node, wallet
+
+
+def watch_mints(wallet, flag_path) -> list:
+    """
+    Records whether a batch was still unconfirmed when each mint_k call
+    started, and clears the flag after BATCHES calls.
+    """
+    node = wallet.node_client
+    mint_k = wallet.mint_k
+    unconfirmed = []
+
+    async def watched(**kwargs):
+        unconfirmed.append(bool(node.mempool))
+        if len(unconfirmed) == BATCHES:
+            flag_path.write_text("0")
+        result = await mint_k(**kwargs)
+        watched.pushed.append(list(node.mempool))
+        return result
+
+    watched.pushed = []
+    wallet.mint_k = watched
+    return unconfirmed
+
+
+def farm_on_poll(node: FakeNode, allowed=lambda: True, dropped=()):
+    """Every peak poll confirms the mempool bundles while allowed, except dropped ones."""
+    get_blockchain_state = node.get_blockchain_state
+
+    async def poll():
+        for tx_id in dropped:
+            node.mempool.pop(tx_id, None)
+        if node.mempool and allowed():
+            node.farm_block()
+        return await get_blockchain_state()
+
+    node.get_blockchain_state = poll
+
+
+def run_loop(wallet, *args):
+    result = CliRunner().invoke(
+        cmd.mint_in_batch_no_stop,
+        ["--batchsize", str(BATCH_SIZE), *args],
+        obj=FakeWalletContext(wallet),
+    )
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def recorded(directory) -> list:
+    (path,) = directory.glob("tokens_information.*.rtoken")
+    return [line.split(",") for line in path.read_text().splitlines()]
+
+
+def assert_confirmed(node: FakeNode, lines: list):
+    for launcher_id, _, height, _ in lines:
+        record = node.records[bytes.fromhex(launcher_id[2:])]
+        assert record.spent and record.confirmed_block_index == int(height)
+
+
+def test_serial_loop_waits_for_each_batch(loop_env):
+    directory, node, wallet = loop_env
+    unconfirmed = watch_mints(wallet, directory / "keep_minting_flag")
+    farm_on_poll(node)
+    run_loop(wallet)
+    assert unconfirmed == [False] * BATCHES
+    lines = recorded(directory)
+    assert len(lines) == BATCHES * BATCH_SIZE
+    assert_confirmed(node, lines)
+
+
+def test_pipelined_loop_pushes_before_the_last_batch_confirms(loop_env):
+    directory, node, wallet = loop_env
+    unconfirmed = watch_mints(wallet, directory / "keep_minting_flag")
+    # nothing confirms before the second batch is pushed
+    farm_on_poll(node, allowed=lambda: len(wallet.mint_k.pushed) >= 2)
+    run_loop(wallet, "--pipeline-depth", "2")
+    assert unconfirmed[:2] == [False, True]
+    lines = recorded(directory)
+    assert len(lines) == BATCHES * BATCH_SIZE
+    assert_confirmed(node, lines)
+
+
+def test_dropped_batch_is_reported_and_minting_goes_on(loop_env):
+    directory, node, wallet = loop_env
+    watch_mints(wallet, directory / "keep_minting_flag")
+    dropped = set()
+    # the first batch leaves the mempool before any block includes it
+    farm_on_poll(node, allowed=lambda: len(wallet.mint_k.pushed) >= 2, dropped=dropped)
+    mint_k = wallet.mint_k
+
+    async def drop_first(**kwargs):
+        result = await mint_k(**kwargs)
+        if len(mint_k.pushed) == 1:
+            dropped.update(node.mempool)
+        return result
+
+    drop_first.pushed = mint_k.pushed
+    wallet.mint_k = drop_first
+    result = run_loop(wallet, "--pipeline-depth", "2")
+    lines = recorded(directory)
+    assert len(lines) == (BATCHES - 1) * BATCH_SIZE
+    assert_confirmed(node, lines)
+    assert f"{BATCH_SIZE} launcher ids were not confirmed in time" in result.stderr
+    recorded_ids = {launcher_id for launcher_id, _, _, _ in lines}
+    unconfirmed_ids = [
+        line.split(",")[0].split(" ")[1]
+        for line in result.stderr.splitlines() if line.startswith("unconfirmed:")
+    ]
+    assert len(unconfirmed_ids) == BATCH_SIZE
+    assert not recorded_ids & set(unconfirmed_ids)
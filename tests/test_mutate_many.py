@@ -0,0 +1,182 @@
+"""
+mutate_many chunking, fees and per-item failures, on a fake node.
+"""
+import pytest
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from reai_nft.cost import max_spend_bundle_cost, spend_bundle_cost
+from reai_nft.preflight import preflight_spend_bundle
+from tests.fake_node import FakeNode, FakeReaiNft, fund, make_data, make_wallet
+
+
+def launch(node: FakeNode, wallet, n: int, multi_op=False) -> list:
+    return [
+        FakeReaiNft(node, make_data(2), multi_op, seed=i, pub_key=wallet.pk) for i in range(n)
+    ]
+
+
+async def mutation_cost(wallet, nft: FakeReaiNft, operation) -> int:
+    state = await wallet.get_singleton_state(nft.launcher_id)
+    return spend_bundle_cost(wallet._bulk_spend(nft.launcher_id, state, operation))
+
+
+def cost_fraction(cost: int, chunk_size: int, extra: int = 0) -> float:
+    """max_cost_fraction making chunks of chunk_size spends of cost each, plus extra."""
+    return ((chunk_size + 0.5) * cost + extra) / DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM
+
+
+def fee_spends(wallet, spend_bundle) -> list:
+    return [
+        coin_spend for coin_spend in spend_bundle.coin_spends
+        if coin_spend.coin.puzzle_hash == wallet.coin_pool.puzzle_hash
+    ]
+
+
+async def fee_chunks(node: FakeNode, wallet) -> tuple:
+    """Items of 5 nfts and a max_cost_fraction pushing them in 3 bundles with fees."""
+    nfts = launch(node, wallet, 5)
+    items = [(nft.launcher_id, ("add", (b"new", b"pair"))) for nft in nfts]
+    fraction = cost_fraction(
+        await mutation_cost(wallet, nfts[0], items[0][1]), 2, wallet._fee_spend_cost()
+    )
+    return items, fraction
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("n, chunk_size", [(5, 2), (4, 4), (3, 1)])
+async def test_chunks_stay_under_the_cost_cap(n, chunk_size):
+    node = FakeNode()
+    wallet = make_wallet(node)
+    nfts = launch(node, wallet, n)
+    items = [(nft.launcher_id, ("add", (b"new", b"pair"))) for nft in nfts]
+    fraction = cost_fraction(await mutation_cost(wallet, nfts[0], items[0][1]), chunk_size)
+    results = await wallet.mutate_many(items, max_cost_fraction=fraction)
+    assert [result.launcher_id for result in results] == [nft.launcher_id for nft in nfts]
+    assert all(result.error is None for result in results)
+    bundles = list(node.mempool.values())
+    assert len(bundles) == -(-n // chunk_size)
+    for spend_bundle in bundles:
+        assert spend_bundle_cost(spend_bundle) <= max_spend_bundle_cost(fraction)
+        preflight = preflight_spend_bundle(spend_bundle)
+        assert preflight.ok, preflight
+    # every item reports the bundle it was pushed in
+    assert {result.transaction_id for result in results} == set(node.mempool)
+
+
+@pytest.mark.asyncio
+async def test_each_chunk_pays_its_share_of_the_fee_with_one_fee_spend():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * 3)
+    items, fraction = await fee_chunks(node, wallet)
+    results = await wallet.mutate_many(items, fee=100, max_cost_fraction=fraction)
+    assert all(result.error is None for result in results)
+    bundles = list(node.mempool.values())
+    assert len(bundles) == 3
+    fees = []
+    for spend_bundle in bundles:
+        assert len(fee_spends(wallet, spend_bundle)) == 1
+        assert spend_bundle_cost(spend_bundle) <= max_spend_bundle_cost(fraction)
+        preflight = preflight_spend_bundle(spend_bundle)
+        assert preflight.ok, preflight
+        fees.append(preflight.fee)
+    assert sorted(fees) == [33, 33, 34]
+
+
+@pytest.mark.asyncio
+async def test_too_few_fee_coins_fail_every_chunk_without_reserving():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * 2)
+    items, fraction = await fee_chunks(node, wallet)
+    results = await wallet.mutate_many(items, fee=100, max_cost_fraction=fraction)
+    assert [result.launcher_id for result in results] == [launcher_id for launcher_id, _ in items]
+    assert all("fees of 3 bundles" in str(result.error) for result in results)
+    assert not wallet.coin_pool.reserved
+    assert node.calls["push_tx"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_fee_spend_releases_every_fee_coin():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000] * 3)
+    items, fraction = await fee_chunks(node, wallet)
+    fee_spend_bundle = wallet._fee_spend_bundle
+    signed = []
+
+    def fail_last(coin, fee):
+        signed.append(coin)
+        if len(signed) == 3:
+            raise ValueError("signing failed")
+        return fee_spend_bundle(coin, fee)
+
+    wallet._fee_spend_bundle = fail_last
+    results = await wallet.mutate_many(items, fee=100, max_cost_fraction=fraction)
+    assert all("signing failed" in str(result.error) for result in results)
+    assert not wallet.coin_pool.reserved
+    assert node.calls["push_tx"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_items_are_reported_and_the_rest_pushed():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    nfts = launch(node, wallet, 3, multi_op=True)
+    unknown = bytes32(b"\7" * 32)
+    items = [
+        (nfts[0].launcher_id, ("add", (b"new", b"pair"))),
+        (unknown, ("add", (b"new", b"pair"))),
+        # the nfts hold 2 pairs
+        (nfts[1].launcher_id, ("remove", 2)),
+        (nfts[2].launcher_id, ("remove", 1)),
+    ]
+    results = await wallet.mutate_many(items)
+    # in the order of the items, failed ones included
+    assert [result.launcher_id for result in results] == [launcher_id for launcher_id, _ in items]
+    results = {result.launcher_id: result for result in results}
+    assert results[nfts[0].launcher_id].error is None
+    assert results[nfts[2].launcher_id].error is None
+    assert results[unknown].error is not None
+    assert "No pair at index 2" in str(results[nfts[1].launcher_id].error)
+    (spend_bundle,) = node.mempool.values()
+    assert {coin.name() for coin in spend_bundle.removals()} == {
+        nfts[0].singleton.name(), nfts[2].singleton.name()
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_pushes_fail_their_items():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    nfts = launch(node, wallet, 2)
+
+    async def reject(spend_bundle):
+        return {"success": False, "error": "MEMPOOL_FULL"}
+
+    node.push_tx = reject
+    results = await wallet.mutate_many([(nft.launcher_id, ("freeze",)) for nft in nfts])
+    assert len(results) == 2
+    assert all("MEMPOOL_FULL" in str(result.error) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_an_nft_is_spent_once_per_batch():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    (nft,) = launch(node, wallet, 1)
+    with pytest.raises(ValueError, match="once per batch"):
+        await wallet.mutate_many([(nft.launcher_id, ("freeze",)), (nft.launcher_id, ("freeze",))])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("multi_op", [False, True])
+@pytest.mark.parametrize("index", [2, -1])
+async def test_removal_without_a_pair_is_refused_before_pushing(multi_op, index):
+    node = FakeNode()
+    wallet = make_wallet(node)
+    (nft,) = launch(node, wallet, 1, multi_op)
+    with pytest.raises(ValueError, match=f"No pair at index {index}"):
+        await wallet.remove_pair_at(nft.launcher_id, index)
+    assert node.calls["push_tx"] == 0
@@ -0,0 +1,61 @@
+"""
+Reading reai nfts through ReaiNodeClient on a fake node.
+"""
+import pytest
+from chia.types.blockchain_format.coin import Coin
+
+from reai_nft.node_client import ReaiNodeClient
+from tests.fake_node import FakeNode, FakeReaiNft, make_data
+
+KINDS = [(False, False), (True, False), (True, True)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("multi_op, hashed_data", KINDS)
+async def test_get_data(multi_op, hashed_data):
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(4), multi_op, hashed_data)
+    client = ReaiNodeClient(node)
+    assert await client.get_data(nft.launcher_id) == (1, nft.data)
+    nft.add((b"new", b"pair"))
+    nft.remove(2)
+    assert await client.get_data(nft.launcher_id) == (3, nft.data)
+
+
+@pytest.mark.asyncio
+async def test_get_data_fetches_the_parent_spend_once():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(4))
+    nft.add((b"new", b"pair"))
+    await ReaiNodeClient(node).get_data(nft.launcher_id)
+    assert node.calls["get_puzzle_and_solution"] == 1
+
+
+@pytest.mark.asyncio
+async def test_singleton_state_matches_the_data():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(4), multi_op=True)
+    nft.add((b"new", b"pair"))
+    state = await ReaiNodeClient(node).get_singleton_state(nft.launcher_id)
+    assert state.singleton == nft.singleton
+    assert state.parent_record == nft.lineage[-2]
+    assert state.coin_spend == nft.parent_spend
+    assert (state.version, state.data) == (nft.version, nft.data)
+    assert (state.multi_op, state.hashed_data) == (True, False)
+
+
+@pytest.mark.asyncio
+async def test_unspent_coin_is_its_own_tip():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(4))
+    client = ReaiNodeClient(node)
+    assert await client.get_lineage_tip(nft.singleton.name()) == tuple(nft.lineage)
+
+
+@pytest.mark.asyncio
+async def test_forked_lineage_has_no_data():
+    node = FakeNode()
+    nft = FakeReaiNft(node, make_data(4))
+    # a second coin created by the launcher spend
+    node.add_coin(Coin(nft.launcher_id, nft.launcher_id, nft.singleton.amount))
+    assert await ReaiNodeClient(node).get_data(nft.launcher_id) == (1, [])
@@ -0,0 +1,130 @@
+"""
+Coin splitting amounts and the coins CoinPoolKeeper leaves to minting, on a
+fake node.
+"""
+import pytest
+
+from reai_nft.pool_keeper import CoinPoolKeeper
+from reai_nft.wallet import MAX_SPLIT_OUTPUTS, ReaiWallet
+from tests.fake_node import FakeNode, fund, make_wallet
+
+
+@pytest.mark.parametrize("amount, k, fee", [(100, 4, 0), (1000, 7, 13), (10, 4, 0), (7, 1, 2)])
+def test_even_split_amounts(amount, k, fee):
+    amounts = ReaiWallet._split_amounts(amount, k, fee)
+    assert len(amounts) == k
+    assert len(set(amounts)) == k
+    assert min(amounts) > 0
+    assert sum(amounts) == amount - fee
+
+
+@pytest.mark.parametrize("amount, k, fee, expected", [
+    # the rest is one change coin
+    (1000, 3, 10, [100, 101, 102, 687]),
+    # nothing left over
+    (303, 3, 0, [100, 101, 102]),
+    # change of the same amount as a split coin is added to the last one
+    (404, 3, 0, [100, 101, 203]),
+])
+def test_split_amounts_of_coin_amount(amount, k, fee, expected):
+    assert ReaiWallet._split_amounts(amount, k, fee, coin_amount=100) == expected
+
+
+@pytest.mark.parametrize("amount, k, fee, coin_amount", [
+    (100, 0, 0, None),
+    (5, 4, 0, None),
+    (10, 2, 9, None),
+    (300, 3, 0, 100),
+    (310, 3, 10, 100),
+])
+def test_impossible_splits_raise(amount, k, fee, coin_amount):
+    with pytest.raises(ValueError):
+        ReaiWallet._split_amounts(amount, k, fee, coin_amount)
+
+
+@pytest.mark.parametrize("amount, coin_amount, fee, expected", [
+    (1000, 100, 0, 9),
+    (1000, 100, 100, 8),
+    (99, 100, 0, 0),
+    (100, 100, 0, 1),
+    (10 ** 12, 1, 0, MAX_SPLIT_OUTPUTS),
+])
+def test_affordable_splits(amount, coin_amount, fee, expected):
+    k = ReaiWallet._affordable_splits(amount, coin_amount, fee)
+    assert k == expected
+    if k:
+        # what it reports can be split, one more can't unless capped
+        ReaiWallet._split_amounts(amount, k, fee, coin_amount)
+    if k < MAX_SPLIT_OUTPUTS:
+        with pytest.raises(ValueError):
+            ReaiWallet._split_amounts(amount, k + 1, fee, coin_amount)
+
+
+def make_keeper(amounts) -> CoinPoolKeeper:
+    wallet = make_wallet(FakeNode())
+    fund(wallet, amounts)
+    # coins of 100 mojos
+    return CoinPoolKeeper(wallet, target=10, fee_budget=99, log=lambda message: None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("amounts, expected", [
+    # the largest coin is kept for splitting
+    ([50, 100, 150, 1000], 2),
+    # unless it only makes one coin
+    ([50, 100, 150], 2),
+    ([100, 199], 2),
+    ([50], 0),
+    ([], 0),
+])
+async def test_ready_and_mintable_coins(amounts, expected):
+    keeper = make_keeper(amounts)
+    assert await keeper.ready_coins() == expected
+    assert await keeper.mintable_coins() == expected
+
+
+@pytest.mark.asyncio
+async def test_ready_coins_count_incoming_splits():
+    keeper = make_keeper([50, 100, 150, 1000])
+    created, failures = await keeper.wallet.split_coins(3, keeper.coin_amount)
+    assert created == 3 and not failures
+    # the split coin is pending, its 3 coins of 100 and the change of 697 are incoming
+    assert await keeper.mintable_coins() == 2
+    assert await keeper.ready_coins() == 6
+
+
+@pytest.mark.asyncio
+async def test_top_up_splits_below_low_water():
+    keeper = make_keeper([100, 10000])
+    assert await keeper.top_up() == 9
+    assert await keeper.ready_coins() >= keeper.target
+    # above low water now
+    assert await keeper.top_up() == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("k, spent", [(1, [100]), (2, [100, 120]), (3, [100, 120, 130])])
+async def test_mint_k_takes_the_smallest_mintable_coins(k, spent):
+    keeper = make_keeper([50, 130, 100, 5000, 120])
+    wallet = keeper.wallet
+    ok, tx_and_launcher_ids, failures = await wallet.mint_k(
+        k=k, choose=keeper.choose_mint_coins
+    )
+    assert ok and not failures
+    assert len(tx_and_launcher_ids) == k
+    removals = [
+        coin for spend_bundle in wallet.node_client.mempool.values()
+        for coin in spend_bundle.removals()
+        if coin.puzzle_hash == wallet.coin_pool.puzzle_hash
+    ]
+    assert sorted(coin.amount for coin in removals) == spent
+
+
+@pytest.mark.asyncio
+async def test_mint_k_without_enough_mintable_coins_reserves_nothing():
+    keeper = make_keeper([50, 130, 100, 5000, 120])
+    wallet = keeper.wallet
+    ok, _, _ = await wallet.mint_k(k=4, choose=keeper.choose_mint_coins)
+    assert not ok
+    assert not wallet.coin_pool.reserved
+    assert not wallet.node_client.mempool
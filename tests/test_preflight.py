@@ -0,0 +1,94 @@
+"""
+preflight_spend_bundle and the checks _push_tx makes with it, on a fake node.
+"""
+from contextlib import asynccontextmanager
+
+import pytest
+from blspy import G2Element
+from chia.types.spend_bundle import SpendBundle
+from click.testing import CliRunner
+
+from reai_nft import cmd
+from reai_nft.preflight import PreflightError, preflight_spend_bundle
+from reai_nft.wallet import ReaiWallet
+from tests.fake_node import FakeNode, FakeReaiNft, make_wallet
+
+
+async def mutation_bundle(node: FakeNode, wallet) -> SpendBundle:
+    nft = FakeReaiNft(node, [(b"key", b"value")], pub_key=wallet.pk)
+    state = await wallet.get_singleton_state(nft.launcher_id)
+    return wallet._bulk_spend(nft.launcher_id, state, ("add", (b"new", b"pair")))
+
+
+def unsigned(spend_bundle: SpendBundle) -> SpendBundle:
+    return SpendBundle(spend_bundle.coin_spends, G2Element())
+
+
+@pytest.mark.asyncio
+async def test_signature_check_can_be_skipped():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    spend_bundle = unsigned(await mutation_bundle(node, wallet))
+    assert "signature" in str(preflight_spend_bundle(spend_bundle))
+    assert preflight_spend_bundle(spend_bundle, check_signature=False).ok
+    # the other checks still run
+    preflight = preflight_spend_bundle(spend_bundle, min_fee=1, check_signature=False)
+    assert "insufficient fee" in str(preflight)
+
+
+@pytest.mark.asyncio
+async def test_push_tx_rejects_invalid_bundles_without_pushing():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    wallet.min_fee = 1
+    with pytest.raises(PreflightError, match="insufficient fee"):
+        await wallet._push_tx(await mutation_bundle(node, wallet))
+    assert node.calls["push_tx"] == 0
+
+
+@pytest.mark.asyncio
+async def test_push_tx_leaves_the_signature_to_the_node():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    spend_bundle = unsigned(await mutation_bundle(node, wallet))
+    assert (await wallet._push_tx(spend_bundle))["success"]
+    assert spend_bundle.name() in node.mempool
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("verbose, dry_run", [(True, False), (False, True)])
+async def test_verbose_and_dry_run_push_tx_check_the_signature(verbose, dry_run):
+    node = FakeNode()
+    wallet = make_wallet(node)
+    wallet.verbose, wallet.dry_run = verbose, dry_run
+    spend_bundle = unsigned(await mutation_bundle(node, wallet))
+    with pytest.raises(PreflightError, match="signature"):
+        await wallet._push_tx(spend_bundle)
+    assert node.calls["push_tx"] == 0
+
+
+def test_min_fee_option_reaches_the_wallet(monkeypatch):
+    node = FakeNode()
+    wallet = make_wallet(node)
+    nft = FakeReaiNft(node, [(b"key", b"value")], pub_key=wallet.pk)
+
+    @asynccontextmanager
+    async def create(*args, **kwargs):
+        yield wallet
+
+    monkeypatch.setattr(ReaiWallet, "create", staticmethod(create))
+    result = CliRunner().invoke(
+        cmd.cli, ["--min-fee", "5", "add-pair", f"0x{nft.launcher_id}", "new", "pair"]
+    )
+    assert isinstance(result.exception, PreflightError)
+    assert "insufficient fee" in str(result.exception)
+    assert node.calls["push_tx"] == 0
+
+
+def test_min_fee_is_refused_when_forwarding_to_the_daemon():
+    result = CliRunner().invoke(
+        cmd.cli,
+        ["--min-fee", "5", "--daemon", "unix:/nowhere", "add-pair", "0x" + "00" * 32, "new", "pair"],
+    )
+    assert result.exit_code == 2
+    assert "--min-fee" in result.output
@@ -0,0 +1,55 @@
+"""
+reai_puzzle_hash, singleton_puzzle_hash and tree_hash against the tree hashes
+of the Programs they stand in for.
+"""
+import pytest
+from blspy import AugSchemeMPL
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.wallet.puzzles import singleton_top_layer
+
+from reai_nft import driver
+
+OWNERS = [AugSchemeMPL.key_gen(bytes([seed]) * 32).get_g1() for seed in (1, 2)]
+VERSIONS = [0, 1, 2, 127, 128, 255, 256, 70000]
+DATA = [
+    [],
+    [(b"key", b"value")],
+    [(b"", b""), (b"\0", b"\x80"), (b"k" * 0x40, b"v" * 0x2000)],
+]
+
+# (multi_op, hashed_data) of v1, v2 and v3
+KINDS = [(False, False), (True, False), (True, True)]
+
+
+@pytest.mark.parametrize("multi_op, hashed_data", KINDS)
+@pytest.mark.parametrize("data", DATA)
+@pytest.mark.parametrize("version", VERSIONS)
+@pytest.mark.parametrize("owner", OWNERS)
+def test_reai_puzzle_hash(multi_op, hashed_data, data, version, owner):
+    puzzle = driver.create_reai_puzzle(
+        data, owner, version, multi_op=multi_op, hashed_data=hashed_data
+    )
+    assert driver.reai_puzzle_hash(
+        data, owner, version, multi_op=multi_op, hashed_data=hashed_data
+    ) == puzzle.get_tree_hash()
+
+
+@pytest.mark.parametrize("multi_op, hashed_data", KINDS)
+@pytest.mark.parametrize("data", DATA)
+@pytest.mark.parametrize("launcher_id", [bytes32(b"\0" * 32), bytes32(b"\3" * 32)])
+def test_singleton_puzzle_hash(multi_op, hashed_data, data, launcher_id):
+    inner_puzzle = driver.create_reai_puzzle(
+        data, OWNERS[0], 2, multi_op=multi_op, hashed_data=hashed_data
+    )
+    puzzle = singleton_top_layer.puzzle_for_singleton(launcher_id, inner_puzzle)
+    assert driver.singleton_puzzle_hash(
+        launcher_id, inner_puzzle.get_tree_hash()
+    ) == puzzle.get_tree_hash()
+
+
+@pytest.mark.parametrize("value", [
+    b"", b"\0", 0, 1, -1, 128, "text", (b"a", b"b"), [], [1, [2, (3, 4)]], OWNERS[0],
+] + DATA)
+def test_tree_hash(value):
+    assert driver.tree_hash(value) == Program.to(value).get_tree_hash()
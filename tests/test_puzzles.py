@@ -0,0 +1,89 @@
+"""
+Spends built by the wallet, run through the reai puzzles themselves.
+"""
+import pytest
+
+from reai_nft import driver
+from reai_nft.node_client import Operation
+from reai_nft.preflight import _describe_clvm_error, preflight_spend_bundle
+from tests.fake_node import PUB_KEY, FakeNode, FakeReaiNft, make_data, make_wallet
+
+
+def child_puzzle_hash(nft: FakeReaiNft, data: list, version: int):
+    """Puzzle hash of the singleton a spend of nft leaving data and version creates."""
+    return driver.singleton_puzzle_hash(
+        nft.launcher_id,
+        driver.reai_puzzle_hash(
+            data, nft.pub_key, version, multi_op=nft.multi_op, hashed_data=nft.hashed_data
+        ),
+    )
+
+
+async def apply_and_run(node: FakeNode, wallet, nft: FakeReaiNft, edits):
+    """Applies edits through the wallet and runs the pushed bundle's spends."""
+    tx_id = await wallet.apply_edits(nft.launcher_id, edits)
+    preflight = preflight_spend_bundle(node.mempool[tx_id])
+    assert preflight.ok, preflight
+    (child,) = preflight.additions
+    return child
+
+
+@pytest.mark.asyncio
+async def test_multi_op_apply_edits():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    nft = FakeReaiNft(node, make_data(3), multi_op=True, pub_key=wallet.pk)
+    child = await apply_and_run(node, wallet, nft, [
+        (Operation.ADD, (b"new", b"pair")),
+        (Operation.REMOVE, 2),
+        (Operation.ADD, (b"other", b"pair")),
+        (Operation.REMOVE, 0),
+    ])
+    # new pairs are prepended, removals index the data left by the previous edits
+    key0, _, key2 = make_data(3)
+    expected = [(b"new", b"pair"), key0, key2]
+    assert child.puzzle_hash == child_puzzle_hash(nft, expected, 2)
+
+
+@pytest.mark.asyncio
+async def test_hashed_data_add_and_remove():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    nft = FakeReaiNft(node, make_data(4), hashed_data=True, pub_key=wallet.pk)
+    child = await apply_and_run(node, wallet, nft, [
+        (Operation.ADD, (b"new", b"pair")),
+        (Operation.REMOVE, 4),
+        (Operation.REMOVE, 0),
+    ])
+    assert child.puzzle_hash == child_puzzle_hash(nft, make_data(3), 2)
+
+
+@pytest.mark.asyncio
+async def test_hashed_data_forged_proof_is_rejected():
+    node = FakeNode()
+    wallet = make_wallet(node)
+    data = make_data(3)
+    nft = FakeReaiNft(node, data, hashed_data=True, pub_key=wallet.pk)
+    state = await wallet.get_singleton_state(nft.launcher_id)
+    # claims a pair the nft doesn't hold sits at index 1
+    prefix, _, tail = driver.removal_proof(data, 1)
+    forged = [prefix, driver.tree_hash((b"not", b"there")), tail]
+    commit = [[driver.REMOVE, forged]]
+    spend_bundle = wallet._singleton_spend(
+        nft.launcher_id, state, driver.solution_for_reai(2, commit), commit
+    )
+    preflight = preflight_spend_bundle(spend_bundle)
+    assert not preflight.ok
+    assert "bad proof" in str(preflight)
+
+
+def test_hashed_data_proof_against_another_root_is_rejected():
+    data = make_data(3)
+    commit = [[driver.REMOVE, driver.removal_proof(data, 1)]]
+    solution = driver.solution_for_reai(2, commit, adapt=True)
+    # the proof holds for the data the puzzle is curried with
+    driver.create_reai_puzzle(data, PUB_KEY, hashed_data=True).run(solution)
+    other = driver.create_reai_puzzle(data[:2], PUB_KEY, hashed_data=True)
+    with pytest.raises(Exception) as error:
+        other.run(solution)
+    assert "bad proof" in _describe_clvm_error(error.value)
@@ -0,0 +1,104 @@
+"""
+ReaiServer and DaemonClient talking over a unix socket, with the wallet on a
+fake node.
+"""
+import os
+import stat
+from contextlib import asynccontextmanager
+
+import aiohttp
+import pytest
+
+from reai_nft.daemon_client import TOKEN_HEADER, DaemonClient, read_token
+from reai_nft.server import ReaiServer, load_or_create_token
+from tests.fake_node import FakeNode, FakeReaiNft, fund, make_wallet
+
+TOKEN = "secret"
+
+
+@asynccontextmanager
+async def serving(tmp_path, wallet):
+    server = ReaiServer(wallet, TOKEN)
+    socket_path = str(tmp_path / "reai.sock")
+    await server.start(socket_path=socket_path)
+    try:
+        yield socket_path
+    finally:
+        await server.stop()
+
+
+async def post(socket_path, headers, data=b"{}") -> aiohttp.ClientResponse:
+    connector = aiohttp.UnixConnector(path=socket_path)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async with session.post(
+            "http://localhost/get_data", data=data, headers=headers
+        ) as response:
+            await response.read()
+            return response
+
+
+@pytest.mark.asyncio
+async def test_get_data_round_trips_every_item(tmp_path):
+    node = FakeNode()
+    # a pair, a bare atom and a pair whose value isn't an atom
+    data = [(b"key", b"\0\xff"), b"atom", (b"key", (b"a", b"b"))]
+    nft = FakeReaiNft(node, data)
+    wallet = make_wallet(node)
+    async with serving(tmp_path, wallet) as socket_path:
+        async with DaemonClient(f"unix:{socket_path}", TOKEN) as client:
+            version, items = await client.get_data(nft.launcher_id)
+    assert (version, items) == await wallet.get_data(nft.launcher_id)
+    assert version == 1 and items[:2] == data[:2] and len(items) == 3
+
+
+@pytest.mark.asyncio
+async def test_mint_is_pushed_by_the_daemon(tmp_path):
+    node = FakeNode()
+    wallet = make_wallet(node)
+    fund(wallet, [1000])
+    async with serving(tmp_path, wallet) as socket_path:
+        async with DaemonClient(f"unix:{socket_path}", TOKEN) as client:
+            tx_id, launcher_id = await client.mint(data=[["key", "value"]])
+    assert bytes.fromhex(tx_id) in node.mempool
+    assert len(bytes.fromhex(launcher_id)) == 32
+
+
+@pytest.mark.asyncio
+async def test_daemon_errors_are_raised(tmp_path):
+    async with serving(tmp_path, make_wallet(FakeNode())) as socket_path:
+        async with DaemonClient(f"unix:{socket_path}", TOKEN) as client:
+            with pytest.raises(ValueError, match="Daemon error"):
+                await client.get_data(b"\1" * 31)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers, status", [
+    ({}, 401),
+    ({TOKEN_HEADER: "wrong"}, 401),
+    ({TOKEN_HEADER: TOKEN, "Content-Type": "text/plain"}, 415),
+    ({TOKEN_HEADER: TOKEN, "Content-Type": "application/json", "Origin": "http://evil.com"}, 403),
+    ({TOKEN_HEADER: TOKEN, "Content-Type": "application/json", "Host": "evil.com"}, 403),
+])
+async def test_unauthenticated_requests_are_rejected(tmp_path, headers, status):
+    node = FakeNode()
+    wallet = make_wallet(node)
+    async with serving(tmp_path, wallet) as socket_path:
+        response = await post(socket_path, headers)
+    assert response.status == status
+    assert node.calls["get_coin_record_by_name"] == 0
+
+
+@pytest.mark.asyncio
+async def test_socket_is_private(tmp_path):
+    async with serving(tmp_path, make_wallet(FakeNode())) as socket_path:
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+
+def test_token_file_is_created_once_and_private(tmp_path):
+    path = tmp_path / "reai_nft" / "daemon_token"
+    token = load_or_create_token(path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert load_or_create_token(path) == read_token(path) == token
+    path.chmod(0o644)
+    with pytest.raises(PermissionError):
+        read_token(path)